@@ -0,0 +1,11 @@
+"""
+URL configuration of the ASGI deployment
+
+Same routes as app.urls, views run on the bounded database thread pool
+instead of the single thread Django uses for sync views under ASGI.
+"""
+from core.async_views import async_patterns
+
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = async_patterns(sync_urlpatterns)
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/3.2/ref/settings/
 """
 import os
+from datetime import timedelta
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -46,9 +47,14 @@ INSTALLED_APPS = [
     'core',
     'user',
     'recipe',
+    'monitoring',
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover all other middleware
+    'monitoring.middleware.MetricsMiddleware',
+    # Before middleware reading or changing the body (core.middleware)
+    'core.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -58,7 +64,8 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
-ROOT_URLCONF = 'app.urls'
+# app.asgi switches to app.asgi_urls, which runs views on a thread pool
+ROOT_URLCONF = os.environ.get('DJANGO_ROOT_URLCONF', 'app.urls')
 
 TEMPLATES = [
     {
@@ -78,17 +85,41 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'app.wsgi.application'
 
+# Threads running database work of async views per ASGI worker, each holds
+# a connection, so keep workers * threads below the database limit
+
+ASYNC_DB_THREADS = int(os.environ.get('ASYNC_DB_THREADS', 10))
+
 
 # Database
 # https://docs.djangoproject.com/en/3.2/ref/settings/#databases
 
+# DB_CONNECTION_MODE is one of:
+#   default     new connection per request
+#   persistent  connections reused for DB_CONN_MAX_AGE seconds
+#   pooled      connections checked out of a per-process pool of
+#               DB_POOL_MAX_SIZE, see core.backends.postgresql
+
+DB_CONNECTION_MODE = os.environ.get('DB_CONNECTION_MODE', 'default')
+
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.postgresql',
+        'ENGINE': 'core.backends.postgresql',
         'HOST': os.environ.get('DB_HOST'),
         'NAME': os.environ.get('DB_NAME'),
         'USER': os.environ.get('DB_USER'),
         'PASSWORD': os.environ.get('DB_PASSWORD'),
+        'CONN_MAX_AGE': (
+            int(os.environ.get('DB_CONN_MAX_AGE', 600))
+            if DB_CONNECTION_MODE == 'persistent' else 0
+        ),
+        'POOL': {
+            'ENABLED': DB_CONNECTION_MODE == 'pooled',
+            'MAX_SIZE': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+            'MAX_LIFETIME': int(os.environ.get('DB_POOL_MAX_LIFETIME', 3600)),
+            'TIMEOUT': int(os.environ.get('DB_POOL_TIMEOUT', 30)),
+            'HEALTH_CHECKS': os.environ.get('DB_HEALTH_CHECKS', '1') == '1',
+        },
     }
 }
 
@@ -112,6 +143,79 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Cache alias holding per-user data versions behind recipe API ETags,
+# it has to be shared between worker processes in production
+
+RECIPE_VERSION_CACHE = os.environ.get('RECIPE_VERSION_CACHE', 'default')
+
+
+# Per-user cache of recipe API list/detail responses (recipe.cache),
+# BACKEND is an alias from CACHES, shared cache in production
+
+RECIPE_RESPONSE_CACHE = {
+    'BACKEND': os.environ.get('RECIPE_RESPONSE_CACHE_BACKEND', 'default'),
+    'TIMEOUT': int(os.environ.get('RECIPE_RESPONSE_CACHE_TIMEOUT', 300)),
+}
+
+
+# Render recipe API lists from values() rows instead of model instances,
+# the JSON is the same (recipe.serializers.ValuesSerializerMixin)
+
+RECIPE_VALUES_LISTS = os.environ.get('RECIPE_VALUES_LISTS', '0') == '1'
+
+
+# JSON library behind the API renderer and parser (core.renderers), orjson
+# or json; the json module is used when orjson is not installed
+
+API_JSON_BACKEND = os.environ.get('API_JSON_BACKEND', 'orjson')
+
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': (
+        'core.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'core.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ),
+}
+
+
+# Response compression (core.middleware.CompressionMiddleware), compressed
+# bodies of responses with an ETag are kept in the CACHE alias
+
+RESPONSE_COMPRESSION = {
+    'MIN_SIZE': int(os.environ.get('RESPONSE_COMPRESSION_MIN_SIZE', 1024)),
+    'LEVEL': int(os.environ.get('RESPONSE_COMPRESSION_LEVEL', 6)),
+    'CACHE': os.environ.get('RESPONSE_COMPRESSION_CACHE', 'default') or None,
+    'CACHE_TIMEOUT': int(
+        os.environ.get('RESPONSE_COMPRESSION_CACHE_TIMEOUT', 300)
+    ),
+}
+
+
+# Password hashing
+# https://docs.djangoproject.com/en/3.2/topics/auth/passwords/
+
+PASSWORD_HASHERS = [
+    'core.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+]
+
+PASSWORD_HASHER_ITERATIONS = int(
+    os.environ.get('PASSWORD_HASHER_ITERATIONS', 260000)
+)
+
+# Lifetime of refresh tokens exchanged for access tokens at user:token-refresh
+
+REFRESH_TOKEN_LIFETIME = timedelta(
+    days=int(os.environ.get('REFRESH_TOKEN_LIFETIME_DAYS', 30))
+)
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/3.2/topics/i18n/
 
@@ -137,3 +241,12 @@ STATIC_URL = '/static/'
 # DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'core.User'
+
+# Token to user cache used by core.authentication.CachedTokenAuthentication
+# BACKEND is an optional alias from CACHES shared between worker processes
+
+TOKEN_AUTH_CACHE = {
+    'MAX_SIZE': int(os.environ.get('TOKEN_AUTH_CACHE_SIZE', 10000)),
+    'TTL': int(os.environ.get('TOKEN_AUTH_CACHE_TTL', 60)),
+    'BACKEND': os.environ.get('TOKEN_AUTH_CACHE_BACKEND') or None,
+}
@@ -0,0 +1,50 @@
+"""
+Benchmarks, run from the app directory against a throwaway test database:
+
+    python -m benchmarks.<module>
+"""
+import os
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Callable
+
+import django
+
+
+def setup():
+    """
+    Configure Django for a standalone benchmark script
+    """
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+    django.setup()
+
+
+@contextmanager
+def bench_database():
+    """
+    Create test database for the benchmark and drop it afterwards
+    """
+    from core.bench import test_database
+
+    with test_database():
+        yield
+
+
+def throughput(func: Callable[[], object], repeat: int) -> float:
+    """
+    Return calls per second of func
+    """
+    started = perf_counter()
+    for _ in range(repeat):
+        func()
+    return repeat / (perf_counter() - started)
+
+
+def report(title: str, rows):
+    """
+    Print aligned benchmark results
+    """
+    print(title)
+    width = max(len(name) for name, _value in rows)
+    for name, value in rows:
+        print(f'  {name:<{width}}  {value}')
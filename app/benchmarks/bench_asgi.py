@@ -0,0 +1,83 @@
+"""
+Compare concurrent read throughput of WSGI and ASGI deployments
+"""
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from benchmarks import setup, bench_database, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--tags', type=int, default=100)
+    args = parser.parse_args()
+
+    setup()
+    from django.contrib.auth import get_user_model
+    from django.test import Client, AsyncClient, override_settings
+    from django.urls import reverse
+    from rest_framework.authtoken.models import Token
+
+    from core.models import Tag
+
+    with bench_database():
+        user = get_user_model().objects.create_user('bench@mail.com', None)
+        Tag.objects.bulk_create(
+            Tag(user=user, name=f'Tag {index}') for index in range(args.tags)
+        )
+        token = Token.objects.create(user=user).key
+        # Unique query strings keep the response cache out of the measurement
+        url = reverse('recipe:tag-list')
+        per_worker = args.requests // args.concurrency
+
+        def wsgi_worker(worker: int):
+            client = Client(HTTP_AUTHORIZATION=f'Token {token}')
+            for index in range(per_worker):
+                response = client.get(f'{url}?w={worker}&i={index}')
+                assert response.status_code == 200
+
+        def wsgi():
+            started = perf_counter()
+            with ThreadPoolExecutor(args.concurrency) as executor:
+                list(executor.map(wsgi_worker, range(args.concurrency)))
+            return per_worker * args.concurrency / (perf_counter() - started)
+
+        async def asgi_worker(worker: int):
+            client = AsyncClient()
+            for index in range(per_worker):
+                response = await client.get(
+                    f'{url}?w={worker}&i={index}',
+                    authorization=f'Token {token}'
+                )
+                assert response.status_code == 200
+
+        async def asgi_all():
+            await asyncio.gather(*(
+                asgi_worker(worker) for worker in range(args.concurrency)
+            ))
+
+        def asgi(urlconf: str):
+            with override_settings(ROOT_URLCONF=urlconf):
+                started = perf_counter()
+                asyncio.run(asgi_all())
+                elapsed = perf_counter() - started
+            return per_worker * args.concurrency / elapsed
+
+        rows = [
+            ('WSGI, thread per request', wsgi()),
+            ('ASGI, sync views', asgi('app.urls')),
+            ('ASGI, async views on DB pool', asgi('app.asgi_urls')),
+        ]
+
+    report(
+        f'{args.concurrency} concurrent clients, req/s',
+        [(name, f'{rate:.1f}') for name, rate in rows]
+    )
+
+
+if __name__ == '__main__':
+    main()
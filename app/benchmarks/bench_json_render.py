@@ -0,0 +1,68 @@
+"""
+Compare DRF's JSON renderer and parser with the orjson ones on recipes
+"""
+import argparse
+from io import BytesIO
+
+from benchmarks import setup, bench_database, throughput, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--recipes', type=int, default=10000)
+    parser.add_argument('--tags', type=int, default=20)
+    parser.add_argument('--ingredients', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    setup()
+    from rest_framework.parsers import JSONParser
+    from rest_framework.renderers import JSONRenderer
+    from core.models import Recipe
+    from core.parsers import FastJSONParser
+    from core.renderers import FastJSONRenderer, fast_json_enabled
+    from core.seed import DatasetSeeder
+    from recipe.serializers import RecipeSerializer
+
+    if not fast_json_enabled():
+        raise SystemExit('orjson is not installed or not selected')
+
+    with bench_database():
+        seeder = DatasetSeeder(
+            tags=args.tags,
+            ingredients=args.ingredients,
+            recipes=args.recipes,
+            seed=args.seed
+        )
+        user = seeder.create_users(1)[0]
+        seeder.seed([user])
+        queryset = Recipe.objects.filter(user=user).order_by('-id')\
+            .prefetch_related('ingredients', 'tag')
+        data = RecipeSerializer(queryset, many=True).data
+
+    body = JSONRenderer().render(data)
+    assert FastJSONRenderer().render(data) == body
+    megabytes = len(body) / 1024 / 1024
+
+    def render(renderer):
+        return lambda: renderer.render(data)
+
+    def parse(json_parser):
+        return lambda: json_parser.parse(BytesIO(body))
+
+    rows = [
+        ('render, json', throughput(render(JSONRenderer()), args.repeat)),
+        ('render, orjson',
+         throughput(render(FastJSONRenderer()), args.repeat)),
+        ('parse, json', throughput(parse(JSONParser()), args.repeat)),
+        ('parse, orjson', throughput(parse(FastJSONParser()), args.repeat)),
+    ]
+    report(
+        f'{args.recipes} recipes, {megabytes:.1f} MiB, MiB/s',
+        [(name, f'{rate * megabytes:.1f}') for name, rate in rows]
+    )
+
+
+if __name__ == '__main__':
+    main()
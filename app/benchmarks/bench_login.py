@@ -0,0 +1,51 @@
+"""
+Compare password login with refresh token exchange throughput
+"""
+import argparse
+
+from benchmarks import setup, bench_database, throughput, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    setup()
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.urls import reverse
+    from rest_framework.test import APIClient
+
+    with bench_database():
+        payload = {'email': 'bench@mail.com', 'password': 'password123'}
+        get_user_model().objects.create_user(**payload)
+        client = APIClient()
+        token_url = reverse('user:token')
+        refresh_url = reverse('user:token-refresh')
+        refresh = {'key': client.post(token_url, payload).data['refresh']}
+
+        def login():
+            response = client.post(token_url, payload)
+            assert response.status_code == 200, response.data
+
+        def exchange():
+            response = client.post(refresh_url, {'refresh': refresh['key']})
+            assert response.status_code == 200, response.data
+            refresh['key'] = response.data['refresh']
+
+        password_rate = throughput(login, args.repeat)
+        refresh_rate = throughput(exchange, args.repeat)
+
+    report(
+        f'PBKDF2 iterations: {settings.PASSWORD_HASHER_ITERATIONS}',
+        [
+            ('password login, req/s', f'{password_rate:.1f}'),
+            ('refresh exchange, req/s', f'{refresh_rate:.1f}'),
+            ('speedup', f'{refresh_rate / password_rate:.1f}x'),
+        ]
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+"""
+Compare EXISTS semi-join recipe filters with DISTINCT over joins
+"""
+import argparse
+from types import SimpleNamespace
+
+from benchmarks import setup, bench_database, throughput, report
+
+
+def seed(args):
+    """
+    Create recipes with tags and ingredients, return first user
+    """
+    from core.models import Tag
+    from core.seed import DatasetSeeder
+
+    seeder = DatasetSeeder(
+        tags=args.tags,
+        ingredients=args.ingredients,
+        recipes=args.recipes // args.users,
+        tags_per_recipe=(args.tags_per_recipe, ) * 2,
+        ingredients_per_recipe=(args.ingredients_per_recipe, ) * 2,
+        seed=args.seed
+    )
+    users = seeder.create_users(args.users)
+    created = seeder.seed(users)
+    tags = list(Tag.objects.filter(user=users[0]).order_by('id'))
+    return users[0], tags, created['relations']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=10)
+    parser.add_argument('--recipes', type=int, default=200000)
+    parser.add_argument('--tags', type=int, default=50)
+    parser.add_argument('--ingredients', type=int, default=200)
+    parser.add_argument('--tags-per-recipe', type=int, default=3)
+    parser.add_argument('--ingredients-per-recipe', type=int, default=2)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    setup()
+    from django.db import connection
+    from core.models import Recipe
+    from recipe.filters import RecipeRelationFilter
+
+    with bench_database():
+        user, tags, through_rows = seed(args)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        ids = [tag.id for tag in tags[:3]]
+        base = Recipe.objects.filter(user=user).order_by('-id')
+        backend = RecipeRelationFilter()
+
+        def exists_page(match: str):
+            request = SimpleNamespace(query_params={
+                'tags': ','.join(map(str, ids)),
+                'match': match,
+            })
+            queryset = backend.filter_queryset(request, base, None)
+            return lambda: list(queryset.values_list('id', flat=True)[:101])
+
+        def join_any():
+            queryset = base.filter(tag__in=ids).distinct()
+            return list(queryset.values_list('id', flat=True)[:101])
+
+        def join_all():
+            queryset = base
+            for pk in ids:
+                queryset = queryset.filter(tag=pk)
+            return list(queryset.distinct().values_list('id', flat=True)[:101])
+
+        rows = [
+            ('any, EXISTS', throughput(exists_page('any'), args.repeat)),
+            ('any, JOIN + DISTINCT', throughput(join_any, args.repeat)),
+            ('all, EXISTS', throughput(exists_page('all'), args.repeat)),
+            ('all, JOIN + DISTINCT', throughput(join_all, args.repeat)),
+        ]
+
+    report(
+        f'{connection.vendor}, {through_rows} through rows, pages/s',
+        [(name, f'{rate:.1f}') for name, rate in rows]
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Compare recipe list serialization from model instances and values() rows
+"""
+import argparse
+
+from benchmarks import setup, bench_database, throughput, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--recipes', type=int, default=10000)
+    parser.add_argument('--tags', type=int, default=20)
+    parser.add_argument('--ingredients', type=int, default=50)
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    setup()
+    from django.db import connection
+    from django.db.models import Prefetch
+    from core.models import Ingredient, Recipe, Tag
+    from core.seed import DatasetSeeder
+    from recipe.serializers import RecipeSerializer
+
+    with bench_database():
+        seeder = DatasetSeeder(
+            tags=args.tags,
+            ingredients=args.ingredients,
+            recipes=args.recipes,
+            seed=args.seed
+        )
+        user = seeder.create_users(1)[0]
+        seeder.seed([user])
+        queryset = Recipe.objects.filter(user=user).order_by('-id')\
+            .prefetch_related(
+                Prefetch('ingredients', Ingredient.objects.order_by('id')),
+                Prefetch('tag', Tag.objects.order_by('id'))
+            )
+        serializer = RecipeSerializer()
+
+        def instances(limit):
+            return lambda: RecipeSerializer(
+                queryset[:limit], many=True
+            ).data
+
+        def values(limit):
+            rows = serializer.values_queryset(queryset)
+            return lambda: serializer.values_data(list(rows[:limit]))
+
+        assert instances(args.page_size)() == values(args.page_size)()
+        rows = []
+        for limit in (args.page_size, args.recipes):
+            repeat = max(1, args.repeat * args.page_size // limit)
+            rows += [
+                (f'{limit} rows, instances',
+                 f'{throughput(instances(limit), repeat) * limit:.0f}'),
+                (f'{limit} rows, values()',
+                 f'{throughput(values(limit), repeat) * limit:.0f}'),
+            ]
+
+    report(f'{connection.vendor}, recipes serialized/s', rows)
+
+
+if __name__ == '__main__':
+    main()
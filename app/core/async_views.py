@@ -0,0 +1,117 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+from django.core.exceptions import ImproperlyConfigured
+from django.urls import URLPattern, URLResolver
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """
+    Return thread pool running ORM work of async views
+
+    Every thread holds its own database connection, so ASYNC_DB_THREADS
+    caps the connections opened by one ASGI worker.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.ASYNC_DB_THREADS,
+                thread_name_prefix='async-db'
+            )
+    return _executor
+
+
+async def run_db(func: Callable, *args, **kwargs):
+    """
+    Run blocking database code on the bounded thread pool
+
+    func runs in a copy of the caller's context, so context variables
+    such as the metrics of the current request are visible to it.
+    """
+    def call():
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    context = contextvars.copy_context()
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_db_executor(), context.run, call)
+
+
+def render_view(view: Callable, request, *args, **kwargs):
+    """
+    Call sync view and render its response in the calling thread
+
+    The ASGI handler of Django 3.2 iterates streaming content on the event
+    loop, where the database can not be read, and collecting it here would
+    hold the whole body in memory. Views are told streaming is unsupported
+    with ``request.streaming_supported`` and have to answer without it.
+    """
+    request.streaming_supported = False
+    response = view(request, *args, **kwargs)
+    if hasattr(response, 'render') and not response.is_rendered:
+        response.render()
+    if response.streaming:
+        response.close()
+        raise ImproperlyConfigured(
+            f'{request.path} returned a streaming response to an async view'
+        )
+    return response
+
+
+def async_view(view: Callable) -> Callable:
+    """
+    Wrap sync view, running read requests on the database thread pool
+
+    Writes keep Django's default thread sensitive execution.
+    """
+    @functools.wraps(view)
+    async def wrapped(request, *args, **kwargs):
+        if request.method in SAFE_METHODS:
+            return await run_db(render_view, view, request, *args, **kwargs)
+        return await sync_to_async(render_view)(
+            view, request, *args, **kwargs
+        )
+
+    return wrapped
+
+
+def async_patterns(patterns) -> List:
+    """
+    Return copy of URL patterns with views wrapped by async_view
+    """
+    result = []
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            result.append(URLResolver(
+                pattern.pattern,
+                async_patterns(pattern.url_patterns),
+                pattern.default_kwargs,
+                pattern.app_name,
+                pattern.namespace,
+            ))
+        elif isinstance(pattern, URLPattern):
+            result.append(URLPattern(
+                pattern.pattern,
+                async_view(pattern.callback),
+                pattern.default_args,
+                pattern.name,
+            ))
+        else:
+            result.append(pattern)
+    return result
@@ -0,0 +1,141 @@
+import threading
+from collections import OrderedDict
+from copy import copy
+from hashlib import sha256
+from time import monotonic
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+
+class TokenCache:
+    """
+    Bounded in-process LRU of authenticated tokens with TTL
+
+    Entries are optionally mirrored to a Django cache backend, so that other
+    worker processes can skip the database too. Deletes reach the local LRU
+    and the shared backend; the LRU of other processes expires within TTL.
+    """
+    key_prefix = 'auth-token'
+
+    def __init__(self, max_size: int, ttl: float,
+                 backend: Optional[str] = None):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.backend = caches[backend] if backend else None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls) -> 'TokenCache':
+        options = getattr(settings, 'TOKEN_AUTH_CACHE', {})
+        return cls(
+            max_size=options.get('MAX_SIZE', 10000),
+            ttl=options.get('TTL', 60),
+            backend=options.get('BACKEND'),
+        )
+
+    def get(self, key: str) -> Optional[Token]:
+        """
+        Return cached token or None
+        """
+        now = monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires, token = entry
+                if expires > now:
+                    self._entries.move_to_end(key)
+                    return token
+                del self._entries[key]
+        if self.backend is None:
+            return None
+        token = self.backend.get(self.backend_key(key))
+        if token is not None:
+            self._store(key, token, now)
+        return token
+
+    def set(self, key: str, token: Token):
+        """
+        Cache token with its user
+        """
+        self._store(key, token, monotonic())
+        if self.backend is not None:
+            self.backend.set(self.backend_key(key), token, self.ttl)
+
+    def delete(self, *keys: str):
+        """
+        Drop tokens from cache
+        """
+        with self._lock:
+            for key in keys:
+                self._entries.pop(key, None)
+        if self.backend is not None and keys:
+            self.backend.delete_many([self.backend_key(key) for key in keys])
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _store(self, key: str, token: Token, now: float):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (now + self.ttl, token)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def backend_key(self, key: str) -> str:
+        return f'{self.key_prefix}:{sha256(key.encode()).hexdigest()}'
+
+
+_token_cache = None
+
+
+def get_token_cache() -> TokenCache:
+    """
+    Return process-wide token cache
+    """
+    global _token_cache
+    if _token_cache is None:
+        _token_cache = TokenCache.from_settings()
+    return _token_cache
+
+
+def reset_token_cache():
+    global _token_cache
+    _token_cache = None
+
+
+def invalidate_user_tokens(user_id: int):
+    """
+    Drop all cached tokens of user
+    """
+    keys = Token.objects.filter(user_id=user_id)\
+        .values_list('key', flat=True)
+    get_token_cache().delete(*keys)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """
+    Token authentication keeping token to user mapping in TokenCache
+    """
+    def authenticate_credentials(self, key):
+        """
+        Return user and token, hitting the database on cache miss only
+        """
+        cache = get_token_cache()
+        cached = cache.get(key)
+        if cached is None:
+            user, cached = super().authenticate_credentials(key)
+            cache.set(key, cached)
+        token = copy(cached)
+        token.user = copy(cached.user)
+        return token.user, token
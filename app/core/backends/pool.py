@@ -0,0 +1,185 @@
+import threading
+from time import monotonic
+from typing import Any, Callable, Dict, Hashable, List
+
+from django.db import OperationalError
+
+
+class ConnectionPool:
+    """
+    Thread safe pool of raw database connections of one worker process
+
+    ``max_size`` caps open connections, checked out ones included; callers
+    wait up to ``timeout`` seconds for a free connection. Connections are
+    checked with ``check`` before reuse when ``health_check`` is on and
+    closed once older than ``max_lifetime`` seconds.
+    """
+    def __init__(self, connect: Callable[[], Any],
+                 check: Callable[[Any], bool],
+                 reset: Callable[[Any], bool],
+                 close: Callable[[Any], None],
+                 max_size: int = 10, max_lifetime: float = 3600,
+                 timeout: float = 30, health_check: bool = True):
+        self.connect = connect
+        self.check = check
+        self.reset = reset
+        self.close_connection = close
+        self.max_size = max_size
+        self.max_lifetime = max_lifetime
+        self.timeout = timeout
+        self.health_check = health_check
+        self._idle: List[Any] = []
+        # Open connections and reserved slots by object, not by id(),
+        # which a closed connection may pass on to a new object
+        self._created: Dict[Any, float] = {}
+        self._condition = threading.Condition()
+        self._stats = dict.fromkeys(
+            ('checkouts', 'waits', 'timeouts', 'reconnects', 'created',
+             'closed'),
+            0
+        )
+
+    def get(self) -> Any:
+        """
+        Check out idle connection or open a new one
+        """
+        deadline = monotonic() + self.timeout
+        with self._condition:
+            self._stats['checkouts'] += 1
+            waited = False
+            while not self._idle and len(self._created) >= self.max_size:
+                if not waited:
+                    self._stats['waits'] += 1
+                    waited = True
+                remaining = deadline - monotonic()
+                if remaining <= 0:
+                    self._stats['timeouts'] += 1
+                    raise OperationalError(
+                        f'Connection pool exhausted, {self.max_size} '
+                        f'connections in use'
+                    )
+                self._condition.wait(remaining)
+            if self._idle:
+                connection = self._idle.pop()
+            else:
+                connection, reserved = None, object()
+                self._created[reserved] = 0
+        if connection is None:
+            return self._open(reserved)
+        if self._expired(connection) or (
+                self.health_check and not self.check(connection)):
+            with self._condition:
+                self._stats['reconnects'] += 1
+            return self._replace(connection)
+        return connection
+
+    def put(self, connection: Any):
+        """
+        Return connection to the pool, closing it when unusable or expired
+        """
+        if self._expired(connection) or not self.reset(connection):
+            self.discard(connection)
+            return
+        with self._condition:
+            self._idle.append(connection)
+            self._condition.notify()
+
+    def discard(self, connection: Any):
+        """
+        Close connection and free its slot
+        """
+        self._close(connection)
+        with self._condition:
+            self._created.pop(connection, None)
+            self._condition.notify()
+
+    def close_idle(self):
+        """
+        Close all idle connections
+        """
+        with self._condition:
+            idle, self._idle = self._idle, []
+        for connection in idle:
+            self.discard(connection)
+
+    def stats(self) -> Dict[str, int]:
+        with self._condition:
+            return dict(
+                self._stats,
+                size=len(self._created),
+                idle=len(self._idle),
+                max_size=self.max_size,
+            )
+
+    def _open(self, reserved: object) -> Any:
+        try:
+            connection = self.connect()
+        except Exception:
+            with self._condition:
+                self._created.pop(reserved, None)
+                self._condition.notify()
+            raise
+        with self._condition:
+            self._created.pop(reserved, None)
+            self._created[connection] = monotonic()
+            self._stats['created'] += 1
+        return connection
+
+    def _replace(self, connection: Any) -> Any:
+        self._close(connection)
+        with self._condition:
+            self._created.pop(connection, None)
+            reserved = object()
+            self._created[reserved] = 0
+        return self._open(reserved)
+
+    def _close(self, connection: Any):
+        try:
+            self.close_connection(connection)
+        except Exception:
+            pass
+        with self._condition:
+            self._stats['closed'] += 1
+
+    def _expired(self, connection: Any) -> bool:
+        created = self._created.get(connection)
+        return created is not None \
+            and monotonic() - created >= self.max_lifetime
+
+
+_pools: Dict[Hashable, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_pool(key: Hashable, factory: Callable[[], ConnectionPool]) \
+        -> ConnectionPool:
+    """
+    Return pool registered under key, creating it with factory
+    """
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = factory()
+        return pool
+
+
+def close_pools():
+    """
+    Close idle connections of all pools
+    """
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close_idle()
+
+
+def pool_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Return statistics of all pools by database alias and name
+    """
+    with _pools_lock:
+        pools = dict(_pools)
+    return {
+        ':'.join(str(part) for part in key): pool.stats()
+        for key, pool in pools.items()
+    }
@@ -0,0 +1,155 @@
+"""
+PostgreSQL backend with pooled connections and health checks
+
+Configured with the ``POOL`` key of the database settings:
+
+    ENABLED       check out connections from a per-process pool
+    MAX_SIZE      open connections per worker process
+    MAX_LIFETIME  seconds before a connection is replaced
+    TIMEOUT       seconds to wait for a free connection
+    HEALTH_CHECKS run ``SELECT 1`` before reusing a pooled connection, and
+                  at request start for persistent (CONN_MAX_AGE) ones
+"""
+from functools import partial
+from typing import Dict
+
+import psycopg2.extras
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.creation import DatabaseCreation \
+    as BaseDatabaseCreation
+from psycopg2 import Error as DatabaseError
+from psycopg2.extensions import TRANSACTION_STATUS_IDLE
+
+from core.backends.pool import ConnectionPool, get_pool, close_pools
+
+POOL_DEFAULTS = {
+    'ENABLED': False,
+    'MAX_SIZE': 10,
+    'MAX_LIFETIME': 3600,
+    'TIMEOUT': 30,
+    'HEALTH_CHECKS': True,
+}
+
+
+def check_connection(connection) -> bool:
+    """
+    Return whether connection answers a round trip
+    """
+    if connection.closed:
+        return False
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except DatabaseError:
+        return False
+    return True
+
+
+def reset_connection(connection) -> bool:
+    """
+    Roll back unfinished transaction, return whether connection is reusable
+    """
+    if connection.closed:
+        return False
+    try:
+        if connection.get_transaction_status() != TRANSACTION_STATUS_IDLE:
+            connection.rollback()
+    except DatabaseError:
+        return False
+    return True
+
+
+def connect(conn_params: Dict, options: Dict):
+    """
+    Open raw connection set up like Django's backend sets up new ones
+
+    Runs in the pool of the process, for whichever thread needs a new
+    connection, so it only uses the settings, never a DatabaseWrapper.
+    """
+    connection = base.Database.connect(**conn_params)
+    isolation_level = options.get('isolation_level')
+    if isolation_level is not None \
+            and isolation_level != connection.isolation_level:
+        connection.set_session(isolation_level=isolation_level)
+    # Leave JSON decoding to JSONField like Django's backend
+    psycopg2.extras.register_default_jsonb(
+        conn_or_curs=connection,
+        loads=lambda value: value
+    )
+    return connection
+
+
+class DatabaseCreation(BaseDatabaseCreation):
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Idle pooled connections would keep the test database in use
+        close_pools()
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+    reconnects = 0
+
+    @property
+    def pool_options(self):
+        return {**POOL_DEFAULTS, **self.settings_dict.get('POOL', {})}
+
+    def get_pool(self) -> ConnectionPool:
+        """
+        Return pool of this process for the configured database
+        """
+        options = self.pool_options
+        conn_params = self.get_connection_params()
+        key = (
+            self.alias,
+            conn_params.get('host'),
+            conn_params.get('port'),
+            conn_params.get('database'),
+        )
+        return get_pool(key, lambda: ConnectionPool(
+            connect=partial(
+                connect,
+                conn_params,
+                dict(self.settings_dict['OPTIONS'])
+            ),
+            check=check_connection,
+            reset=reset_connection,
+            close=lambda connection: connection.close(),
+            max_size=options['MAX_SIZE'],
+            max_lifetime=options['MAX_LIFETIME'],
+            timeout=options['TIMEOUT'],
+            health_check=options['HEALTH_CHECKS'],
+        ))
+
+    def get_new_connection(self, conn_params):
+        """
+        Check out pooled connection, set up this wrapper for it
+        """
+        if not self.pool_options['ENABLED']:
+            return super().get_new_connection(conn_params)
+        connection = self.get_pool().get()
+        options = self.settings_dict['OPTIONS']
+        self.isolation_level = options.get(
+            'isolation_level',
+            connection.isolation_level
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is None or not self.pool_options['ENABLED']:
+            return super()._close()
+        with self.wrap_database_errors:
+            self.get_pool().put(self.connection)
+
+    def close_if_unusable_or_obsolete(self):
+        """
+        Also check persistent connection with a round trip when enabled
+        """
+        super().close_if_unusable_or_obsolete()
+        if self.connection is None or self.pool_options['ENABLED'] \
+                or not self.pool_options['HEALTH_CHECKS'] \
+                or self.settings_dict['CONN_MAX_AGE'] == 0:
+            return
+        if not self.is_usable():
+            type(self).reconnects += 1
+            self.close()
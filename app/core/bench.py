@@ -0,0 +1,109 @@
+import tracemalloc
+from contextlib import contextmanager
+from math import ceil
+from time import perf_counter
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, \
+    setup_test_environment, teardown_test_environment
+
+# Metrics compared with a baseline and the smallest change reported for each
+BASELINE_METRICS = {
+    'p50_ms': 0.5,
+    'p95_ms': 1.0,
+    'queries': 0,
+    'alloc_bytes': 16 * 1024,
+}
+
+
+@contextmanager
+def test_database(verbosity: int = 0):
+    """
+    Create test database for a benchmark and drop it afterwards
+    """
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(verbosity=verbosity)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=verbosity)
+        teardown_test_environment()
+
+
+def percentile(values: Sequence[float], percent: float) -> float:
+    """
+    Return nearest-rank percentile of values
+    """
+    ordered = sorted(values)
+    rank = max(ceil(len(ordered) * percent / 100), 1)
+    return ordered[rank - 1]
+
+
+def timed_call(func: Callable[[], Any]) -> Tuple[Any, float]:
+    """
+    Call func, return its result and duration in milliseconds
+    """
+    started = perf_counter()
+    result = func()
+    return result, (perf_counter() - started) * 1000
+
+
+def profile_call(func: Callable[[], Any]) -> Tuple[Any, int, int]:
+    """
+    Call func, return its result, number of queries and peak allocation
+
+    Tracing is restarted for every call, so the peak only covers memory
+    allocated by the call itself.
+    """
+    tracemalloc.start()
+    try:
+        with CaptureQueriesContext(connection) as queries:
+            result = func()
+        _current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, len(queries.captured_queries), peak
+
+
+def summarize(durations: List[float], queries: List[int],
+              allocations: List[int]) -> Dict[str, float]:
+    """
+    Return latency percentiles and per-request queries and allocations
+    """
+    return {
+        'requests': len(durations),
+        'p50_ms': round(percentile(durations, 50), 3),
+        'p95_ms': round(percentile(durations, 95), 3),
+        'p99_ms': round(percentile(durations, 99), 3),
+        'queries': max(queries),
+        'alloc_bytes': int(sum(allocations) / len(allocations)),
+    }
+
+
+def compare_results(current: Dict[str, Dict[str, float]],
+                    baseline: Dict[str, Dict[str, float]],
+                    threshold: float) -> List[str]:
+    """
+    Return descriptions of metrics regressed beyond threshold
+
+    A metric regresses when it grows by more than ``threshold`` relative
+    to the baseline and by more than its ``BASELINE_METRICS`` minimum,
+    which keeps timer noise of very fast endpoints out of the report.
+    """
+    regressions = []
+    for name, expected in sorted(baseline.items()):
+        measured = current.get(name)
+        if measured is None:
+            continue
+        for metric, min_delta in BASELINE_METRICS.items():
+            if metric not in expected or metric not in measured:
+                continue
+            before, after = expected[metric], measured[metric]
+            if after > before * (1 + threshold) \
+                    and after - before > min_delta:
+                regressions.append(
+                    f'{name}: {metric} {before} -> {after}'
+                )
+    return regressions
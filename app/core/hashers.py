@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """
+    PBKDF2 hasher with iteration count taken from settings
+
+    Stored hashes keep their own iteration count, so changing
+    PASSWORD_HASHER_ITERATIONS re-hashes passwords on next login.
+    """
+    @property
+    def iterations(self) -> int:
+        return getattr(
+            settings,
+            'PASSWORD_HASHER_ITERATIONS',
+            hashers.PBKDF2PasswordHasher.iterations
+        )
@@ -0,0 +1,28 @@
+from typing import List
+
+from django.db import connections
+from django.db.migrations.executor import MigrationExecutor
+
+
+def check_database(alias: str = 'default'):
+    """
+    Run a round trip query, raise OperationalError if database is down
+    """
+    connection = connections[alias]
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+            cursor.fetchone()
+    except Exception:
+        connection.close()
+        raise
+
+
+def unapplied_migrations(alias: str = 'default') -> List[str]:
+    """
+    Return names of migrations not applied to database yet
+    """
+    executor = MigrationExecutor(connections[alias])
+    plan = executor.migration_plan(executor.loader.graph.leaf_nodes())
+    return [f'{migration.app_label}.{migration.name}'
+            for migration, backwards in plan]
@@ -0,0 +1,50 @@
+from django.contrib.postgres.search import SearchVector
+from django.core.management import BaseCommand
+from django.db import connection
+
+from core.models import Recipe, SEARCH_CONFIG
+
+
+class Command(BaseCommand):
+    """
+    Fill Recipe.search_vector of existing rows in batches
+    """
+    help = 'Fill Recipe.search_vector of existing rows in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Rebuild vectors which are already filled too'
+        )
+
+    def handle(self, *args, **options):
+        """
+        Update rows in primary key order, one short transaction per batch
+        """
+        if connection.vendor != 'postgresql':
+            self.stdout.write(
+                'Search vectors are only used on PostgreSQL, nothing to do'
+            )
+            return
+
+        queryset = Recipe.objects.order_by('id')
+        if not options['all']:
+            queryset = queryset.filter(search_vector__isnull=True)
+        batch_size = options['batch_size']
+        last_id = 0
+        updated = 0
+        while True:
+            ids = list(
+                queryset.filter(id__gt=last_id)
+                .values_list('id', flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            updated += Recipe.objects.filter(id__in=ids).update(
+                search_vector=SearchVector('title', config=SEARCH_CONFIG)
+            )
+            last_id = ids[-1]
+            self.stdout.write(f'Updated {updated} recipes')
+        self.stdout.write(self.style.SUCCESS(f'Done, {updated} recipes'))
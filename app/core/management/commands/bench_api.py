@@ -0,0 +1,407 @@
+import json
+from collections import namedtuple
+from itertools import count
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+from django.urls import URLResolver, get_resolver, reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.bench import compare_results, profile_call, summarize, \
+    test_database, timed_call
+from core.models import Ingredient, Recipe, RefreshToken, Tag
+from core.seed import DatasetSeeder
+
+# Benchmarked urlconfs with the namespaces they are included under
+BENCH_URLCONFS = (('recipe.urls', 'recipe'), ('user.urls', 'user'))
+
+BENCH_EMAIL = 'bench@example.com'
+BENCH_PASSWORD = 'bench-password'
+
+Endpoint = namedtuple('Endpoint', 'route method prepare status')
+
+
+class Command(BaseCommand):
+    """
+    Benchmark every API route in process with the test client
+    """
+    help = 'Seed a dataset, benchmark every API route and report JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tags', type=int, default=50)
+        parser.add_argument('--ingredients', type=int, default=100)
+        parser.add_argument('--recipes', type=int, default=1000)
+        parser.add_argument('--tags-per-recipe', type=int, default=3)
+        parser.add_argument('--ingredients-per-recipe', type=int, default=5)
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=50,
+            help='Timed requests per endpoint'
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=5,
+            help='Untimed requests per endpoint before timing'
+        )
+        parser.add_argument(
+            '--profile-iterations',
+            type=int,
+            default=5,
+            help='Requests per endpoint counting queries and allocations'
+        )
+        parser.add_argument(
+            '--warm-cache',
+            action='store_true',
+            help='Keep the recipe response cache enabled'
+        )
+        parser.add_argument(
+            '--current-database',
+            action='store_true',
+            help='Run against the configured database instead of a '
+                 'throwaway test database'
+        )
+        parser.add_argument('--output', help='Write JSON report to file')
+        parser.add_argument('--baseline', help='Baseline JSON report')
+        parser.add_argument(
+            '--save-baseline',
+            action='store_true',
+            help='Store this run as the baseline instead of comparing'
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.2,
+            help='Allowed relative growth of a metric, 0.2 is 20%%'
+        )
+
+    def handle(self, *args, **options):
+        if options['save_baseline'] and not options['baseline']:
+            raise CommandError('--save-baseline requires --baseline')
+        if options['iterations'] < 1 or options['profile_iterations'] < 1:
+            raise CommandError('Iterations have to be positive')
+        if options['recipes'] < 1:
+            raise CommandError('At least one recipe is required')
+
+        if options['current_database']:
+            report = self.run(options)
+        else:
+            with test_database():
+                report = self.run(options)
+
+        output = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as file:
+                file.write(output + '\n')
+        else:
+            self.stdout.write(output)
+
+        if options['baseline']:
+            if options['save_baseline']:
+                with open(options['baseline'], 'w') as file:
+                    file.write(output + '\n')
+                self.stderr.write(f'Baseline saved to {options["baseline"]}')
+            else:
+                self.compare(report, options['baseline'], options['threshold'])
+
+    def run(self, options) -> Dict[str, Any]:
+        """
+        Seed dataset and benchmark all endpoints
+        """
+        overrides = {}
+        if not options['warm_cache']:
+            overrides = {
+                'CACHES': {
+                    **settings.CACHES,
+                    'bench-dummy': {
+                        'BACKEND':
+                            'django.core.cache.backends.dummy.DummyCache',
+                    },
+                },
+                'RECIPE_RESPONSE_CACHE': {
+                    **settings.RECIPE_RESPONSE_CACHE,
+                    'BACKEND': 'bench-dummy',
+                },
+            }
+
+        with override_settings(**overrides):
+            user = self.seed(options)
+            client = APIClient()
+            token, _created = Token.objects.get_or_create(user=user)
+            client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+            endpoints = self.endpoints(user)
+            self.check_coverage(endpoints)
+            results = {}
+            for endpoint in endpoints:
+                name = f'{endpoint.method.upper()} {endpoint.route}'
+                results[name] = self.measure(client, endpoint, options)
+                self.stderr.write(
+                    f'{name}: p50 {results[name]["p50_ms"]} ms, '
+                    f'{results[name]["queries"]} queries'
+                )
+
+        return {
+            'database': connection.vendor,
+            'dataset': {
+                key: options[key]
+                for key in ('tags', 'ingredients', 'recipes',
+                            'tags_per_recipe', 'ingredients_per_recipe',
+                            'seed')
+            },
+            'iterations': options['iterations'],
+            'warm_cache': options['warm_cache'],
+            'endpoints': results,
+        }
+
+    def measure(self, client: APIClient, endpoint: Endpoint,
+                options) -> Dict[str, float]:
+        """
+        Return latency, query and allocation summary of endpoint
+        """
+        def request(prepared):
+            path, data = prepared
+            method = getattr(client, endpoint.method)
+            if data is None:
+                return method(path)
+            return method(path, data, format='json')
+
+        for _ in range(options['warmup']):
+            self.check_status(endpoint, request(endpoint.prepare()))
+
+        durations = []
+        for _ in range(options['iterations']):
+            prepared = endpoint.prepare()
+            response, duration = timed_call(lambda: request(prepared))
+            self.check_status(endpoint, response)
+            durations.append(duration)
+
+        queries, allocations = [], []
+        for _ in range(options['profile_iterations']):
+            prepared = endpoint.prepare()
+            response, executed, allocated = profile_call(
+                lambda: request(prepared)
+            )
+            self.check_status(endpoint, response)
+            queries.append(executed)
+            allocations.append(allocated)
+
+        return summarize(durations, queries, allocations)
+
+    @staticmethod
+    def check_status(endpoint: Endpoint, response):
+        if response.status_code != endpoint.status:
+            raise CommandError(
+                f'{endpoint.method.upper()} {endpoint.route} returned '
+                f'{response.status_code}, expected {endpoint.status}: '
+                f'{response.content[:200]!r}'
+            )
+
+    def endpoints(self, user) -> List[Endpoint]:
+        """
+        Return requests exercising every benchmarked route
+
+        ``prepare`` runs outside of the measurement and returns path and
+        payload of the next request, creating the objects it needs.
+        """
+        names = count()
+        tag_ids = list(
+            Tag.objects.filter(user=user).values_list('id', flat=True)[:10]
+        )
+        ingredient_ids = list(
+            Ingredient.objects.filter(user=user)
+            .values_list('id', flat=True)[:10]
+        )
+        recipe_ids = list(
+            Recipe.objects.filter(user=user).values_list('id', flat=True)[:10]
+        )
+
+        def static(url_name: str, data: Any = None, *args) -> Callable:
+            path = reverse(url_name, args=args)
+            return lambda: (path, data)
+
+        def named(url_name: str, build: Callable[[int], Any]) -> Callable:
+            path = reverse(url_name)
+            return lambda: (path, build(next(names)))
+
+        def recipe_payload(index: int) -> Dict[str, Any]:
+            return {
+                'title': f'Bench recipe {index}',
+                'time': 10,
+                'price': '5.00',
+                'tag': tag_ids[:3],
+                'ingredients': ingredient_ids[:5],
+            }
+
+        def new_recipe() -> Tuple[str, None]:
+            recipe = Recipe.objects.create(
+                user=user,
+                title='Bench recipe',
+                time=10,
+                price=5
+            )
+            return reverse('recipe:recipe-detail', args=[recipe.id]), None
+
+        def new_refresh_token(_index: int) -> Dict[str, str]:
+            _token, key = RefreshToken.objects.issue(user)
+            return {'refresh': key}
+
+        def renames(ids: List[int]) -> Callable[[int], List[Dict]]:
+            return lambda index: [
+                {'id': pk, 'name': f'Bench {index}'} for pk in ids
+            ]
+
+        def new_names(index: int) -> List[Dict[str, str]]:
+            return [{'name': f'Bench {index}-{item}'} for item in range(10)]
+
+        def user_payload(index: int) -> Dict[str, str]:
+            return {
+                'email': f'bench{index}@example.com',
+                'password': BENCH_PASSWORD,
+                'name': f'Bench {index}',
+            }
+
+        recipe_id = recipe_ids[0]
+        return [
+            Endpoint('recipe:api-root', 'get', static('recipe:api-root'), 200),
+            Endpoint('recipe:tag-list', 'get', static('recipe:tag-list'), 200),
+            Endpoint('recipe:tag-list', 'post', named(
+                'recipe:tag-list', lambda index: {'name': f'Bench {index}'}
+            ), 201),
+            Endpoint('recipe:tag-bulk', 'post',
+                     named('recipe:tag-bulk', new_names), 201),
+            Endpoint('recipe:tag-bulk', 'patch',
+                     named('recipe:tag-bulk', renames(tag_ids)), 200),
+            Endpoint('recipe:ingredient-list', 'get',
+                     static('recipe:ingredient-list'), 200),
+            Endpoint('recipe:ingredient-list', 'post', named(
+                'recipe:ingredient-list',
+                lambda index: {'name': f'Bench {index}'}
+            ), 201),
+            Endpoint('recipe:ingredient-bulk', 'post',
+                     named('recipe:ingredient-bulk', new_names), 201),
+            Endpoint('recipe:ingredient-bulk', 'patch', named(
+                'recipe:ingredient-bulk', renames(ingredient_ids)
+            ), 200),
+            Endpoint('recipe:stats', 'get', static('recipe:stats'), 200),
+            Endpoint('recipe:recipe-list', 'get',
+                     static('recipe:recipe-list'), 200),
+            Endpoint('recipe:recipe-list', 'post',
+                     named('recipe:recipe-list', recipe_payload), 201),
+            Endpoint('recipe:recipe-detail', 'get',
+                     static('recipe:recipe-detail', None, recipe_id), 200),
+            Endpoint('recipe:recipe-detail', 'put', static(
+                'recipe:recipe-detail', recipe_payload(0), recipe_id
+            ), 200),
+            Endpoint('recipe:recipe-detail', 'patch', static(
+                'recipe:recipe-detail', {'time': 20}, recipe_id
+            ), 200),
+            Endpoint('recipe:recipe-detail', 'delete', new_recipe, 204),
+            Endpoint('recipe:recipe-bulk', 'post', named(
+                'recipe:recipe-bulk',
+                lambda index: [recipe_payload(index)] * 10
+            ), 201),
+            Endpoint('recipe:recipe-bulk', 'patch', named(
+                'recipe:recipe-bulk',
+                lambda index: [{'id': pk, 'time': 15} for pk in recipe_ids]
+            ), 200),
+            Endpoint('user:create', 'post',
+                     named('user:create', user_payload), 201),
+            Endpoint('user:token', 'post', static('user:token', {
+                'email': BENCH_EMAIL,
+                'password': BENCH_PASSWORD,
+            }), 200),
+            Endpoint('user:token-refresh', 'post',
+                     named('user:token-refresh', new_refresh_token), 200),
+            Endpoint('user:me', 'get', static('user:me'), 200),
+            Endpoint('user:me', 'put', static('user:me', {
+                'email': BENCH_EMAIL,
+                'password': BENCH_PASSWORD,
+                'name': 'Bench',
+            }), 200),
+            Endpoint('user:me', 'patch',
+                     static('user:me', {'name': 'Bench user'}), 200),
+        ]
+
+    def check_coverage(self, endpoints: List[Endpoint]):
+        """
+        Fail when a route of benchmarked urlconfs has no endpoint
+        """
+        covered = {endpoint.route for endpoint in endpoints}
+        routes = set()
+        for urlconf, namespace in BENCH_URLCONFS:
+            routes |= self.route_names(
+                get_resolver(urlconf).url_patterns,
+                namespace
+            )
+        missing = sorted(routes - covered)
+        if missing:
+            raise CommandError(
+                f'No benchmark for routes: {", ".join(missing)}'
+            )
+
+    @classmethod
+    def route_names(cls, patterns, namespace: Optional[str]) -> Set[str]:
+        """
+        Return names of url patterns, nested includes too
+        """
+        names = set()
+        for pattern in patterns:
+            if isinstance(pattern, URLResolver):
+                nested = namespace
+                if pattern.namespace:
+                    nested = f'{namespace}:{pattern.namespace}'
+                names |= cls.route_names(pattern.url_patterns, nested)
+            elif pattern.name:
+                names.add(f'{namespace}:{pattern.name}')
+        return names
+
+    def seed(self, options):
+        """
+        Create benchmark user with tags, ingredients and recipes
+        """
+        user_model = get_user_model()
+        user = user_model.objects.filter(email=BENCH_EMAIL).first()
+        if user is None:
+            user = user_model.objects.create_user(BENCH_EMAIL, BENCH_PASSWORD)
+        seeder = DatasetSeeder(
+            tags=options['tags'],
+            ingredients=options['ingredients'],
+            recipes=options['recipes'],
+            tags_per_recipe=(options['tags_per_recipe'], ) * 2,
+            ingredients_per_recipe=(options['ingredients_per_recipe'], ) * 2,
+            seed=options['seed']
+        )
+        seeder.seed([user])
+        return user
+
+    def compare(self, report: Dict[str, Any], path: str, threshold: float):
+        """
+        Fail when metrics regressed against baseline beyond threshold
+        """
+        try:
+            with open(path) as file:
+                baseline = json.load(file)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f'Cannot read baseline {path}: {exc}')
+
+        regressions = compare_results(
+            report['endpoints'],
+            baseline.get('endpoints', {}),
+            threshold
+        )
+        if regressions:
+            for regression in regressions:
+                self.stderr.write(regression)
+            raise CommandError(
+                f'{len(regressions)} metrics regressed by more than '
+                f'{threshold:.0%} against {path}'
+            )
+        self.stderr.write(self.style.SUCCESS('No regressions'))
@@ -0,0 +1,16 @@
+from django.core.management import BaseCommand
+
+from core.models import RefreshToken
+
+
+class Command(BaseCommand):
+    """
+    Delete expired refresh tokens
+    """
+    help = 'Delete expired refresh tokens'
+
+    def handle(self, *args, **options):
+        deleted = RefreshToken.objects.prune()
+        self.stdout.write(
+            self.style.SUCCESS(f'Deleted {deleted} expired refresh tokens')
+        )
@@ -0,0 +1,38 @@
+from django.contrib.auth import get_user_model
+from django.core.management import BaseCommand
+
+from recipe.stats import rebuild_summary
+
+
+class Command(BaseCommand):
+    """
+    Recompute recipe summaries of users from their recipes
+    """
+    help = 'Recompute recipe summaries of users from their recipes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            action='append',
+            dest='users',
+            help='Id of user to rebuild, all users when omitted'
+        )
+
+    def handle(self, *args, **options):
+        """
+        Rebuild summaries one user at a time, report drifted ones
+        """
+        users = get_user_model().objects.order_by('id')
+        if options['users'] is not None:
+            users = users.filter(id__in=options['users'])
+        user_ids = users.values_list('id', flat=True).iterator()
+        checked = repaired = 0
+        for user_id in user_ids:
+            checked += 1
+            if rebuild_summary(user_id):
+                repaired += 1
+                self.stdout.write(f'Rebuilt summary of user {user_id}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Checked {checked} users, rebuilt {repaired} summaries'
+        ))
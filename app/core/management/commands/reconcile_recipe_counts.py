@@ -0,0 +1,61 @@
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+
+from core.models import Ingredient, Tag
+from recipe.counters import drifted_counts
+
+
+class Command(BaseCommand):
+    """
+    Repair recipe counts of tags and ingredients drifted from relations
+    """
+    help = 'Repair recipe counts of tags and ingredients in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Only report drifted counts, exit with status 1 if any'
+        )
+
+    def handle(self, *args, **options):
+        """
+        Recount objects in primary key order, one transaction per batch
+        """
+        batch_size = options['batch_size']
+        drifted = 0
+        for model in (Tag, Ingredient):
+            queryset = model.objects.order_by('id')
+            last_id = 0
+            fixed = 0
+            while True:
+                ids = list(
+                    queryset.filter(id__gt=last_id)
+                    .values_list('id', flat=True)[:batch_size]
+                )
+                if not ids:
+                    break
+                with transaction.atomic():
+                    rows = drifted_counts(
+                        model.objects.select_for_update()
+                        .filter(id__in=ids)
+                    )
+                    for pk, actual in rows:
+                        fixed += 1
+                        if not options['check']:
+                            model.objects.filter(pk=pk)\
+                                .update(recipe_count=actual)
+                last_id = ids[-1]
+            name = model._meta.verbose_name_plural
+            self.stdout.write(f'{name.capitalize()}: {fixed} drifted counts')
+            drifted += fixed
+
+        if options['check']:
+            if drifted:
+                raise CommandError(f'Found {drifted} drifted counts')
+            self.stdout.write(self.style.SUCCESS('Counts are current'))
+        else:
+            self.stdout.write(
+                self.style.SUCCESS(f'Done, repaired {drifted} counts')
+            )
@@ -0,0 +1,96 @@
+from argparse import ArgumentTypeError
+from time import perf_counter
+
+from django.core.management import BaseCommand
+
+from core.seed import DatasetSeeder, fan_out
+
+
+def relation_range(value: str):
+    try:
+        return fan_out(value)
+    except ValueError:
+        raise ArgumentTypeError(f'Expected N or MIN-MAX, got {value!r}')
+
+
+class Command(BaseCommand):
+    """
+    Generate users with tags, ingredients and recipes in bulk
+    """
+    help = 'Generate users with tags, ingredients and recipes in bulk'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument(
+            '--tags',
+            type=int,
+            default=20,
+            help='Tags per user'
+        )
+        parser.add_argument(
+            '--ingredients',
+            type=int,
+            default=50,
+            help='Ingredients per user'
+        )
+        parser.add_argument(
+            '--recipes',
+            type=int,
+            default=1000,
+            help='Recipes per user'
+        )
+        parser.add_argument(
+            '--tags-per-recipe',
+            type=relation_range,
+            default=(1, 4),
+            help='N or MIN-MAX tags of every recipe'
+        )
+        parser.add_argument(
+            '--ingredients-per-recipe',
+            type=relation_range,
+            default=(3, 8),
+            help='N or MIN-MAX ingredients of every recipe'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--password',
+            help='Password of all users, hashed once; unusable if omitted'
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=10000,
+            help='Recipes written per transaction'
+        )
+
+    def handle(self, *args, **options):
+        """
+        Create users first, then their data in batched transactions
+        """
+        started = perf_counter()
+        seeder = DatasetSeeder(
+            tags=options['tags'],
+            ingredients=options['ingredients'],
+            recipes=options['recipes'],
+            tags_per_recipe=options['tags_per_recipe'],
+            ingredients_per_recipe=options['ingredients_per_recipe'],
+            seed=options['seed'],
+            batch_size=options['batch_size']
+        )
+        users = seeder.create_users(options['users'], options['password'])
+
+        def progress(created):
+            self.stdout.write(
+                f'{created["recipes"]} recipes, '
+                f'{created["relations"]} relations, '
+                f'{perf_counter() - started:.1f}s'
+            )
+
+        created = seeder.seed(users, progress)
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {created["users"]} users, {created["tags"]} tags, '
+            f'{created["ingredients"]} ingredients, '
+            f'{created["recipes"]} recipes and '
+            f'{created["relations"]} relations '
+            f'in {perf_counter() - started:.1f}s'
+        ))
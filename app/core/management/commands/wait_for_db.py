@@ -1,24 +1,75 @@
-from time import sleep
+from time import monotonic, sleep
 
-from django.core.management import BaseCommand
-from django.db import connections, OperationalError
+from django.core.management import BaseCommand, CommandError
+from django.db import OperationalError
+
+from core.health import check_database, unapplied_migrations
 
 
 class Command(BaseCommand):
     """
     Wait for db available
     """
+    help = 'Wait until database answers queries, with exponential backoff'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+        parser.add_argument(
+            '--timeout',
+            type=float,
+            default=60,
+            help='Give up after this many seconds'
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0.5,
+            help='First delay between attempts, doubled after each one'
+        )
+        parser.add_argument('--max-interval', type=float, default=5)
+        parser.add_argument(
+            '--check-migrations',
+            action='store_true',
+            help='Also wait until all migrations are applied'
+        )
+
     def handle(self, *args, **options):
         """
-        pass
+        Retry round trip query until it succeeds or timeout is reached
         """
+        self.deadline = monotonic() + options['timeout']
+        self.options = options
         self.stdout.write('Waiting for db...')
-        db_connection = None
-        while not db_connection:
-            try:
-                db_connection = connections['default']
-            except OperationalError:
-                self.stdout.write('Database unavailable, waiting 1 sec..')
-                sleep(1)
-                continue
+        self.retry(
+            lambda: check_database(options['database']),
+            'Database unavailable'
+        )
+        if options['check_migrations']:
+            self.retry(self.check_migrations, 'Unapplied migrations')
         self.stdout.write(self.style.SUCCESS('Connected'))
+
+    def check_migrations(self):
+        migrations = unapplied_migrations(self.options['database'])
+        if migrations:
+            raise OperationalError(', '.join(migrations))
+
+    def retry(self, check, message: str):
+        """
+        Call check until it stops raising OperationalError
+        """
+        delay = self.options['interval']
+        while True:
+            try:
+                check()
+                return
+            except OperationalError as error:
+                remaining = self.deadline - monotonic()
+                if remaining <= 0:
+                    raise CommandError(
+                        f'{message} after {self.options["timeout"]:g} sec: '
+                        f'{error}'
+                    )
+                wait = min(delay, remaining)
+                self.stdout.write(f'{message}, waiting {wait:g} sec..')
+                sleep(wait)
+                delay = min(delay * 2, self.options['max_interval'])
@@ -0,0 +1,286 @@
+"""
+Response compression negotiated with ``Accept-Encoding``
+
+Configured with ``settings.RESPONSE_COMPRESSION``:
+
+    MIN_SIZE       smallest body in bytes worth compressing
+    LEVEL          zlib compression level, 1 fastest to 9 smallest
+    CACHE          cache alias holding compressed bodies, None disables
+    CACHE_TIMEOUT  seconds a compressed body is kept
+"""
+import asyncio
+import threading
+import zlib
+from hashlib import sha1
+from time import perf_counter, thread_time
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.utils.cache import patch_vary_headers
+
+from monitoring.metrics import current_metrics
+
+COMPRESSION_DEFAULTS = {
+    'MIN_SIZE': 1024,
+    'LEVEL': 6,
+    'CACHE': 'default',
+    'CACHE_TIMEOUT': 300,
+}
+# zlib window bits of supported encodings, in order of preference
+ENCODINGS = (
+    ('gzip', 16 + zlib.MAX_WBITS),
+    ('deflate', zlib.MAX_WBITS),
+)
+
+
+def compression_options() -> Dict:
+    return {
+        **COMPRESSION_DEFAULTS,
+        **getattr(settings, 'RESPONSE_COMPRESSION', {}),
+    }
+
+
+def parse_accept_encoding(header: str) -> Dict[str, float]:
+    """
+    Return quality of every coding listed in ``Accept-Encoding``
+    """
+    qualities = {}
+    for item in header.split(','):
+        coding, _sep, params = item.partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _sep, value = param.partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding] = quality
+    return qualities
+
+
+def select_encoding(header: str) -> Optional[str]:
+    """
+    Return supported encoding with the highest quality, None if none
+    """
+    qualities = parse_accept_encoding(header)
+    default = qualities.get('*', 0.0)
+    best, best_quality = None, 0.0
+    for encoding, _wbits in ENCODINGS:
+        quality = qualities.get(encoding, default)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compressor(encoding: str, level: int):
+    return zlib.compressobj(level, zlib.DEFLATED, dict(ENCODINGS)[encoding])
+
+
+class CompressionStats:
+    """
+    Compression counters of the serving worker process
+    """
+    counters = (
+        'responses', 'cache_hits', 'input_bytes', 'output_bytes',
+        'cpu_seconds',
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = dict.fromkeys(self.counters, 0)
+
+    def add(self, input_bytes: int, output_bytes: int,
+            cpu_seconds: float = 0.0, responses: int = 1,
+            cache_hits: int = 0):
+        with self._lock:
+            stats = self._stats
+            stats['responses'] += responses
+            stats['cache_hits'] += cache_hits
+            stats['input_bytes'] += input_bytes
+            stats['output_bytes'] += output_bytes
+            stats['cpu_seconds'] += cpu_seconds
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Return counters with ``saved_bytes``, input minus output
+        """
+        with self._lock:
+            stats = dict(self._stats)
+        stats['saved_bytes'] = stats['input_bytes'] - stats['output_bytes']
+        return stats
+
+    def reset(self):
+        with self._lock:
+            self._stats = dict.fromkeys(self.counters, 0)
+
+
+_stats = CompressionStats()
+
+
+def get_compression_stats() -> CompressionStats:
+    """
+    Return process-wide compression counters
+    """
+    return _stats
+
+
+class CompressionMiddleware:
+    """
+    Compress response bodies with gzip or deflate
+
+    Bodies of responses with an ETag, like the per-user version ETags of
+    the recipe API, are compressed once and reused from the cache while
+    the ETag stays the same, so polling an unchanged list costs a cache
+    read instead of a compression. Compressed responses get a weak ETag,
+    their bytes differ from the identity representation. Streaming
+    responses are compressed chunk by chunk.
+
+    Both sync and async capable, so it does not make Django serve ASGI
+    requests through a single thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Mark the instance as a coroutine function, like
+            # django.utils.deprecation.MiddlewareMixin does
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        return self.process_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        response = await self.get_response(request)
+        # Compression and cache access block, keep them off the event loop
+        return await sync_to_async(
+            self.process_response,
+            thread_sensitive=False
+        )(request, response)
+
+    def process_response(self, request, response):
+        options = compression_options()
+        if not self.is_compressible(response, options):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding', ))
+        encoding = select_encoding(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = self.compress_stream(
+                encoding, options['LEVEL'], response.streaming_content
+            )
+            del response['Content-Length']
+        else:
+            body = response.content
+            compressed = self.compress_body(
+                encoding, body, response, options
+            )
+            if compressed is None:
+                return response
+            response.content = compressed
+            response['Content-Length'] = str(len(compressed))
+
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = f'W/{etag}'
+        response['Content-Encoding'] = encoding
+        return response
+
+    @staticmethod
+    def is_compressible(response, options: Dict) -> bool:
+        if response.has_header('Content-Encoding') \
+                or 'no-transform' in response.get('Cache-Control', ''):
+            return False
+        return response.streaming \
+            or len(response.content) >= options['MIN_SIZE']
+
+    def compress_body(self, encoding: str, body: bytes, response,
+                      options: Dict) -> Optional[bytes]:
+        """
+        Return compressed body, None when it would not be smaller
+        """
+        stats = get_compression_stats()
+        key = self.cache_key(encoding, body, response, options)
+        cache = caches[options['CACHE']] if key else None
+        if cache is not None:
+            compressed = cache.get(key)
+            if compressed is not None:
+                stats.add(len(body), len(compressed), cache_hits=1)
+                return compressed
+
+        compressed, elapsed, cpu = self.compress(
+            encoding, options['LEVEL'], body
+        )
+        if len(compressed) >= len(body):
+            stats.add(0, 0, cpu, responses=0)
+            return None
+        stats.add(len(body), len(compressed), cpu)
+        metrics = current_metrics.get()
+        if metrics is not None:
+            metrics.compress_time += elapsed
+        if cache is not None:
+            cache.set(key, compressed, options['CACHE_TIMEOUT'])
+        return compressed
+
+    @staticmethod
+    def cache_key(encoding: str, body: bytes, response,
+                  options: Dict) -> Optional[str]:
+        """
+        Return cache key of compressed body, None if it can not be reused
+        """
+        etag = response.get('ETag')
+        if not etag or not options['CACHE'] or response.status_code != 200:
+            return None
+        digest = sha1(etag.encode()).hexdigest()
+        return (
+            f'compressed-response:{encoding}:{options["LEVEL"]}:'
+            f'{len(body)}:{digest}'
+        )
+
+    @staticmethod
+    def compress(encoding: str, level: int,
+                 body: bytes) -> Tuple[bytes, float, float]:
+        """
+        Return compressed body with wall clock and CPU seconds spent
+        """
+        started, cpu_started = perf_counter(), thread_time()
+        compress = compressor(encoding, level)
+        compressed = compress.compress(body) + compress.flush()
+        return (
+            compressed,
+            perf_counter() - started,
+            thread_time() - cpu_started,
+        )
+
+    @staticmethod
+    def compress_stream(encoding: str, level: int,
+                        chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """
+        Yield compressed chunks, flushing after every input chunk
+        """
+        stats = get_compression_stats()
+        compress = compressor(encoding, level)
+        for chunk in chunks:
+            cpu_started = thread_time()
+            data = compress.compress(chunk) + compress.flush(zlib.Z_SYNC_FLUSH)
+            stats.add(len(chunk), len(data), thread_time() - cpu_started, 0)
+            if data:
+                yield data
+        cpu_started = thread_time()
+        data = compress.flush()
+        stats.add(0, len(data), thread_time() - cpu_started)
+        yield data
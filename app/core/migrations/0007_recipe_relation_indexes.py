@@ -0,0 +1,27 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Indexes leading with the related id on recipe through tables
+
+    The unique (recipe_id, tag_id) constraint serves EXISTS probes per
+    recipe, these serve plans driven from the tag/ingredient side.
+    """
+
+    dependencies = [
+        ('core', '0006_refreshtoken'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX core_recipe_tag_tag_recipe_idx '
+            'ON core_recipe_tag (tag_id, recipe_id)',
+            'DROP INDEX core_recipe_tag_tag_recipe_idx',
+        ),
+        migrations.RunSQL(
+            'CREATE INDEX core_recipe_ingr_ingr_recipe_idx '
+            'ON core_recipe_ingredients (ingredient_id, recipe_id)',
+            'DROP INDEX core_recipe_ingr_ingr_recipe_idx',
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 3.2.25 on 2026-10-18 10:11
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+TRIGGER_SQL = """
+CREATE TRIGGER core_recipe_search_vector_trigger
+BEFORE INSERT OR UPDATE OF title ON core_recipe
+FOR EACH ROW EXECUTE FUNCTION
+tsvector_update_trigger(search_vector, 'pg_catalog.english', title)
+"""
+
+
+def create_search_objects(apps, schema_editor):
+    """
+    Create search vector trigger and GIN index on PostgreSQL only,
+    existing rows are filled by the backfill_search_vector command
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(TRIGGER_SQL)
+    schema_editor.execute(
+        'CREATE INDEX core_recipe_search_idx '
+        'ON core_recipe USING gin (search_vector)'
+    )
+
+
+def drop_search_objects(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS core_recipe_search_idx')
+    schema_editor.execute(
+        'DROP TRIGGER IF EXISTS core_recipe_search_vector_trigger '
+        'ON core_recipe'
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_recipe_relation_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_objects, drop_search_objects),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 3.2.25 on 2026-10-18 10:48
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_recipes(apps, schema_editor):
+    """
+    Fill recipe counts of existing tags and ingredients
+    """
+    Recipe = apps.get_model('core', 'Recipe')
+    for model_name, field in (('Tag', 'tag'), ('Ingredient', 'ingredients')):
+        through = getattr(Recipe, field).through
+        column = f'{model_name.lower()}_id'
+        counts = through.objects.filter(**{column: OuterRef('pk')})\
+            .order_by().values(column).annotate(recipes=Count('id'))\
+            .values('recipes')
+        apps.get_model('core', model_name).objects.update(
+            recipe_count=Coalesce(
+                Subquery(counts, output_field=IntegerField()), 0
+            )
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0009_recipe_summary'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='recipesummary',
+            name='tag_counts',
+        ),
+        migrations.AddField(
+            model_name='ingredient',
+            name='recipe_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='tag',
+            name='recipe_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='ingredient',
+            index=models.Index(fields=['user', 'recipe_count', 'id'], name='core_ingr_user_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tag',
+            index=models.Index(fields=['user', 'recipe_count', 'id'], name='core_tag_user_count_idx'),
+        ),
+        migrations.RunPython(count_recipes, migrations.RunPython.noop),
+    ]
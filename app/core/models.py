@@ -1,10 +1,17 @@
-from typing import Optional
+import secrets
+from hashlib import sha256
+from typing import Optional, Tuple
 
 from django.conf import settings
 from django.contrib.auth.models import PermissionsMixin, AbstractBaseUser, \
     BaseUserManager
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.db.models import Model
+from django.utils import timezone
+
+# Text search configuration of Recipe.search_vector trigger
+SEARCH_CONFIG = 'english'
 
 
 class UserManager(BaseUserManager):
@@ -45,7 +52,24 @@ class User(AbstractBaseUser, PermissionsMixin):
     USERNAME_FIELD = 'email'
 
 
-class Tag(Model):
+class RecipeCountMixin:
+    """
+    Model with ``recipe_count`` changed in the database only
+
+    Saves of existing objects leave the column out, so a stale value held
+    in memory does not overwrite counts changed since it was loaded.
+    """
+    def save(self, *args, update_fields=None, **kwargs):
+        if update_fields is None and not self._state.adding \
+                and not kwargs.get('force_insert'):
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != 'recipe_count'
+            ]
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+
+class Tag(RecipeCountMixin, Model):
     """
     Represent user's tag
     """
@@ -54,12 +78,23 @@ class Tag(Model):
         on_delete=models.CASCADE
     )
     name = models.CharField(max_length=255)
+    # Recipes using it, maintained by recipe.counters
+    recipe_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('user', 'name', 'id'),
+                         name='core_tag_user_name_idx'),
+            models.Index(fields=('user', 'id'), name='core_tag_user_id_idx'),
+            models.Index(fields=('user', 'recipe_count', 'id'),
+                         name='core_tag_user_count_idx'),
+        )
 
     def __str__(self):
         return self.name
 
 
-class Ingredient(Model):
+class Ingredient(RecipeCountMixin, Model):
     """
     Represent user's ingredient
     """
@@ -68,6 +103,17 @@ class Ingredient(Model):
         on_delete=models.CASCADE
     )
     name = models.CharField(max_length=255)
+    # Recipes using it, maintained by recipe.counters
+    recipe_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('user', 'name', 'id'),
+                         name='core_ingr_user_name_idx'),
+            models.Index(fields=('user', 'id'), name='core_ingr_user_id_idx'),
+            models.Index(fields=('user', 'recipe_count', 'id'),
+                         name='core_ingr_user_count_idx'),
+        )
 
     def __str__(self):
         return self.name
@@ -87,6 +133,106 @@ class Recipe(Model):
     link = models.CharField(max_length=255, blank=True)
     ingredients = models.ManyToManyField('Ingredient')
     tag = models.ManyToManyField('Tag')
+    # Maintained by database trigger on PostgreSQL, NULL elsewhere
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = (
+            models.Index(fields=('user', 'id'),
+                         name='core_recipe_user_id_idx'),
+        )
 
     def __str__(self):
         return self.title
+
+
+class RecipeSummary(Model):
+    """
+    Represents statistics of user's recipes
+
+    Kept up to date incrementally by ``recipe.stats`` on every recipe
+    change, so reading them does not scan the recipes. The histogram maps
+    upper bounds of ``TIME_BUCKETS`` to numbers of recipes, tag usage is
+    kept in ``Tag.recipe_count``.
+    """
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='recipe_summary'
+    )
+    recipe_count = models.PositiveIntegerField(default=0)
+    price_total = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=0
+    )
+    time_histogram = models.JSONField(default=dict)
+
+    def __str__(self):
+        return f'{self.recipe_count} recipes of {self.user_id}'
+
+
+class RefreshTokenManager(models.Manager):
+    """
+    Custom RefreshToken Manager
+    """
+    def issue(self, user) -> Tuple['RefreshToken', str]:
+        """
+        Create refresh token for user, return it with its raw key
+
+        Expired tokens of the user are deleted, rotated ones are deleted
+        when they are used.
+        """
+        key = secrets.token_urlsafe(32)
+        now = timezone.now()
+        self.filter(user=user, expires__lte=now).delete()
+        token = self.create(
+            user=user,
+            key_hash=RefreshToken.hash_key(key),
+            expires=now + settings.REFRESH_TOKEN_LIFETIME
+        )
+        return token, key
+
+    def prune(self) -> int:
+        """
+        Delete expired tokens of all users, return their number
+        """
+        deleted, _rows = self.filter(expires__lte=timezone.now()).delete()
+        return deleted
+
+    def get_active(self, key: str) -> Optional['RefreshToken']:
+        """
+        Return unexpired refresh token of active user or None
+        """
+        return self.select_related('user').filter(
+            key_hash=RefreshToken.hash_key(key),
+            expires__gt=timezone.now(),
+            user__is_active=True
+        ).first()
+
+
+class RefreshToken(Model):
+    """
+    Represents long-lived credential exchanged for an access token
+
+    Only a SHA-256 hash of the key is stored, so the lookup is a cheap
+    indexed equality match instead of a password hash check.
+    """
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='refresh_tokens'
+    )
+    key_hash = models.CharField(max_length=64, unique=True)
+    created = models.DateTimeField(auto_now_add=True)
+    expires = models.DateTimeField()
+
+    objects = RefreshTokenManager()
+
+    @staticmethod
+    def hash_key(key: str) -> str:
+        return sha256(key.encode()).hexdigest()
+
+    def __str__(self):
+        return f'{self.user} until {self.expires}'
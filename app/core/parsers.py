@@ -0,0 +1,32 @@
+"""
+JSON parser built on orjson, see ``core.renderers``
+"""
+from io import BytesIO
+
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+from core.renderers import FastJSONRenderer, fast_json_enabled, orjson
+
+
+class FastJSONParser(JSONParser):
+    """
+    JSON parser accepting the same documents as DRF's, faster
+
+    orjson only reads UTF-8. Other encodings and documents it rejects,
+    like integers over 64 bits, are parsed again by the standard library,
+    which also reports the errors.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if not fast_json_enabled() \
+                or encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+        body = stream.read()
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return super().parse(BytesIO(body), media_type, parser_context)
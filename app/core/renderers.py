@@ -0,0 +1,60 @@
+"""
+JSON renderer built on orjson
+
+``settings.API_JSON_BACKEND`` selects ``orjson`` or the standard library
+``json`` module, checked on every call so views holding renderer classes
+since import follow it. Without orjson installed, or for output orjson
+can not produce identically, the standard library renderer is used.
+"""
+from django.conf import settings
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+LINE_SEPARATOR = '\u2028'.encode()
+PARAGRAPH_SEPARATOR = '\u2029'.encode()
+
+
+def fast_json_enabled() -> bool:
+    """
+    Return whether orjson is installed and selected
+    """
+    return orjson is not None and settings.API_JSON_BACKEND == 'orjson'
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    JSON renderer producing the same bytes as DRF's, faster
+
+    Values orjson does not encode natively, like ``Decimal``, lazy
+    translation strings and datetimes, go through DRF's encoder, so their
+    representation does not change. Indented, ASCII-only or non-compact
+    output and values orjson rejects, like integers over 64 bits, are
+    rendered by the standard library.
+    """
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if not fast_json_enabled() or self.ensure_ascii \
+                or not self.compact or self.get_indent(
+                    accepted_media_type, renderer_context or {}
+                ) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_NON_STR_KEYS
+                | orjson.OPT_PASSTHROUGH_DATETIME
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same escaping as DRF, keeps JSON a strict JavaScript subset
+        if LINE_SEPARATOR in ret:
+            ret = ret.replace(LINE_SEPARATOR, b'\\u2028')
+        if PARAGRAPH_SEPARATOR in ret:
+            ret = ret.replace(PARAGRAPH_SEPARATOR, b'\\u2029')
+        return ret
@@ -0,0 +1,278 @@
+import random
+from bisect import bisect
+from collections import Counter
+from decimal import Decimal
+from itertools import accumulate
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+
+from core.models import Ingredient, Recipe, Tag
+from recipe.counters import RELATIONS_BY_THROUGH, change_counts
+
+TAG_NAMES = (
+    'Vegan', 'Vegetarian', 'Dessert', 'Breakfast', 'Dinner', 'Lunch',
+    'Quick', 'Spicy', 'Healthy', 'Comfort food', 'Gluten free', 'Italian',
+    'Asian', 'Mexican', 'Soup', 'Salad', 'Baking', 'Grill', 'Seafood',
+    'Low carb',
+)
+INGREDIENT_NAMES = (
+    'Salt', 'Pepper', 'Olive oil', 'Butter', 'Garlic', 'Onion', 'Tomato',
+    'Flour', 'Sugar', 'Egg', 'Milk', 'Rice', 'Pasta', 'Chicken', 'Beef',
+    'Salmon', 'Potato', 'Carrot', 'Lemon', 'Basil', 'Parsley', 'Cheese',
+    'Mushroom', 'Spinach', 'Ginger', 'Honey', 'Chili', 'Cream', 'Beans',
+    'Avocado',
+)
+DISHES = (
+    'soup', 'salad', 'stew', 'pie', 'risotto', 'curry', 'pasta', 'bake',
+    'stir fry', 'sandwich', 'tart', 'omelette',
+)
+STYLES = ('Quick', 'Classic', 'Spicy', 'Creamy', 'Roasted', 'Grandma\'s',
+          'Easy', 'Summer', 'Winter', 'Crispy')
+COOKING_TIMES = (5, 10, 15, 20, 25, 30, 40, 45, 60, 90, 120)
+
+
+def fan_out(value: str) -> Tuple[int, int]:
+    """
+    Parse ``N`` or ``MIN-MAX`` relations per recipe
+    """
+    low, _sep, high = value.partition('-')
+    low, high = int(low), int(high or low)
+    if low < 0 or high < low:
+        raise ValueError(f'Invalid range {value}')
+    return low, high
+
+
+class DatasetSeeder:
+    """
+    Deterministic generator of users, tags, ingredients and recipes
+
+    Rows are created with ``bulk_create`` and explicit primary keys
+    following the current maximum, so through table rows can be built
+    without reading keys back, on every backend. Popular tags and
+    ingredients are picked more often, like in real data. The same seed
+    on an empty database always produces the same rows.
+    """
+    def __init__(self, tags: int, ingredients: int, recipes: int,
+                 tags_per_recipe: Tuple[int, int] = (1, 4),
+                 ingredients_per_recipe: Tuple[int, int] = (3, 8),
+                 seed: int = 0, batch_size: int = 10000):
+        self.tags = tags
+        self.ingredients = ingredients
+        self.recipes = recipes
+        self.tags_per_recipe = tags_per_recipe
+        self.ingredients_per_recipe = ingredients_per_recipe
+        self.batch_size = batch_size
+        self.random = random.Random(seed)
+        self.next_ids = {}
+        self.pending = {}
+        self.recipe_counts = {}
+        self.created = dict.fromkeys(
+            ('users', 'tags', 'ingredients', 'recipes', 'relations'), 0
+        )
+
+    def create_users(self, count: int,
+                     password: Optional[str] = None) -> List:
+        """
+        Create users sharing one password hash
+
+        The password is hashed once instead of once per user, users get
+        an unusable password when none is given.
+        """
+        user_model = get_user_model()
+        encoded = make_password(password)
+        start = self.allocate_ids(user_model, count)
+        users = [
+            user_model(
+                id=start + index,
+                email=f'user{start + index}@example.com',
+                name=f'User {start + index}',
+                password=encoded
+            )
+            for index in range(count)
+        ]
+        with transaction.atomic():
+            user_model.objects.bulk_create(users, batch_size=self.batch_size)
+        self.reset_sequences(user_model)
+        self.created['users'] += count
+        return users
+
+    def seed(self, users: List,
+             progress: Optional[Callable[[Dict[str, int]], None]] = None):
+        """
+        Create tags, ingredients and recipes of every user
+
+        Rows are written in transactions of about ``batch_size`` recipes,
+        ``progress`` is called with created counts after each of them.
+        """
+        tag_weights = self.popularity(self.tags)
+        ingredient_weights = self.popularity(self.ingredients)
+        for user in users:
+            tag_ids = self.add_objects(Tag, user, self.tags, TAG_NAMES)
+            ingredient_ids = self.add_objects(
+                Ingredient, user, self.ingredients, INGREDIENT_NAMES
+            )
+            start = self.allocate_ids(Recipe, self.recipes)
+            for index in range(self.recipes):
+                recipe_id = start + index
+                self.add_recipe(user, recipe_id)
+                self.add_relations(
+                    Recipe.tag.through, recipe_id,
+                    tag_ids, tag_weights, self.tags_per_recipe
+                )
+                self.add_relations(
+                    Recipe.ingredients.through, recipe_id,
+                    ingredient_ids, ingredient_weights,
+                    self.ingredients_per_recipe
+                )
+                if len(self.pending[Recipe]) >= self.batch_size:
+                    self.flush(progress)
+        self.flush(progress)
+        self.reset_sequences(Tag, Ingredient, Recipe)
+        return self.created
+
+    def add_objects(self, model, user, count: int,
+                    names: Tuple[str, ...]) -> List[int]:
+        """
+        Queue named objects of user, return their ids
+        """
+        start = self.allocate_ids(model, count)
+        objs = self.pending.setdefault(model, [])
+        for index in range(count):
+            name = names[index % len(names)]
+            if index >= len(names):
+                name = f'{name} {index // len(names) + 1}'
+            objs.append(model(id=start + index, user_id=user.pk, name=name))
+        return list(range(start, start + count))
+
+    def add_recipe(self, user, recipe_id: int):
+        rand = self.random
+        self.pending.setdefault(Recipe, []).append(Recipe(
+            id=recipe_id,
+            user_id=user.pk,
+            title=f'{rand.choice(STYLES)} '
+                  f'{rand.choice(INGREDIENT_NAMES).lower()} '
+                  f'{rand.choice(DISHES)}',
+            time=rand.choice(COOKING_TIMES),
+            price=Decimal(rand.randint(100, 5000)) / 100,
+            link='' if rand.random() < 0.7
+            else f'https://example.com/recipes/{recipe_id}'
+        ))
+
+    def add_relations(self, through, recipe_id: int,
+                      ids: List[int], weights: List[float],
+                      fan: Tuple[int, int]):
+        """
+        Queue distinct related ids picked by popularity
+        """
+        if not ids:
+            return
+        rand = self.random
+        count = rand.randint(*fan)
+        total = weights[-1]
+        picked = dict.fromkeys(
+            ids[bisect(weights, rand.random() * total)]
+            for _ in range(count)
+        )
+        self.pending.setdefault(through, []).extend(
+            (recipe_id, pk) for pk in picked
+        )
+        self.recipe_counts.setdefault(through, Counter()).update(list(picked))
+
+    @staticmethod
+    def popularity(count: int) -> List[float]:
+        """
+        Return cumulative weights making first objects the most popular
+        """
+        return list(accumulate(1 / (rank + 1) for rank in range(count)))
+
+    def flush(self, progress=None):
+        """
+        Write queued rows in one transaction
+
+        Recipe counts of tags and ingredients are raised together with
+        their relations, grouped by the added count.
+        """
+        if not any(self.pending.values()):
+            return
+        with transaction.atomic():
+            for model in (Tag, Ingredient, Recipe):
+                objs = self.pending.pop(model, [])
+                if objs:
+                    model.objects.bulk_create(
+                        objs,
+                        batch_size=self.batch_size
+                    )
+                    self.count(model, len(objs))
+            for through in (Recipe.tag.through, Recipe.ingredients.through):
+                rows = self.pending.pop(through, [])
+                if rows:
+                    self.insert_relations(through, rows)
+                    self.count(through, len(rows))
+                    _column, model = RELATIONS_BY_THROUGH[through]
+                    change_counts(model, self.recipe_counts.pop(through))
+        if progress:
+            progress(dict(self.created))
+
+    @staticmethod
+    def insert_relations(through, rows: List[Tuple[int, int]]):
+        """
+        Insert ``(recipe_id, related_id)`` rows into a through table
+
+        Relations outnumber recipes several times, so they are written
+        as plain tuples with multi-row ``INSERT`` statements instead of
+        model instances, whose creation and per-value compilation in
+        ``bulk_create`` would dominate the run.
+        """
+        fields = [
+            field for field in through._meta.concrete_fields
+            if not field.primary_key
+        ]
+        quote = connection.ops.quote_name
+        size = min(connection.ops.bulk_batch_size(fields, rows), 1000)
+        prefix = (
+            f'INSERT INTO {quote(through._meta.db_table)} '
+            f'({", ".join(quote(field.column) for field in fields)}) VALUES '
+        )
+        with connection.cursor() as cursor:
+            for start in range(0, len(rows), size):
+                chunk = rows[start:start + size]
+                cursor.execute(
+                    prefix + ', '.join(['(%s, %s)'] * len(chunk)),
+                    [value for row in chunk for value in row]
+                )
+
+    def count(self, model, created: int):
+        if model is Tag:
+            self.created['tags'] += created
+        elif model is Ingredient:
+            self.created['ingredients'] += created
+        elif model is Recipe:
+            self.created['recipes'] += created
+        else:
+            self.created['relations'] += created
+
+    def allocate_ids(self, model, count: int) -> int:
+        """
+        Reserve count primary keys of model, return the first one
+        """
+        start = self.next_ids.get(model)
+        if start is None:
+            start = (model.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+        self.next_ids[model] = start + count
+        return start
+
+    @staticmethod
+    def reset_sequences(*models):
+        """
+        Move primary key sequences past the explicitly inserted keys
+        """
+        sql = connection.ops.sequence_reset_sql(no_style(), models)
+        if sql:
+            with connection.cursor() as cursor:
+                for statement in sql:
+                    cursor.execute(statement)
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from core.authentication import get_token_cache, invalidate_user_tokens, \
+    reset_token_cache
+
+
+@receiver(post_save, sender=Token)
+@receiver(post_delete, sender=Token)
+def invalidate_token(sender, instance, **kwargs):
+    """
+    Drop changed or deleted token from auth cache
+    """
+    get_token_cache().delete(instance.key)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_user(sender, instance, **kwargs):
+    """
+    Drop tokens of updated or deactivated user from auth cache
+
+    Dropped once more after commit, so a request authenticated before
+    the commit does not cache the user with its old password or state.
+    """
+    invalidate_user_tokens(instance.pk)
+    transaction.on_commit(lambda: invalidate_user_tokens(instance.pk))
+
+
+@receiver(setting_changed)
+def reset_token_cache_on_setting_change(setting, **kwargs):
+    if setting == 'TOKEN_AUTH_CACHE':
+        reset_token_cache()
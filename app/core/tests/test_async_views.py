@@ -0,0 +1,150 @@
+import asyncio
+import json
+import re
+from time import perf_counter, sleep
+
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import SimpleTestCase, TransactionTestCase, AsyncClient, \
+    override_settings
+from django.urls import path, reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+
+from core.async_views import async_patterns
+from core.models import Tag
+
+SLOW_VIEW_SECONDS = 0.3
+
+
+def slow_view(request):
+    sleep(SLOW_VIEW_SECONDS)
+    return HttpResponse(b'x' * 4096)
+
+
+# Served by AsyncMiddlewareTests through the ROOT_URLCONF setting
+urlpatterns = async_patterns([path('slow/', slow_view, name='slow')])
+
+
+@override_settings(ROOT_URLCONF='app.asgi_urls')
+class AsyncViewsTests(TransactionTestCase):
+    """
+    Test API served through async views of the ASGI deployment
+    """
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'mail@mail.com',
+            'password123',
+            name='name'
+        )
+        token = Token.objects.create(user=self.user)
+        self.client = AsyncClient()
+        self.auth = {'authorization': f'Token {token.key}'}
+
+    async def test_list_tags(self):
+        """
+        Test tags are listed through async view
+        """
+        await self.create_tag('Vegan')
+
+        response = await self.client.get(
+            reverse('recipe:tag-list'),
+            **self.auth
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = json.loads(response.content)['results']
+        self.assertEqual([tag['name'] for tag in results], ['Vegan'])
+
+    async def test_stream_tags_refused(self):
+        """
+        Test streamed list is refused instead of collected in memory
+        """
+        await self.create_tag('Vegan')
+
+        response = await self.client.get(
+            f"{reverse('recipe:tag-list')}?stream=true",
+            **self.auth
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('stream', json.loads(response.content))
+
+    async def test_server_timing_counts_pool_queries(self):
+        """
+        Test queries run on the database thread pool are measured
+        """
+        await self.create_tag('Vegan')
+
+        response = await self.client.get(
+            reverse('recipe:tag-list'),
+            **self.auth
+        )
+
+        queries = re.search(r'"(\d+) queries"', response['Server-Timing'])
+        self.assertGreater(int(queries.group(1)), 0)
+
+    async def test_retrieve_profile(self):
+        """
+        Test ManageUserView through async view
+        """
+        response = await self.client.get(reverse('user:me'), **self.auth)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            json.loads(response.content),
+            {'email': 'mail@mail.com', 'name': 'name'}
+        )
+
+    async def test_auth_required(self):
+        """
+        Test async views keep authentication
+        """
+        response = await AsyncClient().get(reverse('recipe:tag-list'))
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_create_tag(self):
+        """
+        Test writes still work through async view
+        """
+        response = await self.client.post(
+            reverse('recipe:tag-list'),
+            json.dumps({'name': 'Vegan'}),
+            content_type='application/json',
+            **self.auth
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    async def create_tag(self, name: str):
+        from asgiref.sync import sync_to_async
+        return await sync_to_async(Tag.objects.create)(
+            user=self.user,
+            name=name
+        )
+
+
+@override_settings(ROOT_URLCONF='core.tests.test_async_views')
+class AsyncMiddlewareTests(SimpleTestCase):
+    """
+    Test configured middleware keeps ASGI requests concurrent
+    """
+    async def test_concurrent_requests(self):
+        """
+        Test slow views of concurrent requests overlap
+        """
+        client = AsyncClient()
+        started = perf_counter()
+
+        responses = await asyncio.gather(*(
+            client.get('/slow/', **{'accept-encoding': 'gzip'})
+            for _ in range(8)
+        ))
+
+        elapsed = perf_counter() - started
+        for response in responses:
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('Server-Timing', response)
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertLess(elapsed, SLOW_VIEW_SECONDS * 4)
@@ -0,0 +1,132 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from core.authentication import TokenCache, get_token_cache
+from core.tests.utils import QueryBudgetMixin
+
+TAGS_URL = reverse('recipe:tag-list')
+
+
+class TokenCacheTests(TestCase):
+    """
+    Test in-process token LRU
+    """
+    def test_lru_eviction(self):
+        """
+        Test least recently used token is evicted
+        """
+        cache = TokenCache(max_size=2, ttl=60)
+        cache.set('a', 'token a')
+        cache.set('b', 'token b')
+        cache.get('a')
+        cache.set('c', 'token c')
+
+        self.assertEqual(cache.get('a'), 'token a')
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(len(cache), 2)
+
+    def test_ttl_expiry(self):
+        """
+        Test expired token is not returned
+        """
+        cache = TokenCache(max_size=2, ttl=0)
+        cache.set('a', 'token a')
+
+        self.assertIsNone(cache.get('a'))
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }})
+    def test_shared_backend(self):
+        """
+        Test token found in shared backend is returned
+        """
+        writer = TokenCache(max_size=10, ttl=60, backend='default')
+        reader = TokenCache(max_size=10, ttl=60, backend='default')
+        writer.set('a', 'token a')
+
+        self.assertEqual(reader.get('a'), 'token a')
+        writer.delete('a')
+        reader.clear()
+        self.assertIsNone(reader.get('a'))
+
+
+class CachedTokenAuthenticationTests(QueryBudgetMixin, TestCase):
+    """
+    Test token authentication backed by the token cache
+    """
+    def setUp(self):
+        get_token_cache().clear()
+        self.user = get_user_model().objects.create_user(
+            'mail@mail.com',
+            'password123'
+        )
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_cached_token_skips_lookup(self):
+        """
+        Test token is looked up in database once
+        """
+        self.client.get(TAGS_URL)
+
+        with self.assertMaxQueries(1):
+            response = self.client.get(TAGS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_deleted_token_rejected(self):
+        """
+        Test deleted token is dropped from cache
+        """
+        self.client.get(TAGS_URL)
+        self.token.delete()
+
+        response = self.client.get(TAGS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_deactivated_user_rejected(self):
+        """
+        Test deactivated user's token is dropped from cache
+        """
+        self.client.get(TAGS_URL)
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.get(TAGS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_token_cached_before_commit_dropped(self):
+        """
+        Test token cached during deactivation transaction is dropped
+        """
+        cache = get_token_cache()
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                self.user.is_active = False
+                self.user.save()
+                # Authentication of another request before the commit
+                cache.set(self.token.key, Token.objects.get(pk=self.token.pk))
+
+        self.assertIsNone(cache.get(self.token.key))
+
+    def test_updated_user_is_reloaded(self):
+        """
+        Test user update is visible through cached token
+        """
+        me_url = reverse('user:me')
+        self.client.get(me_url)
+        self.user.name = 'New name'
+        self.user.save()
+
+        response = self.client.get(me_url)
+
+        self.assertEqual(response.data['name'], 'New name')
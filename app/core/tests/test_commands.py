@@ -1,9 +1,23 @@
+import json
+import os
+from io import StringIO
+from tempfile import TemporaryDirectory
 from unittest.mock import patch
 
-from django.core.management import call_command
-from django.db import OperationalError
+from django.contrib.auth import get_user_model
+from django.core.management import call_command, CommandError
+from django.db import OperationalError, connection
 from django.test import TestCase
 
+from core.models import Recipe, Tag, Ingredient
+
+# Small dataset benchmarked within the test database
+BENCH_API_ARGS = (
+    'bench_api', '--current-database', '--tags', '5', '--ingredients', '5',
+    '--recipes', '5', '--iterations', '2', '--warmup', '0',
+    '--profile-iterations', '1',
+)
+
 
 class ManagementCommandTest(TestCase):
     """
@@ -13,17 +27,209 @@ class ManagementCommandTest(TestCase):
         """
         Test wait_for_db command when db is available
         """
-        with patch('django.db.utils.ConnectionHandler.__getitem__') as mocked:
-            mocked.return_value = True
-            call_command('wait_for_db')
+        with patch('core.management.commands.wait_for_db.check_database') \
+                as mocked:
+            call_command('wait_for_db', stdout=StringIO())
             self.assertEqual(mocked.call_count, 1)
 
-    @patch('time.sleep', return_value=True)
+    @patch('core.management.commands.wait_for_db.sleep', return_value=True)
     def test_wait_for_db(self, time_sleep):
         """
-        Test wait_for_db waiting for db
+        Test wait_for_db waiting for db with exponential backoff
         """
-        with patch('django.db.utils.ConnectionHandler.__getitem__') as mocked:
+        with patch('core.management.commands.wait_for_db.check_database') \
+                as mocked:
             mocked.side_effect = [OperationalError] * 5 + [True]
-            call_command('wait_for_db')
+            call_command('wait_for_db', '--max-interval', '4',
+                         stdout=StringIO())
             self.assertEqual(mocked.call_count, 6)
+        delays = [call.args[0] for call in time_sleep.call_args_list]
+        self.assertEqual(delays, [0.5, 1, 2, 4, 4])
+
+    @patch('core.management.commands.wait_for_db.sleep', return_value=True)
+    def test_wait_for_db_timeout(self, time_sleep):
+        """
+        Test wait_for_db gives up after timeout
+        """
+        with patch('core.management.commands.wait_for_db.check_database',
+                   side_effect=OperationalError('refused')):
+            with self.assertRaises(CommandError):
+                call_command('wait_for_db', '--timeout', '0',
+                             stdout=StringIO())
+        time_sleep.assert_not_called()
+
+    def test_wait_for_db_runs_query(self):
+        """
+        Test wait_for_db makes a round trip to the database
+        """
+        out = StringIO()
+
+        call_command('wait_for_db', '--check-migrations', stdout=out)
+
+        self.assertIn('Connected', out.getvalue())
+
+    @patch('core.management.commands.wait_for_db.sleep', return_value=True)
+    def test_wait_for_db_unapplied_migrations(self, time_sleep):
+        """
+        Test wait_for_db waits for migrations to be applied
+        """
+        with patch(
+                'core.management.commands.wait_for_db.unapplied_migrations',
+                side_effect=[['core.0099_new'], []]) as mocked:
+            call_command('wait_for_db', '--check-migrations',
+                         stdout=StringIO())
+        self.assertEqual(mocked.call_count, 2)
+
+    def test_backfill_search_vector(self):
+        """
+        Test backfill_search_vector fills vectors on PostgreSQL only
+        """
+        recipe = Recipe.objects.create(
+            user=get_user_model().objects.create_user('mail@mail.com', None),
+            title='Mushroom soup',
+            time=5,
+            price=5
+        )
+        Recipe.objects.update(search_vector=None)
+        out = StringIO()
+
+        call_command('backfill_search_vector', '--batch-size', '1', stdout=out)
+
+        recipe.refresh_from_db()
+        if connection.vendor == 'postgresql':
+            self.assertIsNotNone(recipe.search_vector)
+            self.assertIn('Done, 1 recipes', out.getvalue())
+        else:
+            self.assertIsNone(recipe.search_vector)
+
+    def test_bench_api_reports_every_route(self):
+        """
+        Test bench_api benchmarks all API routes and writes JSON report
+        """
+        with TemporaryDirectory() as directory:
+            baseline = os.path.join(directory, 'baseline.json')
+            call_command(*BENCH_API_ARGS, '--baseline', baseline,
+                         '--save-baseline', stdout=StringIO(),
+                         stderr=StringIO())
+            with open(baseline) as file:
+                report = json.load(file)
+
+        endpoints = report['endpoints']
+        self.assertIn('GET recipe:recipe-list', endpoints)
+        self.assertIn('DELETE recipe:recipe-detail', endpoints)
+        self.assertIn('POST user:token-refresh', endpoints)
+        for metrics in endpoints.values():
+            self.assertLessEqual(metrics['p50_ms'], metrics['p99_ms'])
+            self.assertGreater(metrics['alloc_bytes'], 0)
+
+    def test_bench_api_fails_on_regression(self):
+        """
+        Test bench_api exits with error when baseline is beaten
+        """
+        baseline = {'endpoints': {
+            'GET recipe:recipe-list': {'queries': 0, 'p50_ms': 0},
+        }}
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'baseline.json')
+            with open(path, 'w') as file:
+                json.dump(baseline, file)
+            with self.assertRaisesMessage(CommandError, 'regressed'):
+                call_command(*BENCH_API_ARGS, '--baseline', path,
+                             stdout=StringIO(), stderr=StringIO())
+
+    def seed_recipes(self, *args):
+        """
+        Run seed_recipes, return created recipes with their relations
+        """
+        call_command('seed_recipes', '--users', '2', '--tags', '3',
+                     '--ingredients', '25', '--recipes', '4', *args,
+                     stdout=StringIO())
+        return [
+            (recipe.user.email, recipe.title, recipe.time, recipe.price,
+             sorted(tag.name for tag in recipe.tag.all()),
+             sorted(item.name for item in recipe.ingredients.all()))
+            for recipe in Recipe.objects.order_by('id')
+            .select_related('user').prefetch_related('tag', 'ingredients')
+        ]
+
+    def test_seed_recipes(self):
+        """
+        Test seed_recipes creates users with their own related objects
+        """
+        self.seed_recipes('--tags-per-recipe', '2',
+                          '--ingredients-per-recipe', '3-5')
+
+        self.assertEqual(get_user_model().objects.count(), 2)
+        self.assertEqual(Tag.objects.count(), 6)
+        self.assertEqual(Ingredient.objects.count(), 50)
+        self.assertEqual(Recipe.objects.count(), 8)
+        for recipe in Recipe.objects.all():
+            self.assertIn(recipe.tag.count(), (1, 2))
+            self.assertLessEqual(recipe.ingredients.count(), 5)
+            self.assertFalse(
+                recipe.tag.exclude(user=recipe.user_id).exists()
+            )
+            self.assertFalse(
+                recipe.ingredients.exclude(user=recipe.user_id).exists()
+            )
+        user = get_user_model().objects.first()
+        self.assertFalse(user.has_usable_password())
+        out = StringIO()
+        call_command('reconcile_recipe_counts', '--check', stdout=out)
+        self.assertIn('Counts are current', out.getvalue())
+
+    def test_seed_recipes_deterministic(self):
+        """
+        Test seed_recipes generates the same data from the same seed
+        """
+        first = self.seed_recipes('--seed', '3')
+        get_user_model().objects.all().delete()
+        second = self.seed_recipes('--seed', '3')
+        get_user_model().objects.all().delete()
+        other = self.seed_recipes('--seed', '4')
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        new = Recipe.objects.create(
+            user=get_user_model().objects.first(),
+            title='Soup',
+            time=5,
+            price=5
+        )
+        self.assertGreater(new.id, Recipe.objects.exclude(id=new.id)
+                           .order_by('-id').first().id)
+
+    def test_reconcile_recipe_counts(self):
+        """
+        Test reconcile_recipe_counts repairs drifted counts in batches
+        """
+        user = get_user_model().objects.create_user('a@a.com', 'pass123')
+        tags = [Tag.objects.create(user=user, name=f'Tag {index}')
+                for index in range(3)]
+        salt = Ingredient.objects.create(user=user, name='Salt')
+        recipe = Recipe.objects.create(
+            user=user, title='Soup', time=5, price=5
+        )
+        recipe.tag.add(tags[0], tags[1])
+        recipe.ingredients.add(salt)
+        Tag.objects.filter(pk=tags[0].pk).update(recipe_count=7)
+        Tag.objects.filter(pk=tags[2].pk).update(recipe_count=2)
+        Ingredient.objects.filter(pk=salt.pk).update(recipe_count=0)
+
+        with self.assertRaises(CommandError):
+            call_command('reconcile_recipe_counts', '--check',
+                         stdout=StringIO())
+        self.assertEqual(Tag.objects.get(pk=tags[0].pk).recipe_count, 7)
+
+        out = StringIO()
+        call_command('reconcile_recipe_counts', '--batch-size', '2',
+                     stdout=out)
+
+        self.assertIn('Tags: 2 drifted counts', out.getvalue())
+        self.assertIn('Ingredients: 1 drifted counts', out.getvalue())
+        self.assertEqual(
+            list(Tag.objects.order_by('id')
+                 .values_list('recipe_count', flat=True)),
+            [1, 1, 0]
+        )
+        self.assertEqual(Ingredient.objects.get().recipe_count, 1)
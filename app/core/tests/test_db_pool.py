@@ -0,0 +1,161 @@
+import importlib.util
+import threading
+from unittest import skipUnless
+from unittest.mock import MagicMock, patch
+
+from django.db import OperationalError
+from django.test import SimpleTestCase
+
+from core.backends.pool import ConnectionPool
+
+
+class FakeConnection:
+    """
+    Raw connection stand-in tracking its state
+    """
+    def __init__(self):
+        self.usable = True
+        self.closed = False
+
+
+def make_pool(**kwargs) -> ConnectionPool:
+    defaults = {
+        'connect': FakeConnection,
+        'check': lambda connection: connection.usable,
+        'reset': lambda connection: not connection.closed,
+        'close': lambda connection: setattr(connection, 'closed', True),
+        'max_size': 2,
+        'max_lifetime': 3600,
+        'timeout': 0.05,
+    }
+    defaults.update(kwargs)
+    return ConnectionPool(**defaults)
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    """
+    Test database connection pool
+    """
+    def test_connection_reused(self):
+        """
+        Test returned connection is checked out again
+        """
+        pool = make_pool()
+        connection = pool.get()
+        pool.put(connection)
+
+        self.assertIs(pool.get(), connection)
+        stats = pool.stats()
+        self.assertEqual(stats['checkouts'], 2)
+        self.assertEqual(stats['created'], 1)
+
+    def test_unhealthy_connection_replaced(self):
+        """
+        Test connection failing health check is reconnected
+        """
+        pool = make_pool()
+        connection = pool.get()
+        pool.put(connection)
+        connection.usable = False
+
+        replacement = pool.get()
+
+        self.assertIsNot(replacement, connection)
+        self.assertTrue(connection.closed)
+        self.assertEqual(pool.stats()['reconnects'], 1)
+        self.assertEqual(pool.stats()['size'], 1)
+
+    def test_expired_connection_replaced(self):
+        """
+        Test connection is replaced after max lifetime
+        """
+        pool = make_pool(max_lifetime=10)
+        with patch('core.backends.pool.monotonic', return_value=100):
+            connection = pool.get()
+            pool.put(connection)
+        with patch('core.backends.pool.monotonic', return_value=111):
+            self.assertIsNot(pool.get(), connection)
+
+    def test_exhausted_pool_times_out(self):
+        """
+        Test checkout fails when all connections are in use
+        """
+        pool = make_pool()
+        # Kept referenced, like connections in use
+        connections = [pool.get(), pool.get()]
+
+        with self.assertRaises(OperationalError):
+            pool.get()
+        self.assertEqual(pool.stats()['waits'], 1)
+        self.assertEqual(pool.stats()['timeouts'], 1)
+        self.assertEqual(pool.stats()['size'], len(connections))
+
+    def test_waiting_checkout_gets_returned_connection(self):
+        """
+        Test waiting thread receives connection put back by another one
+        """
+        pool = make_pool(max_size=1, timeout=5)
+        connection = pool.get()
+        timer = threading.Timer(0.05, pool.put, args=(connection, ))
+        timer.start()
+
+        self.assertIs(pool.get(), connection)
+        timer.join()
+        self.assertEqual(pool.stats()['waits'], 1)
+
+    def test_failed_connect_frees_slot(self):
+        """
+        Test failing connect does not leak pool slot
+        """
+        def connect():
+            raise OperationalError('down')
+
+        pool = make_pool(connect=connect)
+        for _ in range(3):
+            with self.assertRaises(OperationalError):
+                pool.get()
+        self.assertEqual(pool.stats()['size'], 0)
+
+
+@skipUnless(importlib.util.find_spec('psycopg2'), 'psycopg2 is required')
+class PooledBackendTests(SimpleTestCase):
+    """
+    Test pooled PostgreSQL backend sets up connections per wrapper
+    """
+    def make_wrapper(self, alias='pooled'):
+        from core.backends.postgresql.base import DatabaseWrapper
+        return DatabaseWrapper({
+            'ENGINE': 'core.backends.postgresql',
+            'NAME': 'app', 'USER': 'app', 'PASSWORD': '', 'HOST': 'db',
+            'PORT': '', 'CONN_MAX_AGE': 0, 'ATOMIC_REQUESTS': False,
+            'AUTOCOMMIT': True, 'TIME_ZONE': None, 'TEST': {},
+            'OPTIONS': {'isolation_level': 2},
+            'POOL': {'ENABLED': True, 'MAX_SIZE': 2},
+        }, alias)
+
+    def tearDown(self):
+        from core.backends.pool import close_pools
+        close_pools()
+
+    def test_pool_connects_without_wrapper(self):
+        """
+        Test connections opened for one wrapper configure the other
+        """
+        from core.backends.postgresql import base
+        first, second = self.make_wrapper(), self.make_wrapper()
+        raw = MagicMock(isolation_level=1, closed=False)
+
+        with patch.object(base.base.Database, 'connect',
+                          return_value=raw) as connect, \
+                patch.object(base.psycopg2.extras, 'register_default_jsonb'):
+            first.get_pool()
+            connection = second.get_new_connection(
+                second.get_connection_params()
+            )
+
+        self.assertIs(connection, raw)
+        connect.assert_called_once_with(**first.get_connection_params())
+        raw.set_session.assert_called_once_with(isolation_level=2)
+        self.assertEqual(second.isolation_level, 2)
+        self.assertNotIn('isolation_level', vars(first))
+        self.assertIs(first.get_pool(), second.get_pool())
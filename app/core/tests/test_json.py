@@ -0,0 +1,120 @@
+from datetime import date, datetime, timezone
+from decimal import Decimal
+from io import BytesIO
+from unittest.mock import patch
+from uuid import UUID
+
+import orjson
+from django.test import SimpleTestCase, override_settings
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.serializer_helpers import ReturnDict
+
+from core.parsers import FastJSONParser
+from core.renderers import FastJSONRenderer
+
+PAYLOAD = {
+    'price': Decimal('12.50'),
+    'label': _('Invalid or expired refresh token'),
+    'created': datetime(2024, 5, 1, 12, 30, 15, 250, tzinfo=timezone.utc),
+    'naive': datetime(2024, 5, 1, 12, 30),
+    'day': date(2024, 5, 1),
+    'uuid': UUID('12345678-1234-5678-1234-567812345678'),
+    'nested': ReturnDict({'title': 'Crème brûlée '}, serializer=None),
+    'items': [1, 2.5, None, True, (3, 4)],
+    7: 'int key',
+}
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    """
+    Test orjson renderer output matches DRF's JSON renderer
+    """
+    def test_same_bytes(self):
+        """
+        Test Decimal, lazy strings, datetimes and escapes render identically
+        """
+        expected = JSONRenderer().render(PAYLOAD)
+
+        with patch('core.renderers.orjson.dumps', wraps=orjson.dumps) \
+                as dumps:
+            rendered = FastJSONRenderer().render(PAYLOAD)
+
+        self.assertEqual(rendered, expected)
+        self.assertEqual(dumps.call_count, 1)
+
+    def test_fallback(self):
+        """
+        Test indented output and large integers use the standard library
+        """
+        renderer = FastJSONRenderer()
+
+        self.assertEqual(
+            renderer.render({'a': [1]}, 'application/json; indent=2'),
+            JSONRenderer().render({'a': [1]}, 'application/json; indent=2')
+        )
+        self.assertEqual(
+            renderer.render([2 ** 70]),
+            b'[1180591620717411303424]'
+        )
+
+    @override_settings(API_JSON_BACKEND='json')
+    def test_json_backend_setting(self):
+        """
+        Test json backend bypasses orjson
+        """
+        with patch('core.renderers.orjson.dumps') as dumps:
+            rendered = FastJSONRenderer().render(PAYLOAD)
+
+        self.assertEqual(rendered, JSONRenderer().render(PAYLOAD))
+        dumps.assert_not_called()
+
+    def test_orjson_missing(self):
+        """
+        Test renderer and parser fall back when orjson is not installed
+        """
+        with patch('core.renderers.orjson', None), \
+                patch('core.parsers.orjson', None):
+            rendered = FastJSONRenderer().render(PAYLOAD)
+            parsed = FastJSONParser().parse(BytesIO(b'{"a": 1}'))
+
+        self.assertEqual(rendered, JSONRenderer().render(PAYLOAD))
+        self.assertEqual(parsed, {'a': 1})
+
+
+class FastJSONParserTests(SimpleTestCase):
+    """
+    Test orjson parser accepts and rejects the same documents as DRF's
+    """
+    def parse_both(self, body: bytes, encoding: str = 'utf-8'):
+        context = {'encoding': encoding}
+        return (
+            FastJSONParser().parse(BytesIO(body), parser_context=context),
+            JSONParser().parse(BytesIO(body), parser_context=context),
+        )
+
+    def test_parse(self):
+        """
+        Test documents parse to the same data
+        """
+        for body, encoding in (
+            ('{"tag": [1, 2], "price": "5.00", "title": "Crème"}'.encode(),
+             'utf-8'),
+            (b'[18446744073709551616]', 'utf-8'),
+            ('{"title": "Crème"}'.encode('latin-1'), 'latin-1'),
+        ):
+            fast, regular = self.parse_both(body, encoding)
+            self.assertEqual(fast, regular)
+
+    def test_invalid(self):
+        """
+        Test invalid documents raise DRF's parse error
+        """
+        for body in (b'{"a": ', b'[NaN]'):
+            with self.assertRaises(ParseError) as fast:
+                FastJSONParser().parse(BytesIO(body))
+            with self.assertRaises(ParseError) as regular:
+                JSONParser().parse(BytesIO(body))
+            self.assertEqual(str(fast.exception), str(regular.exception))
@@ -0,0 +1,147 @@
+import zlib
+from gzip import decompress
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.middleware import compressor, get_compression_stats, \
+    select_encoding
+from core.models import Tag
+
+TAGS_URL = reverse('recipe:tag-list')
+COMPRESSION = {
+    'MIN_SIZE': 200,
+    'LEVEL': 6,
+    'CACHE': 'default',
+    'CACHE_TIMEOUT': 300,
+}
+
+
+@override_settings(RESPONSE_COMPRESSION=COMPRESSION)
+class CompressionMiddlewareTests(TestCase):
+    """
+    Test negotiated response compression
+    """
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'mail@mail.com',
+            'password123'
+        )
+        self.client.force_authenticate(self.user)
+        Tag.objects.bulk_create([
+            Tag(user=self.user, name=f'Tag {index}') for index in range(50)
+        ])
+        cache.clear()
+        get_compression_stats().reset()
+
+    def test_select_encoding(self):
+        """
+        Test encoding with the highest quality is selected
+        """
+        self.assertEqual(select_encoding('gzip, deflate, br'), 'gzip')
+        self.assertEqual(select_encoding('gzip;q=0.5, deflate'), 'deflate')
+        self.assertEqual(select_encoding('*;q=0.1'), 'gzip')
+        self.assertIsNone(select_encoding('gzip;q=0, identity'))
+        self.assertIsNone(select_encoding(''))
+
+    def test_gzip(self):
+        """
+        Test large response is gzipped with weak ETag and Vary
+        """
+        identity = self.client.get(TAGS_URL)
+
+        response = self.client.get(TAGS_URL, HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(response['ETag'], f'W/{identity["ETag"]}')
+        self.assertEqual(decompress(response.content), identity.content)
+        self.assertEqual(
+            int(response['Content-Length']),
+            len(response.content)
+        )
+
+    def test_deflate(self):
+        """
+        Test deflate is used when preferred by client
+        """
+        response = self.client.get(
+            TAGS_URL,
+            HTTP_ACCEPT_ENCODING='gzip;q=0.5, deflate'
+        )
+
+        self.assertEqual(response['Content-Encoding'], 'deflate')
+        self.assertTrue(zlib.decompress(response.content).startswith(b'{'))
+
+    def test_small_or_not_accepted(self):
+        """
+        Test small responses and clients without gzip get identity
+        """
+        response = self.client.get(TAGS_URL)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+        Tag.objects.filter(user=self.user).exclude(name='Tag 1').delete()
+        response = self.client.get(TAGS_URL, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_compressed_body_reused(self):
+        """
+        Test unchanged list is compressed once and recompressed on change
+        """
+        with patch('core.middleware.compressor', wraps=compressor) as mocked:
+            first = self.client.get(TAGS_URL, HTTP_ACCEPT_ENCODING='gzip')
+            second = self.client.get(TAGS_URL, HTTP_ACCEPT_ENCODING='gzip')
+            self.assertEqual(mocked.call_count, 1)
+            self.assertEqual(second.content, first.content)
+
+            Tag.objects.create(user=self.user, name='New tag')
+            third = self.client.get(TAGS_URL, HTTP_ACCEPT_ENCODING='gzip')
+            self.assertEqual(mocked.call_count, 2)
+            self.assertIn(b'New tag', decompress(third.content))
+
+        stats = get_compression_stats().stats()
+        self.assertEqual(stats['responses'], 3)
+        self.assertEqual(stats['cache_hits'], 1)
+        self.assertGreater(stats['saved_bytes'], 0)
+        self.assertGreater(stats['cpu_seconds'], 0)
+
+    def test_not_modified_with_weak_etag(self):
+        """
+        Test weak ETag of compressed response answers a conditional GET
+        """
+        response = self.client.get(TAGS_URL, HTTP_ACCEPT_ENCODING='gzip')
+
+        response = self.client.get(
+            TAGS_URL,
+            HTTP_ACCEPT_ENCODING='gzip',
+            HTTP_IF_NONE_MATCH=response['ETag']
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_streaming(self):
+        """
+        Test streamed list is compressed chunk by chunk
+        """
+        identity = self.client.get(TAGS_URL, {'stream': 'true'})
+
+        response = self.client.get(
+            TAGS_URL,
+            {'stream': 'true'},
+            HTTP_ACCEPT_ENCODING='gzip'
+        )
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.has_header('Content-Length'))
+        self.assertEqual(
+            decompress(b''.join(response.streaming_content)),
+            b''.join(identity.streaming_content)
+        )
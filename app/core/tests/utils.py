@@ -0,0 +1,34 @@
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin pinning the maximum number of queries per endpoint
+    """
+    @contextmanager
+    def assertMaxQueries(self, max_queries: int):
+        """
+        Fail if the wrapped block runs more than ``max_queries`` queries
+        """
+        with CaptureQueriesContext(connection) as context:
+            yield context
+        executed = len(context.captured_queries)
+        if executed > max_queries:
+            queries = '\n'.join(
+                f'{index}. {query["sql"]}'
+                for index, query in enumerate(context.captured_queries, 1)
+            )
+            self.fail(
+                f'{executed} queries executed, {max_queries} allowed:\n'
+                f'{queries}'
+            )
+
+    def assertQueryBudget(self, max_queries: int, method, *args, **kwargs):
+        """
+        Call ``method`` within the query budget and return its result
+        """
+        with self.assertMaxQueries(max_queries):
+            return method(*args, **kwargs)
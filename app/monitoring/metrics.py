@@ -0,0 +1,200 @@
+import threading
+from bisect import bisect_left
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+# Upper bounds of histogram buckets, Prometheus client defaults
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class RequestMetrics:
+    """
+    Timings collected while one request is served
+    """
+    __slots__ = (
+        'started', 'db_time', 'queries', 'serializer_time', 'compress_time',
+    )
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.db_time = 0.0
+        self.queries = 0
+        self.serializer_time = 0.0
+        self.compress_time = 0.0
+
+    def server_timing(self, total: float) -> str:
+        """
+        Return ``Server-Timing`` header value, durations in milliseconds
+        """
+        return (
+            f'total;dur={total * 1000:.2f}, '
+            f'db;dur={self.db_time * 1000:.2f};'
+            f'desc="{self.queries} queries", '
+            f'serializer;dur={self.serializer_time * 1000:.2f}, '
+            f'compress;dur={self.compress_time * 1000:.2f}'
+        )
+
+
+# Metrics of the request served in the current context, None outside
+current_metrics = ContextVar('current_metrics', default=None)
+
+
+def record_query(execute, sql, params, many, context):
+    """
+    Database execute wrapper adding query time to current request
+    """
+    metrics = current_metrics.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.db_time += perf_counter() - started
+        metrics.queries += 1
+
+
+class Histogram:
+    """
+    Cumulative histogram in Prometheus layout
+    """
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        index = bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self) -> Iterator[Tuple[str, int]]:
+        """
+        Yield ``le`` labels with cumulative counts, ``+Inf`` last
+        """
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            yield format_value(bound), total
+        yield '+Inf', self.count
+
+
+class MetricsRegistry:
+    """
+    Per-route request histograms of the serving worker process
+    """
+    histograms = (
+        ('http_request_duration_seconds',
+         'Time from first middleware to response', DURATION_BUCKETS),
+        ('http_request_db_duration_seconds',
+         'Time spent executing database queries', DURATION_BUCKETS),
+        ('http_request_serializer_duration_seconds',
+         'Time spent building serializer data', DURATION_BUCKETS),
+        ('http_request_queries',
+         'Database queries executed per request', QUERY_BUCKETS),
+    )
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[str, str, str], List[Histogram]] = {}
+
+    def observe(self, route: str, method: str, status: int,
+                metrics: RequestMetrics, total: float):
+        """
+        Add finished request to histograms of its route
+        """
+        labels = (route, method, f'{status // 100}xx')
+        values = (
+            total, metrics.db_time, metrics.serializer_time, metrics.queries
+        )
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [
+                    Histogram(buckets) for _name, _help, buckets
+                    in self.histograms
+                ]
+            for histogram, value in zip(series, values):
+                histogram.observe(value)
+
+    def reset(self):
+        with self._lock:
+            self._series = {}
+
+    def exposition(self) -> str:
+        """
+        Return histograms in Prometheus text exposition format
+        """
+        with self._lock:
+            series = {
+                labels: [
+                    (list(histogram.samples()), histogram.sum,
+                     histogram.count)
+                    for histogram in histograms
+                ]
+                for labels, histograms in sorted(self._series.items())
+            }
+        lines = []
+        for index, (name, help_text, _buckets) in enumerate(self.histograms):
+            lines.append(f'# HELP {name} {help_text}')
+            lines.append(f'# TYPE {name} histogram')
+            for (route, method, status), histograms in series.items():
+                samples, total, count = histograms[index]
+                labels = format_labels(
+                    route=route, method=method, status=status
+                )
+                for bound, cumulative in samples:
+                    lines.append(
+                        f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+                    )
+                lines.append(f'{name}_sum{{{labels}}} {format_value(total)}')
+                lines.append(f'{name}_count{{{labels}}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+def format_samples(name: str, help_text: str, kind: str,
+                   samples: Iterable[Tuple[Dict[str, str], float]]) -> str:
+    """
+    Return one metric family in Prometheus text exposition format
+    """
+    lines = [f'# HELP {name} {help_text}', f'# TYPE {name} {kind}']
+    for labels, value in samples:
+        lines.append(
+            f'{name}{{{format_labels(**labels)}}} {format_value(value)}'
+        )
+    return '\n'.join(lines) + '\n'
+
+
+def format_labels(**labels) -> str:
+    return ','.join(
+        f'{name}="{escape_label(str(value))}"'
+        for name, value in labels.items()
+    )
+
+
+def escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"')\
+        .replace('\n', '\\n')
+
+
+def format_value(value: float) -> str:
+    return repr(float(value))
+
+
+_registry = MetricsRegistry()
+
+
+def get_registry() -> MetricsRegistry:
+    """
+    Return process-wide metrics registry
+    """
+    return _registry
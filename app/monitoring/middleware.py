@@ -0,0 +1,67 @@
+import asyncio
+from time import perf_counter
+
+from monitoring.metrics import RequestMetrics, current_metrics, get_registry
+
+UNMATCHED_ROUTE = '<unmatched>'
+
+
+class MetricsMiddleware:
+    """
+    Measure requests, add ``Server-Timing`` header and record histograms
+
+    Query time is collected by ``record_query``, installed on every
+    database connection, and serializer time by ``TimedSerializerMixin``,
+    both through the ``current_metrics`` context variable, so views served
+    on other threads are measured too. Streaming responses are measured
+    until the response object is returned, not until the body is sent.
+
+    Both sync and async capable, so it does not make Django serve ASGI
+    requests through a single thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.registry = get_registry()
+        if asyncio.iscoroutinefunction(get_response):
+            # Mark the instance as a coroutine function, like
+            # django.utils.deprecation.MiddlewareMixin does
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.__acall__(request)
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.record(request, response, metrics)
+
+    async def __acall__(self, request):
+        metrics = RequestMetrics()
+        token = current_metrics.set(metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_metrics.reset(token)
+        return self.record(request, response, metrics)
+
+    def record(self, request, response, metrics: RequestMetrics):
+        """
+        Add ``Server-Timing`` header and observe request in the registry
+        """
+        total = perf_counter() - metrics.started
+        response['Server-Timing'] = metrics.server_timing(total)
+        match = request.resolver_match
+        self.registry.observe(
+            match.view_name if match else UNMATCHED_ROUTE,
+            request.method,
+            response.status_code,
+            metrics,
+            total
+        )
+        return response
@@ -0,0 +1,27 @@
+from time import perf_counter
+
+from rest_framework.serializers import ListSerializer
+
+from monitoring.metrics import current_metrics
+
+
+class TimedSerializerMixin:
+    """
+    Add time spent building ``.data`` to metrics of current request
+    """
+    @property
+    def data(self):
+        metrics = current_metrics.get()
+        if metrics is None:
+            return super().data
+        started = perf_counter()
+        try:
+            return super().data
+        finally:
+            metrics.serializer_time += perf_counter() - started
+
+
+class TimedListSerializer(TimedSerializerMixin, ListSerializer):
+    """
+    List serializer timing ``.data`` of ``many=True`` serializers
+    """
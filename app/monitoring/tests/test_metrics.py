@@ -0,0 +1,140 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Tag
+from monitoring.metrics import Histogram, get_registry
+
+METRICS_URL = reverse('monitoring:metrics')
+TAGS_URL = reverse('recipe:tag-list')
+
+
+def server_timing(response) -> dict:
+    """
+    Return durations and query count of Server-Timing header
+    """
+    header = response['Server-Timing']
+    timings = {
+        name: float(value)
+        for name, value in re.findall(r'(\w+);dur=([\d.]+)', header)
+    }
+    timings['queries'] = int(re.search(r'"(\d+) queries"', header).group(1))
+    return timings
+
+
+class MetricsMiddlewareTests(TestCase):
+    """
+    Test per-request measurements
+    """
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'mail@mail.com',
+            'password123'
+        )
+        self.client.force_authenticate(self.user)
+        get_registry().reset()
+
+    def test_server_timing_header(self):
+        """
+        Test response reports total, database and serializer time
+        """
+        Tag.objects.create(user=self.user, name='Vegan')
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(TAGS_URL)
+
+        timings = server_timing(response)
+        self.assertEqual(timings['queries'], len(context.captured_queries))
+        self.assertGreater(timings['db'], 0)
+        self.assertGreater(timings['serializer'], 0)
+        self.assertGreaterEqual(
+            timings['total'],
+            timings['db'] + timings['serializer']
+        )
+
+    def test_histograms_per_route(self):
+        """
+        Test requests are aggregated by route, method and status class
+        """
+        self.client.get(TAGS_URL)
+        self.client.get(TAGS_URL)
+        self.client.post(TAGS_URL, {'name': ''})
+
+        exposition = get_registry().exposition()
+
+        self.assertIn(
+            'http_request_duration_seconds_count{route="recipe:tag-list",'
+            'method="GET",status="2xx"} 2',
+            exposition
+        )
+        self.assertIn(
+            'http_request_queries_count{route="recipe:tag-list",'
+            'method="POST",status="4xx"} 1',
+            exposition
+        )
+
+    def test_histogram_buckets_are_cumulative(self):
+        """
+        Test bucket counts include all smaller buckets
+        """
+        histogram = Histogram((1, 5))
+        for value in (0.5, 1, 3, 10):
+            histogram.observe(value)
+
+        self.assertEqual(
+            list(histogram.samples()),
+            [('1.0', 2), ('5.0', 3), ('+Inf', 4)]
+        )
+        self.assertEqual(histogram.sum, 14.5)
+
+
+class MetricsViewTests(TestCase):
+    """
+    Test Prometheus metrics endpoint
+    """
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_staff_only(self):
+        """
+        Test regular users can not read metrics
+        """
+        user = get_user_model().objects.create_user('mail@mail.com', None)
+        self.client.force_authenticate(user)
+
+        response = self.client.get(METRICS_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_prometheus_text(self):
+        """
+        Test staff user reads metrics in Prometheus text format
+        """
+        admin = get_user_model().objects.create_superuser(
+            'admin@mail.com',
+            'password123'
+        )
+        self.client.force_authenticate(admin)
+        get_registry().reset()
+        self.client.get(TAGS_URL)
+
+        response = self.client.get(METRICS_URL, HTTP_ACCEPT='text/plain')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        body = response.content.decode()
+        self.assertIn('# TYPE http_request_duration_seconds histogram', body)
+        self.assertIn(
+            'http_request_duration_seconds_bucket{route="recipe:tag-list",'
+            'method="GET",status="2xx",le="+Inf"} 1',
+            body
+        )
+        self.assertIn('recipe_response_cache_hits_total', body)
+        self.assertIn('http_compression_saved_bytes_total', body)
@@ -0,0 +1,86 @@
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import OperationalError
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+DB_POOL_URL = reverse('monitoring:db-pool')
+LIVE_URL = reverse('monitoring:live')
+READY_URL = reverse('monitoring:ready')
+
+
+class ProbeTests(TestCase):
+    """
+    Test liveness and readiness probes
+    """
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_live_without_database(self):
+        """
+        Test liveness probe runs no queries and needs no auth
+        """
+        with self.assertNumQueries(0):
+            response = self.client.get(LIVE_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_ready(self):
+        """
+        Test readiness probe checks database
+        """
+        with self.assertNumQueries(1):
+            response = self.client.get(READY_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, {'status': 'ok'})
+
+    @patch('monitoring.views.check_database', side_effect=OperationalError)
+    def test_not_ready(self, check_database):
+        """
+        Test readiness probe fails while database is down
+        """
+        response = self.client.get(READY_URL)
+
+        self.assertEqual(
+            response.status_code,
+            status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+
+
+class DatabasePoolStatsTests(TestCase):
+    """
+    Test connection pool statistics endpoint
+    """
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_staff_only(self):
+        """
+        Test regular users can not read pool statistics
+        """
+        user = get_user_model().objects.create_user('mail@mail.com', None)
+        self.client.force_authenticate(user)
+
+        response = self.client.get(DB_POOL_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_pool_stats(self):
+        """
+        Test staff user reads pool statistics
+        """
+        admin = get_user_model().objects.create_superuser(
+            'admin@mail.com',
+            'password123'
+        )
+        self.client.force_authenticate(admin)
+
+        response = self.client.get(DB_POOL_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('pools', response.data)
+        self.assertIn('persistent_reconnects', response.data)
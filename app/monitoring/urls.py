@@ -0,0 +1,13 @@
+from django.urls import path
+
+from .views import DatabasePoolStatsView, LivenessView, MetricsView, \
+    ReadinessView
+
+app_name = 'monitoring'
+
+urlpatterns = [
+    path('live/', LivenessView.as_view(), name='live'),
+    path('ready/', ReadinessView.as_view(), name='ready'),
+    path('db-pool/', DatabasePoolStatsView.as_view(), name='db-pool'),
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+]
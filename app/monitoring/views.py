@@ -0,0 +1,139 @@
+import json
+
+from django.db import DatabaseError
+from rest_framework import status
+from rest_framework.renderers import BaseRenderer
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from core.authentication import CachedTokenAuthentication
+from core.backends.pool import pool_stats
+from core.backends.postgresql.base import DatabaseWrapper
+from core.health import check_database
+from core.middleware import get_compression_stats
+from monitoring.metrics import format_samples, get_registry
+from recipe.cache import get_response_cache
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+# Pool statistics exposed as gauges, the others are counters
+POOL_GAUGES = ('size', 'idle', 'max_size')
+
+
+class LivenessView(APIView):
+    """
+    Liveness probe, answers without touching database or auth
+    """
+    authentication_classes = ()
+    permission_classes = ()
+
+    def get(self, request, *args, **kwargs):
+        return Response(
+            {'status': 'ok'},
+            headers={'Cache-Control': 'no-store'}
+        )
+
+
+class ReadinessView(APIView):
+    """
+    Readiness probe, checks database with a round trip query
+    """
+    authentication_classes = ()
+    permission_classes = ()
+
+    def get(self, request, *args, **kwargs):
+        """
+        Return 503 while database is unavailable
+        """
+        headers = {'Cache-Control': 'no-store'}
+        try:
+            check_database()
+        except DatabaseError:
+            return Response(
+                {'status': 'unavailable'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                headers=headers
+            )
+        return Response({'status': 'ok'}, headers=headers)
+
+
+class DatabasePoolStatsView(APIView):
+    """
+    Connection pool statistics of the serving worker process
+    """
+    authentication_classes = (CachedTokenAuthentication, )
+    permission_classes = (IsAdminUser, )
+
+    def get(self, request, *args, **kwargs):
+        """
+        Return checkouts, waits and reconnects per pool
+        """
+        return Response({
+            'pools': pool_stats(),
+            'persistent_reconnects': DatabaseWrapper.reconnects,
+        })
+
+
+class PrometheusRenderer(BaseRenderer):
+    """
+    Render exposition text as is, other data as JSON text
+    """
+    media_type = 'text/plain'
+    format = 'txt'
+    charset = 'utf-8'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if not isinstance(data, str):
+            data = json.dumps(data)
+        return data.encode(self.charset)
+
+
+class MetricsView(APIView):
+    """
+    Request histograms, pool and response cache counters of the serving
+    worker process in Prometheus text format
+    """
+    authentication_classes = (CachedTokenAuthentication, )
+    permission_classes = (IsAdminUser, )
+    renderer_classes = (PrometheusRenderer, )
+
+    def get(self, request, *args, **kwargs):
+        """
+        Return all metrics of this process
+        """
+        parts = [get_registry().exposition()]
+
+        pools = pool_stats()
+        names = sorted({name for stats in pools.values() for name in stats})
+        for name in names:
+            gauge = name in POOL_GAUGES
+            parts.append(format_samples(
+                f'db_pool_{name}' if gauge else f'db_pool_{name}_total',
+                f'Connection pool {name.replace("_", " ")}',
+                'gauge' if gauge else 'counter',
+                [
+                    ({'pool': pool}, stats[name])
+                    for pool, stats in sorted(pools.items())
+                ]
+            ))
+        parts.append(format_samples(
+            'db_persistent_reconnects_total',
+            'Persistent connections replaced after failed health check',
+            'counter',
+            [({}, DatabaseWrapper.reconnects)]
+        ))
+        for name, value in sorted(get_response_cache().stats().items()):
+            parts.append(format_samples(
+                f'recipe_response_cache_{name}_total',
+                f'Recipe response cache {name}',
+                'counter',
+                [({}, value)]
+            ))
+        for name, value in sorted(get_compression_stats().stats().items()):
+            parts.append(format_samples(
+                f'http_compression_{name}_total',
+                f'Response compression {name.replace("_", " ")}',
+                'counter',
+                [({}, value)]
+            ))
+        return Response(''.join(parts), content_type=PROMETHEUS_CONTENT_TYPE)
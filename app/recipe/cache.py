@@ -0,0 +1,111 @@
+import threading
+from hashlib import sha1
+from typing import Any, Dict, Optional
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+
+
+class ResponseCache:
+    """
+    Per-user cache of serialized API responses
+
+    Keys contain a generation stamp per user and model, invalidation
+    replaces the stamp so every cached response of that user and model
+    becomes unreachable at once and expires from the backend on its own.
+    Counters are kept per process.
+    """
+    key_prefix = 'recipe-response'
+
+    def __init__(self, backend: str = 'default', timeout: int = 300):
+        self.backend = caches[backend]
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._stats = dict.fromkeys(
+            ('hits', 'misses', 'stores', 'invalidations'), 0
+        )
+
+    @classmethod
+    def from_settings(cls) -> 'ResponseCache':
+        options = getattr(settings, 'RECIPE_RESPONSE_CACHE', {})
+        return cls(
+            backend=options.get('BACKEND', 'default'),
+            timeout=options.get('TIMEOUT', 300),
+        )
+
+    def get(self, user_id: int, namespace: str, variant: str) -> Any:
+        """
+        Return cached data or None
+        """
+        data = self.backend.get(self.key(user_id, namespace, variant))
+        self._count('misses' if data is None else 'hits')
+        return data
+
+    def set(self, user_id: int, namespace: str, variant: str, data: Any):
+        """
+        Cache response data
+        """
+        self.backend.set(
+            self.key(user_id, namespace, variant),
+            data,
+            self.timeout
+        )
+        self._count('stores')
+
+    def invalidate(self, user_id: int, namespace: str):
+        """
+        Drop all cached responses of user for namespace
+        """
+        self.backend.set(
+            self.generation_key(user_id, namespace),
+            uuid4().hex,
+            None
+        )
+        self._count('invalidations')
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._stats)
+
+    def reset_stats(self):
+        with self._lock:
+            self._stats = dict.fromkeys(self._stats, 0)
+
+    def key(self, user_id: int, namespace: str, variant: str) -> str:
+        generation = self.generation(user_id, namespace)
+        digest = sha1(variant.encode()).hexdigest()
+        return f'{self.key_prefix}:{user_id}:{namespace}:{generation}:{digest}'
+
+    def generation(self, user_id: int, namespace: str) -> str:
+        key = self.generation_key(user_id, namespace)
+        generation = self.backend.get(key)
+        if generation is None:
+            self.backend.add(key, uuid4().hex, None)
+            generation = self.backend.get(key)
+        return generation
+
+    def generation_key(self, user_id: int, namespace: str) -> str:
+        return f'{self.key_prefix}-generation:{user_id}:{namespace}'
+
+    def _count(self, counter: str):
+        with self._lock:
+            self._stats[counter] += 1
+
+
+_response_cache: Optional[ResponseCache] = None
+
+
+def get_response_cache() -> ResponseCache:
+    """
+    Return process-wide response cache
+    """
+    global _response_cache
+    if _response_cache is None:
+        _response_cache = ResponseCache.from_settings()
+    return _response_cache
+
+
+def reset_response_cache():
+    global _response_cache
+    _response_cache = None
@@ -0,0 +1,87 @@
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+from django.db.models import Count, F, IntegerField, OuterRef, QuerySet, \
+    Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from core.models import Ingredient, Recipe, Tag
+
+# Through table, its column and the model counting recipes
+RELATIONS = (
+    (Recipe.tag.through, 'tag_id', Tag),
+    (Recipe.ingredients.through, 'ingredient_id', Ingredient),
+)
+RELATIONS_BY_THROUGH = {
+    through: (column, model) for through, column, model in RELATIONS
+}
+
+
+def change_counts(model, counts: Dict[int, int], sign: int = 1):
+    """
+    Add counts to ``recipe_count`` of objects, subtract with ``sign`` -1
+
+    Objects with the same change are updated with one ``UPDATE`` using
+    an ``F()`` expression, so concurrent changes do not overwrite each
+    other and are part of the calling transaction. Counts never fall
+    below zero.
+    """
+    ids_by_delta = defaultdict(list)
+    for pk, count in counts.items():
+        if count:
+            ids_by_delta[sign * count].append(pk)
+    for delta, ids in ids_by_delta.items():
+        value = F('recipe_count') + delta
+        if delta < 0:
+            value = Greatest(value, Value(0))
+        model.objects.filter(pk__in=ids).update(recipe_count=value)
+
+
+def relation_counts(recipe_ids: Iterable[int]) -> List[Tuple]:
+    """
+    Return models with recipes of every related object among recipes
+    """
+    ids = list(recipe_ids)
+    result = []
+    for through, column, model in RELATIONS:
+        counts = Counter()
+        if ids:
+            rows = through.objects.filter(recipe_id__in=ids)\
+                .values(column).annotate(recipes=Count('id')).order_by()
+            for row in rows:
+                counts[row[column]] = row['recipes']
+        result.append((model, counts))
+    return result
+
+
+def change_relation_counts(recipe_ids: Iterable[int], sign: int = 1):
+    """
+    Count relations of stored recipes in their tags and ingredients
+    """
+    for model, counts in relation_counts(recipe_ids):
+        change_counts(model, counts, sign)
+
+
+def actual_counts(model) -> Subquery:
+    """
+    Return expression counting recipes of outer object from through table
+    """
+    for through, column, related in RELATIONS:
+        if related is model:
+            counts = through.objects.filter(**{column: OuterRef('pk')})\
+                .order_by().values(column).annotate(recipes=Count('id'))\
+                .values('recipes')
+            return Coalesce(
+                Subquery(counts, output_field=IntegerField()), 0
+            )
+    raise ValueError(f'{model.__name__} is not related to recipes')
+
+
+def drifted_counts(queryset: QuerySet) -> QuerySet:
+    """
+    Return ``(id, actual count)`` of objects with a wrong recipe count
+    """
+    return queryset\
+        .annotate(actual=actual_counts(queryset.model))\
+        .exclude(recipe_count=F('actual'))\
+        .values_list('id', 'actual')
@@ -0,0 +1,136 @@
+from typing import List
+
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import Exists, F, FloatField, OuterRef, QuerySet
+from django.db.models.functions import Cast
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from core.models import Recipe, SEARCH_CONFIG
+
+# Largest value of the 32-bit integer primary keys
+MAX_ID = 2 ** 31 - 1
+
+
+class RecipeRelationFilter(BaseFilterBackend):
+    """
+    Filter recipes by tag and ingredient ids
+
+    ``?tags=1,2&ingredients=3&match=all`` keeps recipes having all given
+    tags and ingredients, ``match=any`` (default) recipes having any of
+    them per relation. Every condition is an EXISTS semi-join on the
+    through table, so no DISTINCT over a fan-out join is needed.
+    """
+    match_param = 'match'
+    relations = {
+        'tags': (Recipe.tag.through, 'tag_id'),
+        'ingredients': (Recipe.ingredients.through, 'ingredient_id'),
+    }
+
+    def filter_queryset(self, request, queryset: QuerySet, view):
+        match = request.query_params.get(self.match_param, 'any')
+        if match not in ('any', 'all'):
+            raise ValidationError(
+                {self.match_param: [_('Expected "any" or "all".')]}
+            )
+        for param, (through, column) in self.relations.items():
+            ids = self.parse_ids(request, param)
+            if not ids:
+                continue
+            related = through.objects.filter(recipe_id=OuterRef('pk'))
+            if match == 'all':
+                for pk in ids:
+                    queryset = queryset.filter(
+                        Exists(related.filter(**{column: pk}))
+                    )
+            else:
+                queryset = queryset.filter(
+                    Exists(related.filter(**{f'{column}__in': ids}))
+                )
+        return queryset
+
+    @staticmethod
+    def parse_ids(request, param: str) -> List[int]:
+        """
+        Return list of ids from comma separated query parameter
+
+        Ids out of the primary key range are rejected, the database would
+        fail comparing them.
+        """
+        value = request.query_params.get(param)
+        if not value:
+            return []
+        try:
+            ids = list(dict.fromkeys(
+                int(pk) for pk in value.split(',') if pk.strip()
+            ))
+        except ValueError:
+            ids = None
+        if ids is None or any(not 0 < pk <= MAX_ID for pk in ids):
+            raise ValidationError(
+                {param: [_('Expected comma separated ids.')]}
+            )
+        return ids
+
+
+class RecipeSearchFilter(BaseFilterBackend):
+    """
+    Search recipes by title with ``?search=``
+
+    PostgreSQL matches the GIN indexed ``search_vector`` and orders by
+    rank, other databases fall back to ``icontains`` on every word,
+    ordered by id.
+    """
+    search_param = 'search'
+
+    def filter_queryset(self, request, queryset: QuerySet, view):
+        terms = request.query_params.get(self.search_param, '').strip()
+        if not terms:
+            return queryset
+        if connection.vendor == 'postgresql':
+            query = SearchQuery(
+                terms,
+                config=SEARCH_CONFIG,
+                search_type='websearch'
+            )
+            # ts_rank is a real, its text form parsed by the driver is not
+            # the same number, cast to double precision so ranks of
+            # pagination cursors compare equal to the stored expression
+            rank = Cast(SearchRank(F('search_vector'), query), FloatField())
+            return queryset\
+                .filter(search_vector=query)\
+                .annotate(rank=rank)\
+                .order_by('-rank', '-id')
+        for word in terms.split():
+            queryset = queryset.filter(title__icontains=word)
+        return queryset
+
+
+class RecipeAttrOrderingFilter(BaseFilterBackend):
+    """
+    Order tags or ingredients with ``?ordering=``
+
+    Every choice is served by a ``(user, ..., id)`` index and ends with
+    the primary key, as keyset pagination needs.
+    """
+    ordering_param = 'ordering'
+    orderings = {
+        'name': ('name', 'id'),
+        '-name': ('-name', '-id'),
+        'recipe_count': ('recipe_count', 'id'),
+        '-recipe_count': ('-recipe_count', '-id'),
+    }
+
+    def filter_queryset(self, request, queryset: QuerySet, view):
+        value = request.query_params.get(self.ordering_param)
+        if not value:
+            return queryset
+        ordering = self.orderings.get(value)
+        if ordering is None:
+            raise ValidationError({self.ordering_param: [
+                _('Expected one of: %(choices)s.')
+                % {'choices': ', '.join(self.orderings)}
+            ]})
+        return queryset.order_by(*ordering)
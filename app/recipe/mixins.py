@@ -0,0 +1,597 @@
+from collections import Counter
+from hashlib import sha1
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connection, transaction
+from django.db.models import Prefetch, QuerySet, prefetch_related_objects
+from django.http import StreamingHttpResponse
+from django.utils.http import parse_etags
+from django.utils.translation import gettext_lazy as _
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from core.renderers import FastJSONRenderer
+from recipe.cache import get_response_cache
+from recipe.signals import bulk_updating, bulk_written
+from recipe.versions import get_user_version
+
+
+class BulkWriteMixin:
+    """
+    Batch create and update of objects owned by the request user
+
+    ``POST <list>/bulk/`` creates and ``PATCH <list>/bulk/`` partially
+    updates a list of objects. Every item is validated on its own and
+    reported with its own status, valid items are written together with
+    ``bulk_create``/``bulk_update`` and bulk many-to-many inserts.
+    """
+    bulk_max_items = 1000
+    bulk_batch_size = 500
+
+    @action(detail=False, methods=['post', 'patch'], url_path='bulk')
+    def bulk(self, request, *args, **kwargs):
+        """
+        Create or update a list of objects
+        """
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError(
+                {'non_field_errors': [_('Expected a list of items.')]}
+            )
+        if len(items) > self.bulk_max_items:
+            raise ValidationError({'non_field_errors': [
+                _('Ensure there are no more than %(max)d items.')
+                % {'max': self.bulk_max_items}
+            ]})
+
+        if request.method == 'POST':
+            results = self.bulk_create_items(items)
+            success = status.HTTP_201_CREATED
+        else:
+            results = self.bulk_update_items(items)
+            success = status.HTTP_200_OK
+        return Response(results, status=self.bulk_status(results, success))
+
+    def bulk_create_items(self, items: List[Any]) -> List[Dict[str, Any]]:
+        """
+        Validate and create items, return per-item results
+        """
+        model = self.get_queryset().model
+        results = [None] * len(items)
+        valid = []
+        for index, item in enumerate(items):
+            serializer = self.get_serializer(data=item)
+            if serializer.is_valid():
+                valid.append((index, serializer.validated_data))
+            else:
+                results[index] = self.bulk_error(serializer.errors)
+
+        objs, relations = [], []
+        for _index, validated_data in valid:
+            fields, related = self.split_relations(model, validated_data)
+            objs.append(model(user=self.request.user, **fields))
+            relations.append(related)
+
+        with transaction.atomic():
+            self.bulk_insert(model, objs)
+            self.bulk_set_relations(model, objs, relations, replace=False)
+            self.bulk_send_written(model, objs)
+
+        created = self.bulk_fetch([obj.pk for obj in objs])
+        for (index, _data), obj in zip(valid, objs):
+            results[index] = {
+                'status': status.HTTP_201_CREATED,
+                'data': created[obj.pk],
+            }
+        return results
+
+    def bulk_update_items(self, items: List[Any]) -> List[Dict[str, Any]]:
+        """
+        Validate and partially update items, return per-item results
+        """
+        model = self.get_queryset().model
+        results = [None] * len(items)
+        ids = {}
+        for index, item in enumerate(items):
+            try:
+                ids[index] = int(item['id'])
+            except (KeyError, TypeError, ValueError):
+                results[index] = self.bulk_error(
+                    {'id': [_('A valid object id is required.')]}
+                )
+        # An object can be written once per batch, which of the repeated
+        # items should win is ambiguous, so all of them are rejected
+        repeated = {
+            pk for pk, count in Counter(ids.values()).items() if count > 1
+        }
+        for index, pk in list(ids.items()):
+            if pk in repeated:
+                results[index] = self.bulk_error(
+                    {'id': [_('Duplicate object id in request.')]}
+                )
+                del ids[index]
+        instances = {
+            obj.pk: obj
+            for obj in self.get_queryset().filter(pk__in=ids.values())
+        }
+
+        valid = []
+        for index, pk in ids.items():
+            instance = instances.get(pk)
+            if instance is None:
+                results[index] = self.bulk_error(
+                    {'id': [_('Not found.')]},
+                    status.HTTP_404_NOT_FOUND
+                )
+                continue
+            serializer = self.get_serializer(
+                instance,
+                data=items[index],
+                partial=True
+            )
+            if serializer.is_valid():
+                valid.append((index, instance, serializer.validated_data))
+            else:
+                results[index] = self.bulk_error(serializer.errors)
+
+        objs, relations, updated_fields = [], [], set()
+        for _index, instance, validated_data in valid:
+            fields, related = self.split_relations(model, validated_data)
+            for name, value in fields.items():
+                setattr(instance, name, value)
+            updated_fields.update(fields)
+            objs.append(instance)
+            relations.append(related)
+
+        with transaction.atomic():
+            if objs:
+                bulk_updating.send(
+                    sender=model,
+                    user=self.request.user,
+                    objs=objs
+                )
+            if objs and updated_fields:
+                model.objects.bulk_update(
+                    objs,
+                    sorted(updated_fields),
+                    batch_size=self.bulk_batch_size
+                )
+            self.bulk_set_relations(model, objs, relations, replace=True)
+            self.bulk_send_written(model, objs)
+
+        updated = self.bulk_fetch([obj.pk for obj in objs])
+        for (index, _instance, _data), obj in zip(valid, objs):
+            results[index] = {
+                'status': status.HTTP_200_OK,
+                'data': updated[obj.pk],
+            }
+        return results
+
+    def bulk_insert(self, model, objs: List[Any]):
+        """
+        Insert objects, making sure primary keys are set afterwards
+
+        Without bulk insert returning keys, objects are saved one by one
+        as raw saves, like fixtures, so receivers deriving data from
+        regular saves leave them to ``bulk_written``.
+        """
+        if connection.features.can_return_rows_from_bulk_insert:
+            model.objects.bulk_create(objs, batch_size=self.bulk_batch_size)
+            return
+        for obj in objs:
+            obj.save_base(raw=True, force_insert=True)
+
+    def bulk_set_relations(self, model, objs, relations, replace: bool):
+        """
+        Write many-to-many relations with bulk through table inserts
+        """
+        for field in model._meta.many_to_many:
+            through = field.remote_field.through
+            source = field.m2m_field_name()
+            target = field.m2m_reverse_field_name()
+            pairs = [
+                (obj, related[field.name])
+                for obj, related in zip(objs, relations)
+                if field.name in related
+            ]
+            if not pairs:
+                continue
+            if replace:
+                through.objects.filter(**{
+                    f'{source}__in': [obj.pk for obj, _targets in pairs]
+                }).delete()
+            through.objects.bulk_create(
+                [
+                    through(**{
+                        f'{source}_id': obj.pk,
+                        f'{target}_id': target_pk,
+                    })
+                    for obj, targets in pairs
+                    for target_pk in dict.fromkeys(t.pk for t in targets)
+                ],
+                batch_size=self.bulk_batch_size
+            )
+
+    def bulk_send_written(self, model, objs: List[Any]):
+        """
+        Notify receivers of model signals skipped by bulk writes
+
+        Sent in the write transaction, so data derived by receivers is
+        committed together with the rows.
+        """
+        if objs:
+            bulk_written.send(sender=model, user=self.request.user, objs=objs)
+
+    def bulk_fetch(self, pks: List[int]) -> Dict[int, Dict[str, Any]]:
+        """
+        Return serialized objects by primary key
+        """
+        if not pks:
+            return {}
+        queryset = self.get_queryset().filter(pk__in=pks)
+        return {
+            obj.pk: self.get_serializer(obj).data
+            for obj in queryset
+        }
+
+    @staticmethod
+    def split_relations(model, validated_data) -> Tuple[Dict, Dict]:
+        """
+        Separate many-to-many values from concrete field values
+        """
+        fields = dict(validated_data)
+        relations = {
+            field.name: fields.pop(field.name)
+            for field in model._meta.many_to_many
+            if field.name in fields
+        }
+        return fields, relations
+
+    @staticmethod
+    def bulk_error(errors, code: int = status.HTTP_400_BAD_REQUEST):
+        return {'status': code, 'errors': errors}
+
+    @staticmethod
+    def bulk_status(results: List[Dict[str, Any]], success: int) -> int:
+        """
+        Return overall response status for per-item results
+        """
+        failed = sum(1 for result in results if 'errors' in result)
+        if not failed:
+            return success
+        if failed == len(results):
+            return status.HTTP_400_BAD_REQUEST
+        return status.HTTP_207_MULTI_STATUS
+
+
+class StreamingListMixin:
+    """
+    Stream the whole list as a JSON array with ``?stream=true``
+
+    Rows are read with a server-side cursor and serialized
+    ``stream_chunk_size`` at a time, each chunk with its own prefetch
+    queries, so memory use does not grow with the number of rows.
+    Requests marked with ``streaming_supported = False``, like those of
+    the async views, get a 400 response instead.
+    """
+    stream_query_param = 'stream'
+    stream_chunk_size = 500
+    stream_renderer_class = FastJSONRenderer
+
+    def list(self, request, *args, **kwargs):
+        """
+        Return streaming response when requested, regular page otherwise
+        """
+        if not self.is_streaming_requested(request):
+            return super().list(request, *args, **kwargs)
+        if not getattr(request, 'streaming_supported', True):
+            raise ValidationError({self.stream_query_param: [
+                _('Streaming is not supported by this server.')
+            ]})
+        queryset = self.filter_queryset(self.get_queryset())
+        return StreamingHttpResponse(
+            self.stream_content(queryset),
+            content_type='application/json'
+        )
+
+    def is_streaming_requested(self, request) -> bool:
+        value = request.query_params.get(self.stream_query_param, '')
+        return value.lower() in ('1', 'true', 'yes')
+
+    def stream_content(self, queryset: QuerySet) -> Iterator[bytes]:
+        """
+        Yield JSON array of serialized objects chunk by chunk
+        """
+        renderer = self.stream_renderer_class()
+        separator = b''
+        yield b'['
+        for chunk in self.stream_chunks(queryset):
+            data = self.get_serializer(chunk, many=True).data
+            body = renderer.render(data)[1:-1]
+            yield separator + body
+            separator = b','
+        yield b']'
+
+    def stream_chunks(self, queryset: QuerySet) -> Iterator[List[Any]]:
+        """
+        Yield lists of objects read with a server-side cursor
+        """
+        lookups = queryset._prefetch_related_lookups
+        rows = queryset.prefetch_related(None)\
+            .iterator(chunk_size=self.stream_chunk_size)
+        chunk = []
+        for obj in rows:
+            chunk.append(obj)
+            if len(chunk) == self.stream_chunk_size:
+                prefetch_related_objects(chunk, *lookups)
+                yield chunk
+                chunk = []
+        if chunk:
+            prefetch_related_objects(chunk, *lookups)
+            yield chunk
+
+
+class ValuesListMixin:
+    """
+    Opt-in list rendering from ``values()`` rows
+
+    Enabled by ``settings.RECIPE_VALUES_LISTS``. Serializers with
+    ``ValuesSerializerMixin`` build the same JSON from plain rows, without
+    model instances and per-field serializer machinery; requests they
+    can not render that way, like ``?expand=``, use the regular path.
+    """
+    def list(self, request, *args, **kwargs):
+        serializer = self.get_serializer()
+        supports_values = getattr(serializer, 'supports_values', None)
+        if not settings.RECIPE_VALUES_LISTS \
+                or supports_values is None or not supports_values():
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.filter_queryset(self.get_queryset())
+        rows = serializer.values_queryset(queryset)
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(serializer.values_data(page))
+        return Response(serializer.values_data(list(rows)))
+
+
+class NotModified(Exception):
+    """
+    Raised when client already has the current representation
+    """
+
+
+class ConditionalGetMixin:
+    """
+    ETag and ``If-None-Match`` support for per-user read endpoints
+
+    The ETag is derived from the user's data version, which is bumped on
+    every write, so a 304 is answered before running the list query or
+    the serializer.
+    """
+    conditional_actions = ('list', 'retrieve')
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.etag = None
+        if request.method not in ('GET', 'HEAD') \
+                or self.action not in self.conditional_actions:
+            return
+        self.etag = self.get_etag(request)
+        if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+        if if_none_match:
+            etags = [
+                etag[2:] if etag.startswith('W/') else etag
+                for etag in parse_etags(if_none_match)
+            ]
+            if self.etag in etags or '*' in etags:
+                raise NotModified()
+
+    def get_etag(self, request) -> str:
+        """
+        Return ETag of the requested representation
+        """
+        version = get_user_version(request.user.pk)
+        digest = sha1(
+            f'{version}:{request.get_full_path()}:'
+            f'{request.accepted_media_type}'.encode()
+        ).hexdigest()
+        return f'"{digest}"'
+
+    def handle_exception(self, exc):
+        if isinstance(exc, NotModified):
+            return Response(status=status.HTTP_304_NOT_MODIFIED)
+        return super().handle_exception(exc)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(
+            request, response, *args, **kwargs
+        )
+        etag = getattr(self, 'etag', None)
+        if etag and response.status_code in (
+                status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            response['ETag'] = etag
+        return response
+
+
+class CachedResponseMixin:
+    """
+    Per-user response cache for read endpoints
+
+    Serialized data of ``list`` is cached by user, model and full path;
+    views call ``cached_response`` from other read actions. Entries are
+    invalidated by model signals in ``recipe.signals``.
+    """
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(super().list, request, *args, **kwargs)
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        """
+        Return cached response or call handler and cache its data
+        """
+        cache = get_response_cache()
+        namespace = self.queryset.model._meta.model_name
+        variant = f'{request.get_full_path()}:{request.accepted_media_type}'
+        data = cache.get(request.user.pk, namespace, variant)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if isinstance(response, Response) \
+                and response.status_code == status.HTTP_200_OK:
+            cache.set(request.user.pk, namespace, variant, response.data)
+        return response
+
+
+class SparseFieldsMixin:
+    """
+    Render only fields listed in ``?fields=`` on read actions
+
+    The requested fields limit the serializer fields, the columns loaded
+    with ``only()`` and the many-to-many relations prefetched, so the
+    payload and the queries shrink with the field list. Ordering fields
+    stay loaded for the pagination cursor.
+    """
+    fields_query_param = 'fields'
+    sparse_actions = ('list', 'retrieve')
+
+    def get_requested_fields(self) -> Optional[Tuple[str, ...]]:
+        """
+        Return validated field names requested by client or None
+        """
+        if self.action not in self.sparse_actions:
+            return None
+        if not hasattr(self, '_requested_fields'):
+            value = self.request.query_params.get(self.fields_query_param, '')
+            names = tuple(dict.fromkeys(
+                name.strip() for name in value.split(',') if name.strip()
+            ))
+            if names:
+                available = super().get_serializer().fields
+                unknown = [name for name in names if name not in available]
+                if unknown:
+                    raise ValidationError({self.fields_query_param: [
+                        _('Unknown fields: %(fields)s.')
+                        % {'fields': ', '.join(unknown)}
+                    ]})
+            self._requested_fields = names or None
+        return self._requested_fields
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_requested_fields()
+        if fields is not None:
+            kwargs.setdefault('fields', fields)
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset: QuerySet) -> QuerySet:
+        queryset = super().filter_queryset(queryset)
+        fields = self.get_requested_fields()
+        if fields is None:
+            return queryset
+        return self.sparse_queryset(queryset, fields)
+
+    def sparse_queryset(self, queryset: QuerySet,
+                        fields: Tuple[str, ...]) -> QuerySet:
+        """
+        Load only columns and relations backing the requested fields
+        """
+        opts = queryset.model._meta
+        serializer_fields = self.get_serializer().fields
+        columns, relations = {opts.pk.name}, set()
+        sources = [serializer_fields[name].source for name in fields]
+        sources += [name.lstrip('-') for name in queryset.query.order_by
+                    if isinstance(name, str)]
+        for source in sources:
+            try:
+                field = opts.get_field(source)
+            except FieldDoesNotExist:
+                continue
+            if field.many_to_many:
+                relations.add(field.name)
+            elif field.concrete:
+                columns.add(field.name)
+
+        lookups = [
+            lookup for lookup in queryset._prefetch_related_lookups
+            if prefetch_root(lookup) in relations
+        ]
+        return queryset.only(*columns)\
+            .prefetch_related(None)\
+            .prefetch_related(*lookups)
+
+
+class ExpandMixin:
+    """
+    Inline related objects listed in ``?expand=`` on read actions
+
+    The serializer declares ``Meta.expandable_fields``, mapping relation
+    fields to serializers of the related objects. Every expanded relation
+    is loaded with one prefetch query selecting only the rendered columns.
+    """
+    expand_query_param = 'expand'
+    expand_actions = ('list', 'retrieve')
+
+    def get_requested_expand(self) -> Tuple[str, ...]:
+        """
+        Return validated relation names requested by client
+        """
+        if self.action not in self.expand_actions:
+            return ()
+        if not hasattr(self, '_requested_expand'):
+            value = self.request.query_params.get(self.expand_query_param, '')
+            names = tuple(dict.fromkeys(
+                name.strip() for name in value.split(',') if name.strip()
+            ))
+            unknown = [
+                name for name in names if name not in self.expandable_fields()
+            ]
+            if unknown:
+                raise ValidationError({self.expand_query_param: [
+                    _('Relations can not be expanded: %(fields)s.')
+                    % {'fields': ', '.join(unknown)}
+                ]})
+            self._requested_expand = names
+        return self._requested_expand
+
+    def expandable_fields(self) -> Dict[str, Any]:
+        meta = getattr(self.get_serializer_class(), 'Meta', None)
+        return getattr(meta, 'expandable_fields', {})
+
+    def get_serializer(self, *args, **kwargs):
+        expand = self.get_requested_expand()
+        if expand:
+            kwargs.setdefault('expand', expand)
+        return super().get_serializer(*args, **kwargs)
+
+    def filter_queryset(self, queryset: QuerySet) -> QuerySet:
+        """
+        Prefetch expanded relations with only the rendered columns
+        """
+        queryset = super().filter_queryset(queryset)
+        expand = self.get_requested_expand()
+        if not expand:
+            return queryset
+        rendered = self.get_serializer().fields
+        expanded = [name for name in expand if name in rendered]
+        lookups = [
+            lookup for lookup in queryset._prefetch_related_lookups
+            if prefetch_root(lookup) not in expanded
+        ]
+        for name in expanded:
+            meta = self.expandable_fields()[name].Meta
+            lookups.append(Prefetch(
+                rendered[name].source,
+                queryset=meta.model.objects.only(*meta.fields).order_by('id')
+            ))
+        return queryset.prefetch_related(None).prefetch_related(*lookups)
+
+
+def prefetch_root(lookup) -> str:
+    """
+    Return first relation of prefetch lookup string or Prefetch object
+    """
+    path = getattr(lookup, 'prefetch_through', lookup)
+    return path.split('__')[0]
@@ -0,0 +1,197 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from typing import Any, List, Optional, Tuple
+
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q, QuerySet
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opaque cursor pagination over the queryset ordering
+
+    Pages are selected with a ``WHERE (a, b) < (x, y)`` style filter and a
+    ``LIMIT``, never with ``COUNT(*)`` or ``OFFSET``, so every page costs the
+    same. The last ordering field has to be unique, ``-id`` is appended when
+    the queryset ordering does not end with the primary key.
+    """
+    page_size = 100
+    max_page_size = 1000
+    page_size_query_param = 'page_size'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = _('Invalid cursor')
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None):
+        """
+        Return a single page of results
+        """
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+
+        position, reverse = self.decode_cursor(request, queryset.model)
+        ordering = self.invert(self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            queryset = queryset.filter(self.after(ordering, position))
+
+        results = list(queryset[:self.page_size + 1])
+        has_more = len(results) > self.page_size
+        results = results[:self.page_size]
+        if reverse:
+            results.reverse()
+
+        self.has_next = has_more if not reverse else position is not None
+        self.has_previous = position is not None if not reverse else has_more
+        self.page = results
+        return results
+
+    def get_paginated_response(self, data):
+        """
+        Wrap page data with links to the neighbouring pages
+        """
+        return Response({
+            'next': self.get_next_link(),
+            'previous': self.get_previous_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+    def get_page_size(self, request) -> int:
+        """
+        Return page size requested by client, capped by max_page_size
+        """
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, queryset: QuerySet) -> Tuple[str, ...]:
+        """
+        Return queryset ordering, ending with a unique field
+        """
+        ordering = tuple(
+            field for field in queryset.query.order_by
+            if isinstance(field, str)
+        )
+        if not ordering or ordering[-1].lstrip('-') not in ('id', 'pk'):
+            ordering += ('-id', )
+        return ordering
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.position(self.page[-1]), False)
+
+    def get_previous_link(self) -> Optional[str]:
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(
+                self.request.build_absolute_uri(),
+                self.cursor_query_param
+            )
+        return self.encode_cursor(self.position(self.page[0]), True)
+
+    def position(self, item) -> List[Any]:
+        """
+        Return values of ordering fields for result item
+        """
+        fields = [field.lstrip('-') for field in self.ordering]
+        if isinstance(item, dict):
+            return [item[field] for field in fields]
+        return [getattr(item, field) for field in fields]
+
+    def encode_cursor(self, position: List[Any], reverse: bool) -> str:
+        """
+        Return page URL with encoded cursor
+        """
+        payload = json.dumps({'p': position, 'r': int(reverse)}, default=str)
+        cursor = urlsafe_b64encode(payload.encode()).decode()
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            cursor
+        )
+
+    def decode_cursor(self, request,
+                      model) -> Tuple[Optional[List[Any]], bool]:
+        """
+        Return position and direction encoded in request cursor
+
+        Position values are converted by the ordering fields of model, so
+        values of wrong types are reported as an invalid cursor.
+        """
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None, False
+        try:
+            payload = json.loads(urlsafe_b64decode(cursor.encode()))
+            position, reverse = payload['p'], bool(payload['r'])
+        except (BinasciiError, TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) \
+                or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        try:
+            position = [
+                self.to_python(model, field.lstrip('-'), value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    @staticmethod
+    def to_python(model, name: str, value: Any) -> Any:
+        """
+        Return cursor value converted by the model field, None is invalid
+        """
+        if value is None:
+            raise ValueError('Cursor position can not be null')
+        try:
+            field = model._meta.pk if name == 'pk' \
+                else model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # Annotation, its value is compared as it was encoded
+            return value
+        return field.to_python(value)
+
+    @staticmethod
+    def invert(ordering: Tuple[str, ...]) -> Tuple[str, ...]:
+        return tuple(
+            field[1:] if field.startswith('-') else f'-{field}'
+            for field in ordering
+        )
+
+    @staticmethod
+    def after(ordering: Tuple[str, ...], position: List[Any]) -> Q:
+        """
+        Return filter selecting rows placed after position in ordering
+        """
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
@@ -0,0 +1,70 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils.translation import gettext_lazy as _
+from rest_framework.relations import MANY_RELATION_KWARGS, \
+    ManyRelatedField, PrimaryKeyRelatedField
+
+
+class UserPrimaryKeyRelatedField(PrimaryKeyRelatedField):
+    """
+    Primary key field resolving only objects owned by the request user
+
+    With ``many=True`` the whole list is resolved by
+    ``BatchedManyRelatedField`` in a single query.
+    """
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        request = self.context.get('request')
+        user = getattr(request, 'user', None)
+        if user is None or not user.is_authenticated:
+            return queryset.none()
+        return queryset.filter(user=user)
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BatchedManyRelatedField(**list_kwargs)
+
+
+class BatchedManyRelatedField(ManyRelatedField):
+    """
+    List of primary keys resolved with one ``id__in`` query
+
+    Every primary key missing from the child queryset is reported in a
+    single error instead of failing on the first one.
+    """
+    default_error_messages = {
+        'does_not_exist': _(
+            'Invalid pks {pk_values} - objects do not exist.'
+        ),
+    }
+
+    def to_internal_value(self, data):
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+
+        child = self.child_relation
+        queryset = child.get_queryset()
+        pk_field = queryset.model._meta.pk
+        pks = []
+        for item in data:
+            if isinstance(item, bool):
+                child.fail('incorrect_type', data_type=type(item).__name__)
+            try:
+                pks.append(pk_field.to_python(item))
+            except (DjangoValidationError, TypeError, ValueError):
+                child.fail('incorrect_type', data_type=type(item).__name__)
+
+        unique = list(dict.fromkeys(pks))
+        objects = {obj.pk: obj for obj in queryset.filter(id__in=unique)}
+        missing = [pk for pk in unique if pk not in objects]
+        if missing:
+            self.fail(
+                'does_not_exist',
+                pk_values=', '.join(f'"{pk}"' for pk in missing)
+            )
+        return [objects[pk] for pk in pks]
@@ -1,43 +1,265 @@
-from rest_framework.serializers import ModelSerializer, PrimaryKeyRelatedField
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional
+
+from django.db.models import QuerySet
+from rest_framework.fields import CharField, DecimalField, IntegerField
+from rest_framework.relations import ManyRelatedField
+from rest_framework.serializers import ModelSerializer, Serializer
+from rest_framework.settings import api_settings
 
 from core.models import Tag, Ingredient, Recipe
+from monitoring.serializers import TimedListSerializer, TimedSerializerMixin
+from recipe.relations import UserPrimaryKeyRelatedField
+
+
+class DynamicFieldsMixin:
+    """
+    Serializer accepting ``fields`` argument to render a subset of fields
+    """
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
+
+
+class ExpandableFieldsMixin:
+    """
+    Serializer accepting ``expand`` argument to nest related objects
+
+    ``Meta.expandable_fields`` maps relation fields to the serializers
+    rendering the related objects in place of their primary keys.
+    """
+    def __init__(self, *args, **kwargs):
+        expand = kwargs.pop('expand', None)
+        super().__init__(*args, **kwargs)
+        for name in expand or ():
+            if name not in self.fields:
+                continue
+            source = self.fields[name].source
+            serializer_class = self.Meta.expandable_fields[name]
+            self.fields[name] = serializer_class(
+                many=True,
+                read_only=True,
+                **({} if source == name else {'source': source})
+            )
+
+
+class ValuesSerializerMixin:
+    """
+    Read-only rendering of ``values()`` rows without model instances
+
+    Output is the same as of ``.data``: plain columns are copied, prices
+    are formatted like ``DecimalField`` does and many-to-many primary keys
+    are read from the through table with one query per relation, ordered
+    by related id like the prefetches of the views. Serializers with
+    fields it can not render this way report ``supports_values() False``.
+    """
+    def supports_values(self) -> bool:
+        return all(
+            self.value_converter(field) is not None
+            or isinstance(field, ManyRelatedField)
+            for field in self.readable_values_fields()
+        )
+
+    def readable_values_fields(self) -> List:
+        return [
+            field for field in self.fields.values() if not field.write_only
+        ]
+
+    def values_queryset(self, queryset: QuerySet) -> QuerySet:
+        """
+        Return queryset of rows holding columns of non-relation fields
+
+        Ordering fields are selected too, pagination cursors read them.
+        """
+        opts = queryset.model._meta
+        columns = [opts.pk.name]
+        columns += [
+            field.source for field in self.readable_values_fields()
+            if not isinstance(field, ManyRelatedField)
+        ]
+        for name in queryset.query.order_by:
+            if not isinstance(name, str):
+                continue
+            name = name.lstrip('-')
+            if name != 'pk':
+                columns.append(name)
+        return queryset.prefetch_related(None)\
+            .values(*dict.fromkeys(columns))
+
+    def values_data(self, rows: List[Dict[str, Any]]) -> List[Dict]:
+        """
+        Return serialized data of rows from ``values_queryset``
+        """
+        pk_name = self.Meta.model._meta.pk.name
+        ids = [row[pk_name] for row in rows]
+        renderers = []
+        for name, field in self.fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, ManyRelatedField):
+                related = self.related_ids(field.source, ids)
+                renderers.append((name, pk_name, related.__getitem__))
+            else:
+                renderers.append(
+                    (name, field.source, self.value_converter(field))
+                )
+        return [
+            {
+                name: None if row[source] is None else convert(row[source])
+                for name, source, convert in renderers
+            }
+            for row in rows
+        ]
+
+    def related_ids(self, source: str, ids: List[int]) -> Dict[int, List]:
+        """
+        Return related primary keys by owner id, read from through table
+        """
+        field = self.Meta.model._meta.get_field(source)
+        through = field.remote_field.through
+        owner = f'{field.m2m_field_name()}_id'
+        target = f'{field.m2m_reverse_field_name()}_id'
+        related = {pk: [] for pk in ids}
+        if ids:
+            pairs = through.objects\
+                .filter(**{f'{owner}__in': ids})\
+                .order_by(target)\
+                .values_list(owner, target)
+            for owner_id, target_id in pairs:
+                related[owner_id].append(target_id)
+        return related
+
+    @staticmethod
+    def value_converter(field) -> Optional[Callable[[Any], Any]]:
+        """
+        Return function rendering a database value like field does
+        """
+        if '.' in field.source or field.source == '*':
+            return None
+        if type(field) in (CharField, IntegerField):
+            return identity
+        if type(field) is DecimalField:
+            coerce_to_string = getattr(
+                field, 'coerce_to_string',
+                api_settings.COERCE_DECIMAL_TO_STRING
+            )
+            if not coerce_to_string or field.localize \
+                    or field.decimal_places is None:
+                return field.to_representation
+            exponent = -field.decimal_places
 
+            def decimal_string(value: Decimal) -> str:
+                if value.as_tuple().exponent == exponent:
+                    return '{:f}'.format(value)
+                return field.to_representation(value)
 
-class TagSerializer(ModelSerializer):
+            return decimal_string
+        return None
+
+
+def identity(value):
+    return value
+
+
+class TagSerializer(ValuesSerializerMixin, DynamicFieldsMixin,
+                    TimedSerializerMixin, ModelSerializer):
     """
     Serializer for Tag objects
     """
     class Meta:
         model = Tag
-        fields = ('id', 'name')
-        read_only_fields = ('id', )
+        fields = ('id', 'name', 'recipe_count')
+        read_only_fields = ('id', 'recipe_count')
+        list_serializer_class = TimedListSerializer
 
 
-class IngredientSerializer(ModelSerializer):
+class IngredientSerializer(ValuesSerializerMixin, DynamicFieldsMixin,
+                           TimedSerializerMixin, ModelSerializer):
     """
     Serializer for Ingredient objects
     """
     class Meta:
         model = Ingredient
+        fields = ('id', 'name', 'recipe_count')
+        read_only_fields = ('id', 'recipe_count')
+        list_serializer_class = TimedListSerializer
+
+
+class TagNameSerializer(ModelSerializer):
+    """
+    Serializer for tags expanded in recipes
+    """
+    class Meta:
+        model = Tag
         fields = ('id', 'name')
-        read_only_fields = ('id', )
+        read_only_fields = fields
+
+
+class IngredientNameSerializer(ModelSerializer):
+    """
+    Serializer for ingredients expanded in recipes
+    """
+    class Meta:
+        model = Ingredient
+        fields = ('id', 'name')
+        read_only_fields = fields
 
 
-class RecipeSerializer(ModelSerializer):
+class RecipeSerializer(ValuesSerializerMixin, ExpandableFieldsMixin,
+                       DynamicFieldsMixin, TimedSerializerMixin,
+                       ModelSerializer):
     """
     Serializer for Recipe
     """
-    ingredients = PrimaryKeyRelatedField(
+    ingredients = UserPrimaryKeyRelatedField(
         many=True,
         queryset=Ingredient.objects.all()
     )
-    tag = PrimaryKeyRelatedField(
+    tag = UserPrimaryKeyRelatedField(
         many=True,
         queryset=Tag.objects.all()
     )
 
-
     class Meta:
         model = Recipe
         fields = ('id', 'title', 'ingredients', 'tag', 'time', 'price', 'link')
         read_only_fields = ('id', )
+        list_serializer_class = TimedListSerializer
+        expandable_fields = {
+            'ingredients': IngredientNameSerializer,
+            'tag': TagNameSerializer,
+        }
+
+
+class TimeBucketSerializer(Serializer):
+    """
+    Serializer for recipe count of cooking time histogram bucket
+    """
+    max_time = IntegerField(allow_null=True)
+    count = IntegerField()
+
+
+class TopTagSerializer(Serializer):
+    """
+    Serializer for tag with its number of recipes
+    """
+    id = IntegerField()
+    name = CharField()
+    recipe_count = IntegerField()
+
+
+class RecipeStatsSerializer(Serializer):
+    """
+    Serializer for recipe statistics of user
+    """
+    recipe_count = IntegerField()
+    average_price = DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        allow_null=True
+    )
+    time_histogram = TimeBucketSerializer(many=True)
+    top_tags = TopTagSerializer(many=True)
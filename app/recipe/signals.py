@@ -0,0 +1,211 @@
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete, m2m_changed, \
+    pre_save, pre_delete
+from django.dispatch import receiver, Signal
+
+from core.models import Tag, Ingredient, Recipe
+from recipe.cache import get_response_cache, reset_response_cache
+from recipe.counters import RELATIONS_BY_THROUGH, change_counts, \
+    change_relation_counts, relation_counts
+from recipe.stats import Contribution
+from recipe.versions import bump_user_version
+
+# Sent by BulkWriteMixin in the transaction of bulk writes, which skip
+# model signals, after rows are written
+bulk_written = Signal()
+# Sent by BulkWriteMixin in the transaction of bulk updates, before rows
+# are written
+bulk_updating = Signal()
+
+
+def data_changed(user_id: int, *models):
+    """
+    Bump data version of user and drop cached responses of models
+
+    Responses are dropped right away and once more after commit, so that
+    a read which ran between the two does not leave uncommitted state
+    cached, like bump_user_version does for the version stamp.
+    """
+    def invalidate():
+        cache = get_response_cache()
+        for model in models:
+            cache.invalidate(user_id, model._meta.model_name)
+
+    bump_user_version(user_id)
+    invalidate()
+    transaction.on_commit(invalidate)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def user_created(sender, instance, created, **kwargs):
+    """
+    Start new user with fresh stamps, ids can be reused on some databases
+    """
+    if created:
+        data_changed(instance.pk, Tag, Ingredient, Recipe)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Ingredient)
+@receiver(post_save, sender=Recipe)
+def object_saved(sender, instance, **kwargs):
+    """
+    Handle changed object, tags and ingredients are also expanded in
+    recipes
+    """
+    if sender is Recipe:
+        data_changed(instance.user_id, Recipe)
+    else:
+        data_changed(instance.user_id, sender, Recipe)
+
+
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Ingredient)
+@receiver(post_delete, sender=Recipe)
+def object_deleted(sender, instance, **kwargs):
+    """
+    Handle deleted object, tags and ingredients are also dropped from
+    recipes without m2m_changed, deleted recipes change their counts
+    """
+    if sender is Recipe:
+        data_changed(instance.user_id, Recipe, Tag, Ingredient)
+    else:
+        data_changed(instance.user_id, sender, Recipe)
+
+
+@receiver(m2m_changed, sender=Recipe.tag.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def recipe_relations_changed(sender, instance, action, reverse, pk_set,
+                             **kwargs):
+    """
+    Handle changed recipe tags or ingredients and their recipe counts
+    """
+    if not action.startswith('post_'):
+        return
+    _column, model = RELATIONS_BY_THROUGH[sender]
+    data_changed(instance.user_id, Recipe, model)
+    if reverse and pk_set:
+        user_ids = Recipe.objects.filter(pk__in=pk_set)\
+            .values_list('user_id', flat=True).distinct()
+        for user_id in user_ids:
+            data_changed(user_id, Recipe, model)
+
+
+@receiver(bulk_written)
+def objects_bulk_written(sender, user, objs, **kwargs):
+    """
+    Handle bulk created or updated objects
+    """
+    if sender is Recipe:
+        data_changed(user.pk, Recipe, Tag, Ingredient)
+    else:
+        data_changed(user.pk, sender, Recipe)
+
+
+@receiver(pre_save, sender=Recipe)
+def recipe_saving(sender, instance, raw, update_fields=None, **kwargs):
+    """
+    Remember stored price and time of changed recipe for its summary
+    """
+    instance._stored_summary = None
+    if raw or instance._state.adding or update_fields is not None \
+            and not {'price', 'time'} & set(update_fields):
+        return
+    instance._stored_summary = Recipe.objects.filter(pk=instance.pk)\
+        .values_list('price', 'time').first()
+
+
+@receiver(post_save, sender=Recipe)
+def summary_recipe_saved(sender, instance, created, raw, **kwargs):
+    """
+    Count created recipe or changed price and time in user summary
+
+    Raw saves, of fixtures and bulk writes, are not counted, bulk writes
+    are counted by ``bulk_written`` and fixtures by a rebuild.
+    """
+    contribution = Contribution()
+    stored = getattr(instance, '_stored_summary', None)
+    if raw or not created and stored is None:
+        return
+    if stored is not None:
+        contribution.add_recipe(*stored, count=-1)
+    contribution.add_recipe(instance.price, instance.time)
+    contribution.apply(instance.user_id)
+
+
+@receiver(pre_delete, sender=Recipe)
+def recipe_deleting(sender, instance, **kwargs):
+    """
+    Remember relations of deleted recipe, removed without m2m_changed
+    """
+    instance._stored_relations = relation_counts([instance.pk])
+
+
+@receiver(post_delete, sender=Recipe)
+def counts_recipe_deleted(sender, instance, **kwargs):
+    """
+    Subtract deleted recipe from user summary and from recipe counts of
+    its tags and ingredients
+    """
+    for model, counts in getattr(instance, '_stored_relations', ()):
+        change_counts(model, counts, -1)
+    contribution = Contribution()
+    contribution.add_recipe(instance.price, instance.time)
+    contribution.apply(instance.user_id, -1)
+
+
+@receiver(m2m_changed, sender=Recipe.tag.through)
+@receiver(m2m_changed, sender=Recipe.ingredients.through)
+def counts_relations_changed(sender, instance, action, reverse, pk_set,
+                             **kwargs):
+    """
+    Update recipe counts of added and removed tags or ingredients
+
+    Runs in the transaction of the relation change.
+    """
+    column, model = RELATIONS_BY_THROUGH[sender]
+    if action == 'pre_clear' and not reverse:
+        instance._cleared_relations = list(
+            sender.objects.filter(recipe_id=instance.pk)
+            .values_list(column, flat=True)
+        )
+    elif action == 'post_clear' and reverse:
+        model.objects.filter(pk=instance.pk).update(recipe_count=0)
+    elif action == 'post_clear':
+        cleared = getattr(instance, '_cleared_relations', ())
+        change_counts(model, dict.fromkeys(cleared, 1), -1)
+    elif action in ('post_add', 'post_remove') and pk_set:
+        sign = 1 if action == 'post_add' else -1
+        if reverse:
+            change_counts(model, {instance.pk: len(pk_set)}, sign)
+        else:
+            change_counts(model, dict.fromkeys(pk_set, 1), sign)
+
+
+@receiver(bulk_updating, sender=Recipe)
+def counts_recipes_updating(sender, user, objs, **kwargs):
+    """
+    Subtract stored state of bulk updated recipes from user summary and
+    recipe counts
+    """
+    ids = [obj.pk for obj in objs]
+    Contribution.of_recipes(ids).apply(user.pk, -1)
+    change_relation_counts(ids, -1)
+
+
+@receiver(bulk_written, sender=Recipe)
+def counts_recipes_written(sender, user, objs, **kwargs):
+    """
+    Add bulk created or updated recipes to user summary and recipe counts
+    """
+    ids = [obj.pk for obj in objs]
+    Contribution.of_recipes(ids).apply(user.pk)
+    change_relation_counts(ids)
+
+
+@receiver(setting_changed)
+def reset_response_cache_on_setting_change(setting, **kwargs):
+    if setting in ('RECIPE_RESPONSE_CACHE', 'CACHES'):
+        reset_response_cache()
@@ -0,0 +1,188 @@
+from collections import Counter
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Sum
+
+from core.models import Recipe, RecipeSummary, Tag
+
+# Upper bounds in minutes of cooking time histogram buckets, longer
+# recipes fall into the last, unbounded one
+TIME_BUCKETS = (15, 30, 60, 120)
+TOP_TAGS = 5
+
+
+def time_bucket(time: int) -> str:
+    """
+    Return histogram key of cooking time
+    """
+    for bound in TIME_BUCKETS:
+        if time <= bound:
+            return str(bound)
+    return 'more'
+
+
+class Contribution:
+    """
+    Share of some recipes in the summary of their user
+
+    Contributions are added to or subtracted from a ``RecipeSummary``,
+    so a change is applied as the difference between the old and the
+    new share of the changed recipes.
+    """
+    def __init__(self):
+        self.recipes = 0
+        self.price = Decimal(0)
+        self.times = Counter()
+
+    @classmethod
+    def of_recipes(cls, recipe_ids: Iterable[int]) -> 'Contribution':
+        """
+        Return contribution of stored recipes
+        """
+        contribution = cls()
+        ids = list(recipe_ids)
+        if not ids:
+            return contribution
+        for price, time in Recipe.objects.filter(pk__in=ids)\
+                .values_list('price', 'time'):
+            contribution.add_recipe(price, time)
+        return contribution
+
+    def add_recipe(self, price: Decimal, time: int, count: int = 1):
+        """
+        Count recipe, price can be any value accepted by the model field
+        """
+        price = Recipe._meta.get_field('price').to_python(price)
+        self.recipes += count
+        self.price += price * count
+        self.times[time_bucket(time)] += count
+
+    def apply(self, user_id: int, sign: int = 1):
+        """
+        Add contribution to summary of user, subtract with ``sign`` -1
+
+        Users without summary are skipped, theirs is built from all
+        recipes on first read.
+        """
+        if not self:
+            return
+        with transaction.atomic():
+            summary = RecipeSummary.objects.select_for_update()\
+                .filter(user_id=user_id).first()
+            if summary is None:
+                return
+            summary.recipe_count = max(
+                summary.recipe_count + sign * self.recipes, 0
+            )
+            summary.price_total += sign * self.price
+            summary.time_histogram = merge_counts(
+                summary.time_histogram, self.times, sign
+            )
+            summary.save()
+
+    def __bool__(self):
+        return bool(
+            self.recipes or self.price or any(self.times.values())
+        )
+
+
+def merge_counts(counts: Dict[str, int], delta: Counter,
+                 sign: int) -> Dict[str, int]:
+    """
+    Return counts changed by delta, dropping keys falling to zero
+    """
+    counts = dict(counts)
+    for key, value in delta.items():
+        key = str(key)
+        count = counts.get(key, 0) + sign * value
+        if count > 0:
+            counts[key] = count
+        else:
+            counts.pop(key, None)
+    return counts
+
+
+def compute_summary(user_id: int) -> RecipeSummary:
+    """
+    Return unsaved summary computed from all recipes of user
+    """
+    recipes = Recipe.objects.filter(user_id=user_id)
+    totals = recipes.aggregate(count=Count('id'), price=Sum('price'))
+    times = Counter()
+    for row in recipes.values('time').annotate(recipes=Count('id'))\
+            .order_by():
+        times[time_bucket(row['time'])] += row['recipes']
+    return RecipeSummary(
+        user_id=user_id,
+        recipe_count=totals['count'],
+        price_total=totals['price'] or Decimal(0),
+        time_histogram=dict(times)
+    )
+
+
+def rebuild_summary(user_id: int) -> bool:
+    """
+    Replace summary of user with one computed from all recipes
+
+    Return whether the stored summary was missing or different.
+    """
+    with transaction.atomic():
+        stored = RecipeSummary.objects.select_for_update()\
+            .filter(user_id=user_id).first()
+        summary = compute_summary(user_id)
+        if stored is not None and summary_values(stored) \
+                == summary_values(summary):
+            return False
+        summary.save()
+    return True
+
+
+def summary_values(summary: RecipeSummary) -> tuple:
+    return (
+        summary.recipe_count,
+        Decimal(summary.price_total),
+        summary.time_histogram,
+    )
+
+
+def get_summary(user_id: int) -> RecipeSummary:
+    """
+    Return summary of user, building it when missing
+    """
+    summary = RecipeSummary.objects.filter(user_id=user_id).first()
+    if summary is None:
+        try:
+            rebuild_summary(user_id)
+        except IntegrityError:
+            # Built by a concurrent request
+            pass
+        summary = RecipeSummary.objects.get(user_id=user_id)
+    return summary
+
+
+def summary_data(summary: RecipeSummary) -> Dict:
+    """
+    Return statistics of summary, with most used tags of the user
+
+    Tags are read from the ``(user, recipe_count, id)`` index.
+    """
+    count = summary.recipe_count
+    histogram: List[Dict[str, Optional[int]]] = [
+        {'max_time': bound, 'count': summary.time_histogram.get(key, 0)}
+        for bound, key in zip(
+            TIME_BUCKETS + (None, ),
+            [str(bound) for bound in TIME_BUCKETS] + ['more']
+        )
+    ]
+    top_tags = Tag.objects\
+        .filter(user_id=summary.user_id, recipe_count__gt=0)\
+        .order_by('-recipe_count', '-id')\
+        .values('id', 'name', 'recipe_count')[:TOP_TAGS]
+    return {
+        'recipe_count': count,
+        'average_price': summary.price_total / count if count else None,
+        'time_histogram': histogram,
+        'top_tags': list(top_tags),
+    }
@@ -0,0 +1,170 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Tag, Ingredient, Recipe
+
+TAGS_BULK_URL = reverse('recipe:tag-bulk')
+RECIPES_BULK_URL = reverse('recipe:recipe-bulk')
+
+
+class BulkApiTests(TestCase):
+    """
+    Test bulk create and update endpoints
+    """
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'mail@mail.com',
+            'password123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_bulk_create_tags(self):
+        """
+        Test creating list of tags
+        """
+        payload = [{'name': 'Vegan'}, {'name': 'Meat'}]
+
+        response = self.client.post(TAGS_BULK_URL, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        names = Tag.objects.filter(user=self.user)\
+            .values_list('name', flat=True)
+        self.assertEqual(set(names), {'Vegan', 'Meat'})
+        self.assertEqual(
+            [item['data']['name'] for item in response.data],
+            ['Vegan', 'Meat']
+        )
+
+    def test_bulk_create_reports_item_errors(self):
+        """
+        Test invalid items are reported without aborting the batch
+        """
+        payload = [{'name': 'Vegan'}, {'name': ''}]
+
+        response = self.client.post(TAGS_BULK_URL, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_207_MULTI_STATUS)
+        self.assertEqual(response.data[0]['status'], status.HTTP_201_CREATED)
+        self.assertEqual(
+            response.data[1]['status'],
+            status.HTTP_400_BAD_REQUEST
+        )
+        self.assertIn('name', response.data[1]['errors'])
+        self.assertEqual(Tag.objects.filter(user=self.user).count(), 1)
+
+    def test_bulk_create_recipes_with_relations(self):
+        """
+        Test creating recipes writes tags and ingredients
+        """
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        ingredient = Ingredient.objects.create(user=self.user, name='Salt')
+        payload = [
+            {
+                'title': f'Soup {index}',
+                'time': 10,
+                'price': '5.00',
+                'tag': [tag.id],
+                'ingredients': [ingredient.id],
+            }
+            for index in range(3)
+        ]
+
+        response = self.client.post(RECIPES_BULK_URL, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        recipes = Recipe.objects.filter(user=self.user)
+        self.assertEqual(recipes.count(), 3)
+        for recipe in recipes:
+            self.assertEqual(list(recipe.tag.all()), [tag])
+            self.assertEqual(list(recipe.ingredients.all()), [ingredient])
+
+    def test_bulk_update_recipes(self):
+        """
+        Test partial update of recipes replaces given relations only
+        """
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        new_tag = Tag.objects.create(user=self.user, name='Meat')
+        first = Recipe.objects.create(
+            user=self.user, title='Soup', time=5, price=5
+        )
+        second = Recipe.objects.create(
+            user=self.user, title='Salad', time=5, price=5
+        )
+        first.tag.add(tag)
+        second.tag.add(tag)
+        payload = [
+            {'id': first.id, 'title': 'Borsch'},
+            {'id': second.id, 'tag': [new_tag.id]},
+        ]
+
+        response = self.client.patch(RECIPES_BULK_URL, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        first.refresh_from_db()
+        self.assertEqual(first.title, 'Borsch')
+        self.assertEqual(list(first.tag.all()), [tag])
+        self.assertEqual(list(second.tag.all()), [new_tag])
+
+    def test_bulk_update_repeated_id(self):
+        """
+        Test items repeating an id are rejected, others are updated
+        """
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        first = Recipe.objects.create(
+            user=self.user, title='Soup', time=5, price=5
+        )
+        second = Recipe.objects.create(
+            user=self.user, title='Salad', time=5, price=5
+        )
+        payload = [
+            {'id': first.id, 'tag': [tag.id]},
+            {'id': second.id, 'title': 'Borsch'},
+            {'id': str(first.id), 'tag': [tag.id]},
+        ]
+
+        response = self.client.patch(RECIPES_BULK_URL, payload, format='json')
+
+        self.assertEqual(
+            [item['status'] for item in response.data],
+            [status.HTTP_400_BAD_REQUEST, status.HTTP_200_OK,
+             status.HTTP_400_BAD_REQUEST]
+        )
+        self.assertIn('id', response.data[0]['errors'])
+        self.assertEqual(list(first.tag.all()), [])
+        second.refresh_from_db()
+        self.assertEqual(second.title, 'Borsch')
+
+    def test_bulk_update_foreign_recipe_not_found(self):
+        """
+        Test other user's objects can not be updated
+        """
+        user2 = get_user_model().objects.create_user(
+            'other@mail.com',
+            'password123'
+        )
+        tag = Tag.objects.create(user=user2, name='Vegan')
+        payload = [{'id': tag.id, 'name': 'Hacked'}, {'name': 'No id'}]
+
+        response = self.client.patch(TAGS_BULK_URL, payload, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data[0]['status'], status.HTTP_404_NOT_FOUND)
+        self.assertIn('id', response.data[1]['errors'])
+        tag.refresh_from_db()
+        self.assertEqual(tag.name, 'Vegan')
+
+    def test_bulk_requires_list(self):
+        """
+        Test non-list payload is rejected
+        """
+        response = self.client.post(
+            TAGS_BULK_URL,
+            {'name': 'Vegan'},
+            format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,106 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Tag, Recipe
+from core.tests.utils import QueryBudgetMixin
+
+TAGS_URL = reverse('recipe:tag-list')
+TAGS_BULK_URL = reverse('recipe:tag-bulk')
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+class ConditionalGetTests(QueryBudgetMixin, TestCase):
+    """
+    Test ETag and If-None-Match handling
+    """
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'mail@mail.com',
+            'password123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def etag(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response['ETag']
+
+    def test_not_modified_without_queries(self):
+        """
+        Test unchanged list is answered with 304 without queries
+        """
+        Tag.objects.create(user=self.user, name='Vegan')
+        etag = self.etag(TAGS_URL)
+
+        with self.assertMaxQueries(0):
+            response = self.client.get(TAGS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+    def test_write_changes_etag(self):
+        """
+        Test creating tag changes ETag
+        """
+        etag = self.etag(TAGS_URL)
+        Tag.objects.create(user=self.user, name='Vegan')
+
+        response = self.client.get(TAGS_URL, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_relation_change_changes_etag(self):
+        """
+        Test adding tag to recipe changes recipe ETag
+        """
+        recipe = Recipe.objects.create(
+            user=self.user, title='Soup', time=5, price=5
+        )
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        etag = self.etag(RECIPES_URL)
+
+        recipe.tag.add(tag)
+
+        self.assertNotEqual(self.etag(RECIPES_URL), etag)
+
+    def test_bulk_write_changes_etag(self):
+        """
+        Test bulk create changes ETag
+        """
+        etag = self.etag(TAGS_URL)
+        self.client.post(TAGS_BULK_URL, [{'name': 'Vegan'}], format='json')
+
+        self.assertNotEqual(self.etag(TAGS_URL), etag)
+
+    def test_etag_depends_on_user_and_params(self):
+        """
+        Test ETag differs between users and query parameters
+        """
+        etag = self.etag(TAGS_URL)
+        other = get_user_model().objects.create_user(
+            'other@mail.com',
+            'password123'
+        )
+
+        self.assertNotEqual(self.etag(TAGS_URL, page_size=1), etag)
+        self.client.force_authenticate(other)
+        self.assertNotEqual(self.etag(TAGS_URL), etag)
+
+    def test_other_user_write_keeps_etag(self):
+        """
+        Test writes of other users do not change ETag
+        """
+        other = get_user_model().objects.create_user(
+            'other@mail.com',
+            'password123'
+        )
+        etag = self.etag(TAGS_URL)
+        Tag.objects.create(user=other, name='Vegan')
+
+        self.assertEqual(self.etag(TAGS_URL), etag)
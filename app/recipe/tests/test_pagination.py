@@ -0,0 +1,136 @@
+import json
+from base64 import urlsafe_b64encode
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Tag, Recipe
+
+TAGS_URL = reverse('recipe:tag-list')
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+class KeysetPaginationTests(TestCase):
+    """
+    Test cursor pagination of recipe app list endpoints
+    """
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'mail@mail.com',
+            'password123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def walk(self, url):
+        """
+        Follow next links and return ids of all listed objects
+        """
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(item['id'] for item in response.data['results'])
+            url = response.data['next']
+        return ids
+
+    @skipUnless(connection.vendor == 'postgresql', 'PostgreSQL search only')
+    def test_walk_ranked_search_with_tied_ranks(self):
+        """
+        Test ranked search lists every match once across pages
+        """
+        titles = ['Mushroom soup'] * 5 + ['Soup soup soup'] * 3 \
+            + ['Tomato soup with bread'] * 3 + ['Salad']
+        for title in titles:
+            Recipe.objects.create(
+                user=self.user, title=title, time=5, price=5
+            )
+
+        ids = self.walk(f'{RECIPES_URL}?search=soup&page_size=2')
+
+        self.assertEqual(len(ids), 11)
+        self.assertEqual(len(set(ids)), 11)
+        first = self.client.get(RECIPES_URL, {'search': 'soup'})
+        self.assertEqual(
+            ids,
+            [recipe['id'] for recipe in first.data['results']]
+        )
+
+    def test_walk_tags_with_duplicate_names(self):
+        """
+        Test every tag is listed once, ordered by name and id
+        """
+        for name in ('Vegan', 'Meat', 'Vegan', 'Fish', 'Meat', 'Vegan'):
+            Tag.objects.create(user=self.user, name=name)
+
+        ids = self.walk(f'{TAGS_URL}?page_size=2')
+
+        expected = Tag.objects.order_by('-name', '-id')\
+            .values_list('id', flat=True)
+        self.assertEqual(ids, list(expected))
+
+    def test_previous_page(self):
+        """
+        Test previous link returns the preceding page
+        """
+        for index in range(5):
+            Recipe.objects.create(
+                user=self.user,
+                title=f'Soup {index}',
+                time=5,
+                price=5
+            )
+
+        first = self.client.get(RECIPES_URL, {'page_size': 2})
+        second = self.client.get(first.data['next'])
+        previous = self.client.get(second.data['previous'])
+
+        self.assertIsNone(first.data['previous'])
+        self.assertEqual(previous.data['results'], first.data['results'])
+
+    def test_no_count_or_offset(self):
+        """
+        Test pages are fetched without COUNT and OFFSET
+        """
+        for index in range(5):
+            Tag.objects.create(user=self.user, name=f'Tag {index}')
+        first = self.client.get(TAGS_URL, {'page_size': 2})
+
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(first.data['next'])
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        for query in context.captured_queries:
+            self.assertNotIn('COUNT(', query['sql'].upper())
+            self.assertNotIn('OFFSET', query['sql'].upper())
+
+    def test_invalid_cursor(self):
+        """
+        Test malformed cursor is rejected
+        """
+        response = self.client.get(TAGS_URL, {'cursor': 'garbage'})
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cursor_with_wrong_value_types(self):
+        """
+        Test well-formed cursor with values of wrong types is rejected
+        """
+        for position in (['Vegan', 'abc'], ['Vegan', None], [None, 1],
+                         [{}, {}], ['Vegan', [1]]):
+            payload = json.dumps({'p': position, 'r': 0}).encode()
+            cursor = urlsafe_b64encode(payload).decode()
+
+            response = self.client.get(TAGS_URL, {'cursor': cursor})
+
+            self.assertEqual(
+                response.status_code,
+                status.HTTP_404_NOT_FOUND,
+                position
+            )
@@ -0,0 +1,81 @@
+import re
+from types import SimpleNamespace
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+
+from core.models import Tag, Ingredient, Recipe
+from recipe.views import TagViewSet, IngredientViewSet, RecipeViewSet
+
+USERS = 20
+ROWS_PER_USER = 50
+PAGE_SIZE = 100
+
+SQLITE_SORT = 'USE TEMP B-TREE FOR ORDER BY'
+POSTGRESQL_SORT = re.compile(r'(^|->)\s*(Incremental )?Sort\s+\(', re.M)
+
+
+class QueryPlanTests(TestCase):
+    """
+    Test recipe app list querysets are served by composite indexes
+    """
+    @classmethod
+    def setUpTestData(cls):
+        users = [
+            get_user_model().objects.create_user(f'user{index}@mail.com', None)
+            for index in range(USERS)
+        ]
+        for model in (Tag, Ingredient):
+            model.objects.bulk_create(
+                model(user=user, name=f'name {index}')
+                for user in users
+                for index in range(ROWS_PER_USER)
+            )
+        Recipe.objects.bulk_create(
+            Recipe(user=user, title=f'Recipe {index}', time=5, price=5)
+            for user in users
+            for index in range(ROWS_PER_USER)
+        )
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        cls.user = users[0]
+
+    def view_queryset(self, view_class):
+        """
+        Return first page of view queryset for the test user
+        """
+        view = view_class()
+        view.request = SimpleNamespace(user=self.user)
+        return view.get_queryset()[:PAGE_SIZE + 1]
+
+    def assertUsesIndex(self, queryset, index_name):
+        """
+        Assert planner reads rows in order through index_name
+        """
+        plan = queryset.explain()
+        if connection.vendor == 'sqlite':
+            self.assertNotIn(SQLITE_SORT, plan)
+        elif connection.vendor == 'postgresql':
+            self.assertIsNone(POSTGRESQL_SORT.search(plan), plan)
+        else:
+            self.skipTest(f'No plan checks for {connection.vendor}')
+        self.assertIn(index_name, plan)
+
+    def test_tags_use_user_name_index(self):
+        self.assertUsesIndex(
+            self.view_queryset(TagViewSet),
+            'core_tag_user_name_idx'
+        )
+
+    def test_ingredients_use_user_name_index(self):
+        self.assertUsesIndex(
+            self.view_queryset(IngredientViewSet),
+            'core_ingr_user_name_idx'
+        )
+
+    def test_recipes_use_user_id_index(self):
+        self.assertUsesIndex(
+            self.view_queryset(RecipeViewSet),
+            'core_recipe_user_id_idx'
+        )
@@ -1,27 +1,24 @@
+from types import SimpleNamespace
+from unittest import skipUnless
+
 from django.contrib.auth import get_user_model
+from django.db import connection
 from django.test import TestCase
 from django.urls import reverse
 
 from rest_framework import status
 from rest_framework.test import APIClient
 
-from core.models import Recipe
+from core.models import Recipe, Tag, Ingredient
+from core.tests.utils import QueryBudgetMixin
 from recipe.serializers import RecipeSerializer
+from recipe.tests.utils import detail_url, sample_recipe
 
 RECIPES_URL = reverse('recipe:recipe-list')
 
-
-def sample_recipe(user, **kwargs) -> Recipe:
-    """
-    Create simple recipe
-    """
-    defaults = {
-        'title': 'Soup',
-        'time': 10,
-        'price': 5.0,
-    }
-    defaults.update(kwargs)
-    return Recipe.objects.create(user=user, **defaults)
+# Recipes, ingredients and tags are fetched with one query each
+RECIPE_LIST_MAX_QUERIES = 3
+RECIPE_DETAIL_MAX_QUERIES = 3
 
 
 class PublicRecipeAPITests(TestCase):
@@ -40,7 +37,7 @@ class PublicRecipeAPITests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
-class PrivateRecipeAPITests(TestCase):
+class PrivateRecipeAPITests(QueryBudgetMixin, TestCase):
     """
     Test authenticated recipe API access
     """
@@ -66,13 +63,13 @@ class PrivateRecipeAPITests(TestCase):
         serializer = RecipeSerializer(recipes, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(res.data['results'], serializer.data)
 
     def test_recipes_limited_to_user(self):
         """
         Test retrieving for user
         """
-        user2 = self.user = get_user_model().objects.create_user(
+        user2 = get_user_model().objects.create_user(
             'test22@test.com',
             '22testpass123'
         )
@@ -85,6 +82,321 @@ class PrivateRecipeAPITests(TestCase):
         serializer = RecipeSerializer(recipes, many=True)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(res.data), 1)
-        self.assertEqual(res.data, serializer.data)
+        self.assertEqual(len(res.data['results']), 1)
+        self.assertEqual(res.data['results'], serializer.data)
+
+    def test_list_recipes_query_count_is_constant(self):
+        """
+        Test listing recipes does not run a query per recipe
+        """
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        ingredient = Ingredient.objects.create(user=self.user, name='Salt')
+        for _ in range(10):
+            recipe = sample_recipe(user=self.user)
+            recipe.tag.add(tag)
+            recipe.ingredients.add(ingredient)
+
+        with self.assertMaxQueries(RECIPE_LIST_MAX_QUERIES) as queries:
+            res = self.client.get(RECIPES_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        for query in queries.captured_queries:
+            self.assertNotIn('search_vector', query['sql'])
+        results = res.data['results']
+        self.assertEqual(len(results), 10)
+        self.assertEqual(results[0]['tag'], [tag.id])
+        self.assertEqual(results[0]['ingredients'], [ingredient.id])
+
+    def test_retrieve_recipe_query_budget(self):
+        """
+        Test retrieving recipe detail stays within query budget
+        """
+        recipe = sample_recipe(user=self.user)
+        recipe.tag.add(Tag.objects.create(user=self.user, name='Vegan'))
+
+        res = self.assertQueryBudget(
+            RECIPE_DETAIL_MAX_QUERIES,
+            self.client.get,
+            detail_url(recipe.id)
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, RecipeSerializer(recipe).data)
+
+    def test_filter_recipes_by_tags(self):
+        """
+        Test filtering recipes having any of given tags
+        """
+        vegan = Tag.objects.create(user=self.user, name='Vegan')
+        fish = Tag.objects.create(user=self.user, name='Fish')
+        salad = sample_recipe(user=self.user, title='Salad')
+        salad.tag.add(vegan, fish)
+        soup = sample_recipe(user=self.user, title='Soup')
+        soup.tag.add(fish)
+        sample_recipe(user=self.user, title='Steak')
+
+        res = self.client.get(RECIPES_URL, {'tags': f'{vegan.id},{fish.id}'})
+
+        titles = [recipe['title'] for recipe in res.data['results']]
+        self.assertEqual(titles, ['Soup', 'Salad'])
+
+    def test_filter_recipes_by_all_tags_and_ingredients(self):
+        """
+        Test filtering recipes having all given tags and ingredients
+        """
+        vegan = Tag.objects.create(user=self.user, name='Vegan')
+        fish = Tag.objects.create(user=self.user, name='Fish')
+        salt = Ingredient.objects.create(user=self.user, name='Salt')
+        salad = sample_recipe(user=self.user, title='Salad')
+        salad.tag.add(vegan, fish)
+        salad.ingredients.add(salt)
+        soup = sample_recipe(user=self.user, title='Soup')
+        soup.tag.add(vegan, fish)
+        sample_recipe(user=self.user, title='Steak').tag.add(vegan)
+
+        res = self.client.get(RECIPES_URL, {
+            'tags': f'{vegan.id},{fish.id}',
+            'ingredients': str(salt.id),
+            'match': 'all',
+        })
+
+        titles = [recipe['title'] for recipe in res.data['results']]
+        self.assertEqual(titles, ['Salad'])
+
+    def test_filter_recipes_invalid_ids(self):
+        """
+        Test malformed filter is rejected
+        """
+        res = self.client.get(RECIPES_URL, {'tags': 'vegan'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_filter_recipes_ids_out_of_range(self):
+        """
+        Test zero, negative and overflowing ids are rejected
+        """
+        for param, value in (('tags', '0'), ('tags', '1,-5'),
+                             ('ingredients', '99999999999999999999'),
+                             ('ingredients', str(2 ** 31))):
+            res = self.client.get(RECIPES_URL, {param: value})
+
+            self.assertEqual(
+                res.status_code,
+                status.HTTP_400_BAD_REQUEST,
+                value
+            )
+            self.assertIn(param, res.data)
+
+    def test_search_recipes_by_title(self):
+        """
+        Test searching recipes by words of title
+        """
+        sample_recipe(user=self.user, title='Mushroom soup')
+        sample_recipe(user=self.user, title='Chicken soup')
+        sample_recipe(user=self.user, title='Mushroom risotto')
+
+        res = self.client.get(RECIPES_URL, {'search': 'mushroom soup'})
+
+        titles = [recipe['title'] for recipe in res.data['results']]
+        self.assertEqual(titles, ['Mushroom soup'])
+
+    @skipUnless(connection.vendor == 'postgresql', 'PostgreSQL search only')
+    def test_search_recipes_ranked(self):
+        """
+        Test search results are ordered by rank on PostgreSQL
+        """
+        sample_recipe(user=self.user, title='Soup with bread')
+        sample_recipe(user=self.user, title='Soup soup soup')
+        sample_recipe(user=self.user, title='Salad')
+
+        res = self.client.get(RECIPES_URL, {'search': 'soups'})
+
+        titles = [recipe['title'] for recipe in res.data['results']]
+        self.assertEqual(titles, ['Soup soup soup', 'Soup with bread'])
+
+    def test_create_recipe(self):
+        """
+        Test creating recipe assigns it to authenticated user
+        """
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        payload = {
+            'title': 'Salad',
+            'time': 5,
+            'price': '4.50',
+            'tag': [tag.id],
+            'ingredients': [],
+        }
+
+        res = self.client.post(RECIPES_URL, payload, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        recipe = Recipe.objects.get(id=res.data['id'])
+        self.assertEqual(recipe.user, self.user)
+        self.assertEqual(list(recipe.tag.all()), [tag])
+
+    def test_list_recipes_sparse_fields(self):
+        """
+        Test only requested fields are rendered and loaded
+        """
+        recipe = sample_recipe(user=self.user, title='Salad')
+        recipe.tag.add(Tag.objects.create(user=self.user, name='Vegan'))
+
+        with self.assertMaxQueries(1) as context:
+            res = self.client.get(RECIPES_URL, {'fields': 'id,title'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.data['results'],
+            [{'id': recipe.id, 'title': 'Salad'}]
+        )
+        self.assertNotIn('price', context.captured_queries[0]['sql'])
+
+    def test_sparse_fields_prefetch_requested_relations(self):
+        """
+        Test only requested many-to-many relations are prefetched
+        """
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        recipe = sample_recipe(user=self.user)
+        recipe.tag.add(tag)
+        recipe.ingredients.add(
+            Ingredient.objects.create(user=self.user, name='Salt')
+        )
+
+        with self.assertMaxQueries(2):
+            res = self.client.get(detail_url(recipe.id), {'fields': 'tag'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data, {'tag': [tag.id]})
+
+    def test_sparse_fields_keep_pagination(self):
+        """
+        Test cursor pagination works without the ordering field rendered
+        """
+        for title in ('Soup', 'Salad', 'Steak'):
+            sample_recipe(user=self.user, title=title)
+
+        res = self.client.get(RECIPES_URL, {'fields': 'title', 'page_size': 2})
+        next_page = self.client.get(res.data['next'])
+
+        titles = [recipe['title'] for recipe in res.data['results']]
+        titles += [recipe['title'] for recipe in next_page.data['results']]
+        self.assertEqual(titles, ['Steak', 'Salad', 'Soup'])
+
+    def test_sparse_fields_unknown(self):
+        """
+        Test unknown field names are rejected
+        """
+        res = self.client.get(RECIPES_URL, {'fields': 'id,user'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', res.data)
+
+    def test_list_recipes_expanded(self):
+        """
+        Test expanded relations are inlined with one query per relation
+        """
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        ingredient = Ingredient.objects.create(user=self.user, name='Salt')
+        for _ in range(5):
+            recipe = sample_recipe(user=self.user)
+            recipe.tag.add(tag)
+            recipe.ingredients.add(ingredient)
+
+        with self.assertMaxQueries(RECIPE_LIST_MAX_QUERIES):
+            res = self.client.get(RECIPES_URL, {'expand': 'ingredients,tag'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        for result in res.data['results']:
+            self.assertEqual(result['tag'], [{'id': tag.id, 'name': 'Vegan'}])
+            self.assertEqual(
+                result['ingredients'],
+                [{'id': ingredient.id, 'name': 'Salt'}]
+            )
+
+    def test_retrieve_recipe_expand_with_sparse_fields(self):
+        """
+        Test expanding one relation of a sparse fieldset
+        """
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        recipe = sample_recipe(user=self.user)
+        recipe.tag.add(tag)
+
+        with self.assertMaxQueries(2):
+            res = self.client.get(
+                detail_url(recipe.id),
+                {'fields': 'id,tag', 'expand': 'tag,ingredients'}
+            )
+
+        self.assertEqual(res.data, {
+            'id': recipe.id,
+            'tag': [{'id': tag.id, 'name': 'Vegan'}],
+        })
+
+    def test_expand_unknown_relation(self):
+        """
+        Test only declared relations can be expanded
+        """
+        res = self.client.get(RECIPES_URL, {'expand': 'title'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('expand', res.data)
+
+    def test_create_recipe_validates_relations_in_batch(self):
+        """
+        Test related ids are resolved with one query per relation
+        """
+        ingredients = Ingredient.objects.bulk_create(
+            Ingredient(user=self.user, name=f'Ingredient {index}')
+            for index in range(50)
+        )
+        ids = list(
+            Ingredient.objects.filter(user=self.user)
+            .values_list('id', flat=True)
+        )
+        self.assertEqual(len(ids), len(ingredients))
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        request = SimpleNamespace(user=self.user)
+        serializer = RecipeSerializer(
+            data={
+                'title': 'Stew',
+                'time': 60,
+                'price': '12.00',
+                'ingredients': ids,
+                'tag': [tag.id],
+            },
+            context={'request': request}
+        )
+
+        with self.assertNumQueries(2):
+            self.assertTrue(serializer.is_valid())
+        self.assertEqual(
+            [item.id for item in serializer.validated_data['ingredients']],
+            ids
+        )
+
+    def test_create_recipe_rejects_other_users_relations(self):
+        """
+        Test tags of other users and missing ids are reported together
+        """
+        other = get_user_model().objects.create_user(
+            'other@test.com',
+            'testpass123'
+        )
+        foreign = Tag.objects.create(user=other, name='Foreign')
+        own = Tag.objects.create(user=self.user, name='Own')
+        payload = {
+            'title': 'Salad',
+            'time': 5,
+            'price': '4.50',
+            'tag': [own.id, foreign.id, 999999],
+            'ingredients': [],
+        }
+
+        res = self.client.post(RECIPES_URL, payload, format='json')
 
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        error = str(res.data['tag'][0])
+        self.assertIn(f'"{foreign.id}"', error)
+        self.assertIn('"999999"', error)
+        self.assertNotIn(f'"{own.id}"', error)
+        self.assertFalse(Recipe.objects.exists())
@@ -0,0 +1,134 @@
+from django.urls import reverse
+from rest_framework import status
+
+from core.models import Ingredient, Recipe, Tag
+from recipe.counters import drifted_counts
+from recipe.tests.utils import RecipeDataTestCase, detail_url, \
+    sample_recipe
+
+TAGS_URL = reverse('recipe:tag-list')
+INGREDIENTS_URL = reverse('recipe:ingredient-list')
+RECIPES_URL = reverse('recipe:recipe-list')
+RECIPES_BULK_URL = reverse('recipe:recipe-bulk')
+
+
+class RecipeCountTests(RecipeDataTestCase):
+    """
+    Test recipe counts of tags and ingredients follow their relations
+    """
+    def assertCountsCurrent(self):
+        """
+        Assert every stored count equals the number of related recipes
+        """
+        for model in (Tag, Ingredient):
+            self.assertEqual(list(drifted_counts(model.objects.all())), [])
+
+    def counts(self, model=Tag):
+        return dict(model.objects.values_list('name', 'recipe_count'))
+
+    def test_api_writes_update_counts(self):
+        """
+        Test create, update and delete through the API
+        """
+        res = self.client.post(RECIPES_URL, {
+            'title': 'Curry', 'time': 30, 'price': '12.00',
+            'tag': [self.vegan.id, self.quick.id],
+            'ingredients': [self.salt.id],
+        }, format='json')
+        self.assertEqual(self.counts(), {'Vegan': 1, 'Quick': 1})
+        self.assertEqual(self.counts(Ingredient), {'Salt': 1})
+
+        self.client.patch(detail_url(res.data['id']), {
+            'tag': [self.quick.id],
+        }, format='json')
+        self.assertEqual(self.counts(), {'Vegan': 0, 'Quick': 1})
+
+        self.client.delete(detail_url(res.data['id']))
+        self.assertEqual(self.counts(), {'Vegan': 0, 'Quick': 0})
+        self.assertEqual(self.counts(Ingredient), {'Salt': 0})
+
+    def test_relation_changes_from_both_sides(self):
+        """
+        Test adding, removing and clearing from recipes and from tags
+        """
+        first = sample_recipe(self.user, tags=[self.vegan])
+        second = sample_recipe(self.user, tags=[self.vegan, self.quick])
+        self.quick.recipe_set.add(first)
+        self.assertEqual(self.counts(), {'Vegan': 2, 'Quick': 2})
+
+        self.vegan.recipe_set.remove(second)
+        second.tag.clear()
+        self.assertEqual(self.counts(), {'Vegan': 1, 'Quick': 1})
+
+        self.vegan.recipe_set.clear()
+        first.tag.set([self.quick])
+        self.assertCountsCurrent()
+        self.assertEqual(self.counts(), {'Vegan': 0, 'Quick': 1})
+
+    def test_bulk_writes_update_counts(self):
+        """
+        Test bulk created and updated recipes are counted once
+        """
+        res = self.client.post(RECIPES_BULK_URL, [
+            {'title': f'Recipe {index}', 'time': 20, 'price': '3.00',
+             'tag': [self.vegan.id], 'ingredients': [self.salt.id]}
+            for index in range(3)
+        ], format='json')
+        self.assertEqual(self.counts(), {'Vegan': 3, 'Quick': 0})
+
+        ids = [result['data']['id'] for result in res.data]
+        self.client.patch(RECIPES_BULK_URL, [
+            {'id': ids[0], 'tag': [self.quick.id]},
+            {'id': ids[1], 'time': 150},
+        ], format='json')
+        self.assertEqual(self.counts(), {'Vegan': 2, 'Quick': 1})
+        self.assertEqual(self.counts(Ingredient), {'Salt': 3})
+
+        Recipe.objects.filter(user=self.user).delete()
+        self.assertEqual(self.counts(), {'Vegan': 0, 'Quick': 0})
+
+    def test_stale_instance_keeps_count(self):
+        """
+        Test saving a tag loaded before recipe changes keeps the count
+        """
+        stale = Tag.objects.get(pk=self.vegan.pk)
+        sample_recipe(self.user, tags=[self.vegan])
+
+        stale.name = 'Plant based'
+        stale.save()
+
+        self.assertEqual(self.counts(), {'Plant based': 1, 'Quick': 0})
+
+    def test_order_by_recipe_count(self):
+        """
+        Test listing tags by popularity across keyset pages
+        """
+        tags = [Tag.objects.create(user=self.user, name=f'Tag {index}')
+                for index in range(4)]
+        for index, tag in enumerate(tags):
+            for _ in range(index % 3):
+                sample_recipe(self.user, tags=[tag])
+
+        ids = []
+        url = f'{TAGS_URL}?ordering=-recipe_count&page_size=2'
+        while url:
+            res = self.client.get(url)
+            self.assertEqual(res.status_code, status.HTTP_200_OK)
+            ids += [tag['id'] for tag in res.data['results']]
+            url = res.data['next']
+
+        expected = list(
+            Tag.objects.filter(user=self.user)
+            .order_by('-recipe_count', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(ids, expected)
+        self.assertEqual(ids[0], tags[2].id)
+
+    def test_invalid_ordering(self):
+        """
+        Test ordering by an unsupported field is rejected
+        """
+        res = self.client.get(INGREDIENTS_URL, {'ordering': 'user'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('ordering', res.data)
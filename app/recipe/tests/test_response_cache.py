@@ -0,0 +1,128 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Tag, Ingredient, Recipe
+from core.tests.utils import QueryBudgetMixin
+from recipe.cache import get_response_cache
+from recipe.tests.utils import detail_url
+
+TAGS_URL = reverse('recipe:tag-list')
+
+
+class ResponseCacheTests(QueryBudgetMixin, TestCase):
+    """
+    Test per-user response cache of recipe app endpoints
+    """
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'mail@mail.com',
+            'password123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.cache = get_response_cache()
+        self.cache.reset_stats()
+
+    def test_list_served_from_cache(self):
+        """
+        Test repeated list is served without queries
+        """
+        Tag.objects.create(user=self.user, name='Vegan')
+        first = self.client.get(TAGS_URL)
+
+        with self.assertMaxQueries(0):
+            second = self.client.get(TAGS_URL)
+
+        self.assertEqual(second.status_code, status.HTTP_200_OK)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(self.cache.stats()['hits'], 1)
+        self.assertEqual(self.cache.stats()['misses'], 1)
+
+    def test_write_invalidates_cache(self):
+        """
+        Test creating tag drops cached tag list
+        """
+        self.client.get(TAGS_URL)
+        Tag.objects.create(user=self.user, name='Vegan')
+
+        response = self.client.get(TAGS_URL)
+
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(self.cache.stats()['hits'], 0)
+        self.assertGreater(self.cache.stats()['invalidations'], 0)
+
+    def test_write_invalidates_cache_after_commit(self):
+        """
+        Test response cached during a write transaction is dropped on commit
+        """
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                Tag.objects.create(user=self.user, name='Vegan')
+                # Read of another request before the commit
+                self.cache.set(self.user.pk, 'tag', 'list', {'stale': True})
+
+        self.assertIsNone(self.cache.get(self.user.pk, 'tag', 'list'))
+
+    def test_other_model_write_keeps_cache(self):
+        """
+        Test creating ingredient keeps cached tag list
+        """
+        self.client.get(TAGS_URL)
+        Ingredient.objects.create(user=self.user, name='Salt')
+
+        self.client.get(TAGS_URL)
+
+        self.assertEqual(self.cache.stats()['hits'], 1)
+
+    def test_recipe_detail_invalidated_by_relation_change(self):
+        """
+        Test adding tag to recipe drops cached recipe detail
+        """
+        recipe = Recipe.objects.create(
+            user=self.user, title='Soup', time=5, price=5
+        )
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        self.client.get(detail_url(recipe.id))
+
+        recipe.tag.add(tag)
+        response = self.client.get(detail_url(recipe.id))
+
+        self.assertEqual(response.data['tag'], [tag.id])
+
+    def test_expanded_recipes_invalidated_by_tag_rename(self):
+        """
+        Test renaming tag drops cached recipes expanding it
+        """
+        recipe = Recipe.objects.create(
+            user=self.user, title='Soup', time=5, price=5
+        )
+        tag = Tag.objects.create(user=self.user, name='Old')
+        recipe.tag.add(tag)
+        url = reverse('recipe:recipe-list')
+        self.client.get(url, {'expand': 'tag'})
+
+        tag.name = 'New'
+        tag.save()
+        response = self.client.get(url, {'expand': 'tag'})
+
+        self.assertEqual(response.data['results'][0]['tag'][0]['name'], 'New')
+
+    def test_cache_scoped_to_user(self):
+        """
+        Test cached list of one user is not served to another
+        """
+        Tag.objects.create(user=self.user, name='Vegan')
+        self.client.get(TAGS_URL)
+        other = get_user_model().objects.create_user(
+            'other@mail.com',
+            'password123'
+        )
+        self.client.force_authenticate(other)
+
+        response = self.client.get(TAGS_URL)
+
+        self.assertEqual(response.data['results'], [])
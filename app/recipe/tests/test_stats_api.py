@@ -0,0 +1,197 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Recipe, RecipeSummary, Tag
+from recipe.stats import compute_summary, summary_values
+from recipe.tests.utils import RecipeDataTestCase, detail_url, \
+    sample_recipe
+
+STATS_URL = reverse('recipe:stats')
+RECIPES_URL = reverse('recipe:recipe-list')
+RECIPES_BULK_URL = reverse('recipe:recipe-bulk')
+
+
+class PublicStatsAPITests(TestCase):
+    """
+    Test unauthenticated statistics access
+    """
+    def test_auth_required(self):
+        res = APIClient().get(STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateStatsAPITests(RecipeDataTestCase):
+    """
+    Test recipe statistics of authenticated user
+    """
+    def assertSummaryCurrent(self):
+        """
+        Assert stored summary equals one computed from all recipes
+        """
+        stored = RecipeSummary.objects.get(user=self.user)
+        self.assertEqual(
+            summary_values(stored),
+            summary_values(compute_summary(self.user.pk))
+        )
+
+    def test_stats(self):
+        """
+        Test count, average price, time histogram and top tags
+        """
+        sample_recipe(self.user, tags=[self.vegan, self.quick], time=10)
+        sample_recipe(
+            self.user, tags=[self.vegan], time=45, price=Decimal('10.00')
+        )
+        sample_recipe(self.user, time=200, price=Decimal('2.50'))
+        other = get_user_model().objects.create_user('other@mail.com', None)
+        Recipe.objects.create(user=other, title='Pie', time=5, price=1)
+
+        res = self.client.get(STATS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.data['recipe_count'], 3)
+        self.assertEqual(res.data['average_price'], '5.83')
+        self.assertEqual(
+            [(b['max_time'], b['count']) for b in res.data['time_histogram']],
+            [(15, 1), (30, 0), (60, 1), (120, 0), (None, 1)]
+        )
+        self.assertEqual(res.data['top_tags'], [
+            {'id': self.vegan.id, 'name': 'Vegan', 'recipe_count': 2},
+            {'id': self.quick.id, 'name': 'Quick', 'recipe_count': 1},
+        ])
+
+    def test_empty(self):
+        """
+        Test user without recipes has no average price
+        """
+        res = self.client.get(STATS_URL)
+
+        self.assertEqual(res.data['recipe_count'], 0)
+        self.assertIsNone(res.data['average_price'])
+        self.assertEqual(res.data['top_tags'], [])
+
+    def test_constant_queries(self):
+        """
+        Test reading statistics does not depend on number of recipes
+        """
+        sample_recipe(self.user, tags=[self.vegan])
+        self.client.get(STATS_URL)
+        with CaptureQueriesContext(connection) as few:
+            self.client.get(STATS_URL)
+
+        for index in range(30):
+            sample_recipe(
+                self.user, tags=[self.vegan, self.quick], time=index * 5
+            )
+        with CaptureQueriesContext(connection) as many:
+            res = self.client.get(STATS_URL)
+
+        self.assertEqual(len(many), len(few))
+        self.assertEqual(res.data['recipe_count'], 31)
+
+    def test_api_writes_update_summary(self):
+        """
+        Test create, update, tag changes and delete keep summary current
+        """
+        self.client.get(STATS_URL)
+
+        res = self.client.post(RECIPES_URL, {
+            'title': 'Curry', 'time': 30, 'price': '12.00',
+            'tag': [self.vegan.id], 'ingredients': [self.salt.id],
+        }, format='json')
+        self.assertSummaryCurrent()
+        recipe_id = res.data['id']
+
+        self.client.patch(detail_url(recipe_id), {
+            'price': '8.50', 'time': 90, 'tag': [self.quick.id],
+        }, format='json')
+        self.assertSummaryCurrent()
+
+        self.client.delete(detail_url(recipe_id))
+        self.assertSummaryCurrent()
+        summary = RecipeSummary.objects.get(user=self.user)
+        self.assertEqual(summary.recipe_count, 0)
+        self.assertEqual(
+            list(Tag.objects.filter(user=self.user)
+                 .values_list('recipe_count', flat=True).distinct()),
+            [0]
+        )
+
+    def test_model_changes_update_summary(self):
+        """
+        Test relation changes from both sides and tag deletion
+        """
+        recipe = sample_recipe(self.user, tags=[self.vegan])
+        self.client.get(STATS_URL)
+
+        other = sample_recipe(
+            self.user, tags=[self.vegan, self.quick], time=70
+        )
+        self.quick.recipe_set.add(recipe)
+        self.assertSummaryCurrent()
+
+        self.vegan.recipe_set.remove(other)
+        other.tag.clear()
+        self.assertSummaryCurrent()
+
+        self.vegan.recipe_set.clear()
+        self.assertSummaryCurrent()
+
+        self.quick.delete()
+        recipe.price = Decimal('7.25')
+        recipe.save(update_fields=['price'])
+        Recipe.objects.filter(pk=other.pk).delete()
+        self.assertSummaryCurrent()
+
+    def test_bulk_writes_update_summary(self):
+        """
+        Test bulk created and updated recipes are counted once
+        """
+        self.client.get(STATS_URL)
+
+        res = self.client.post(RECIPES_BULK_URL, [
+            {'title': f'Recipe {index}', 'time': 20, 'price': '3.00',
+             'tag': [self.vegan.id], 'ingredients': [self.salt.id]}
+            for index in range(3)
+        ], format='json')
+        self.assertSummaryCurrent()
+
+        ids = [result['data']['id'] for result in res.data]
+        self.client.patch(RECIPES_BULK_URL, [
+            {'id': ids[0], 'price': '9.99', 'tag': [self.quick.id]},
+            {'id': ids[1], 'time': 150},
+        ], format='json')
+        self.assertSummaryCurrent()
+        self.assertEqual(
+            RecipeSummary.objects.get(user=self.user).recipe_count, 3
+        )
+
+    def test_rebuild_command(self):
+        """
+        Test rebuild command repairs drifted summaries only
+        """
+        sample_recipe(self.user, tags=[self.vegan])
+        self.client.get(STATS_URL)
+        RecipeSummary.objects.filter(user=self.user).update(recipe_count=10)
+        out = StringIO()
+
+        call_command('rebuild_recipe_stats', stdout=out)
+
+        self.assertIn('rebuilt 1 summaries', out.getvalue())
+        self.assertSummaryCurrent()
+
+        out = StringIO()
+        call_command(
+            'rebuild_recipe_stats', '--user', str(self.user.pk), stdout=out
+        )
+        self.assertIn('Checked 1 users, rebuilt 0 summaries', out.getvalue())
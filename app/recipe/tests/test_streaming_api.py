@@ -0,0 +1,84 @@
+import json
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Tag, Recipe
+from core.tests.utils import QueryBudgetMixin
+from recipe.serializers import RecipeSerializer, TagSerializer
+from recipe.views import RecipeViewSet
+
+TAGS_URL = reverse('recipe:tag-list')
+RECIPES_URL = reverse('recipe:recipe-list')
+
+
+class StreamingListTests(QueryBudgetMixin, TestCase):
+    """
+    Test streaming list responses
+    """
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            'mail@mail.com',
+            'password123'
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def stream(self, url):
+        """
+        Return streaming response and its decoded JSON body
+        """
+        response = self.client.get(url, {'stream': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        return response, json.loads(b''.join(response.streaming_content))
+
+    def test_stream_empty_list(self):
+        """
+        Test empty list is streamed as valid JSON
+        """
+        response, data = self.stream(TAGS_URL)
+
+        self.assertEqual(data, [])
+
+    def test_stream_tags(self):
+        """
+        Test streamed tags match serialized tags
+        """
+        for index in range(5):
+            Tag.objects.create(user=self.user, name=f'Tag {index}')
+
+        response, data = self.stream(TAGS_URL)
+
+        tags = Tag.objects.order_by('-name', '-id')
+        self.assertEqual(data, TagSerializer(tags, many=True).data)
+
+    @patch.object(RecipeViewSet, 'stream_chunk_size', 2)
+    def test_stream_recipes_in_chunks(self):
+        """
+        Test recipes are streamed in chunks with prefetched relations
+        """
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+        for index in range(5):
+            recipe = Recipe.objects.create(
+                user=self.user,
+                title=f'Soup {index}',
+                time=5,
+                price=5
+            )
+            recipe.tag.add(tag)
+
+        # Recipes query plus two prefetch queries for each of three chunks
+        with self.assertMaxQueries(7):
+            response, data = self.stream(RECIPES_URL)
+
+        recipes = Recipe.objects.order_by('-id')
+        expected = json.loads(json.dumps(
+            RecipeSerializer(recipes, many=True).data
+        ))
+        self.assertEqual(data, expected)
+        self.assertEqual(data[0]['tag'], [tag.id])
@@ -58,7 +58,7 @@ class PrivateApiTests(TestCase):
         serializer = TagSerializer(tags, many=True)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(response.data, serializer.data)
+        self.assertEqual(response.data['results'], serializer.data)
 
     def test_user_see_own_tags(self):
         """
@@ -74,8 +74,8 @@ class PrivateApiTests(TestCase):
         response = self.client.get(TAGS_URL)
 
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['name'], tag.name)
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['name'], tag.name)
 
     def test_create_tag_success(self):
         """
@@ -96,3 +96,14 @@ class PrivateApiTests(TestCase):
         response = self.client.post(TAGS_URL, payload)
 
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_retrieve_tags_sparse_fields(self):
+        """
+        Test listing only ids of tags
+        """
+        tag = Tag.objects.create(user=self.user, name='Vegan')
+
+        response = self.client.get(TAGS_URL, {'fields': 'id'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'], [{'id': tag.id}])
@@ -0,0 +1,108 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Ingredient, Recipe, Tag
+from core.tests.utils import QueryBudgetMixin
+
+RECIPES_URL = reverse('recipe:recipe-list')
+TAGS_URL = reverse('recipe:tag-list')
+INGREDIENTS_URL = reverse('recipe:ingredient-list')
+
+
+class ValuesListTests(QueryBudgetMixin, TestCase):
+    """
+    Test lists rendered from values() rows match regular serialization
+    """
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'mail@mail.com',
+            'password123'
+        )
+        self.client.force_authenticate(self.user)
+        tags = [
+            Tag.objects.create(user=self.user, name=name)
+            for name in ('Vegan', 'Dessert', 'Quick')
+        ]
+        ingredients = [
+            Ingredient.objects.create(user=self.user, name=name)
+            for name in ('Salt', 'Sugar')
+        ]
+        for index, price in enumerate(('5', '12.5', '0.99', '100')):
+            recipe = Recipe.objects.create(
+                user=self.user,
+                title=f'Recipe {index}',
+                time=10 + index,
+                price=Decimal(price),
+                link='https://example.com' if index % 2 else ''
+            )
+            recipe.tag.add(*reversed(tags[:index]))
+            recipe.ingredients.add(*ingredients[index % 2:])
+
+    def get_both(self, url: str, params=None):
+        """
+        Return response bodies of regular and values() rendering
+        """
+        bodies = []
+        for values_lists in (False, True):
+            cache.clear()
+            with override_settings(RECIPE_VALUES_LISTS=values_lists):
+                response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            bodies.append(response.content)
+        return bodies
+
+    def test_recipes_identical(self):
+        """
+        Test recipe list JSON is byte identical
+        """
+        regular, values = self.get_both(RECIPES_URL)
+
+        self.assertEqual(values, regular)
+        self.assertIn(b'"price":"12.50"', values)
+
+    def test_pages_identical(self):
+        """
+        Test paginated lists and cursors are byte identical
+        """
+        for url in (RECIPES_URL, TAGS_URL, INGREDIENTS_URL):
+            regular, values = self.get_both(url, {'page_size': 1})
+            self.assertEqual(values, regular)
+
+    def test_sparse_fields_and_search_identical(self):
+        """
+        Test sparse fieldsets and search results are byte identical
+        """
+        regular, values = self.get_both(
+            RECIPES_URL,
+            {'fields': 'title,tag', 'search': 'recipe'}
+        )
+
+        self.assertEqual(values, regular)
+
+    @override_settings(RECIPE_VALUES_LISTS=True)
+    def test_query_budget(self):
+        """
+        Test recipe page takes one query plus one per relation
+        """
+        with self.assertMaxQueries(3):
+            response = self.client.get(RECIPES_URL)
+
+        self.assertEqual(len(response.data['results']), 4)
+
+    @override_settings(RECIPE_VALUES_LISTS=True)
+    def test_expand_uses_regular_path(self):
+        """
+        Test expanded relations fall back to regular serialization
+        """
+        response = self.client.get(RECIPES_URL, {'expand': 'tag'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        tags = response.data['results'][0]['tag']
+        self.assertEqual(set(tags[0]), {'id', 'name'})
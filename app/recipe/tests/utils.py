@@ -0,0 +1,47 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from core.models import Ingredient, Recipe, Tag
+
+
+def detail_url(recipe_id: int) -> str:
+    """
+    Return recipe detail URL
+    """
+    return reverse('recipe:recipe-detail', args=[recipe_id])
+
+
+def sample_recipe(user, tags=(), **kwargs) -> Recipe:
+    """
+    Create simple recipe, with tags when given
+    """
+    defaults = {
+        'title': 'Soup',
+        'time': 10,
+        'price': Decimal('5.00'),
+    }
+    defaults.update(kwargs)
+    recipe = Recipe.objects.create(user=user, **defaults)
+    if tags:
+        recipe.tag.add(*tags)
+    return recipe
+
+
+class RecipeDataTestCase(TestCase):
+    """
+    TestCase with an authenticated user owning two tags and an ingredient
+    """
+    def setUp(self):
+        self.client = APIClient()
+        self.user = get_user_model().objects.create_user(
+            'mail@mail.com',
+            'password123'
+        )
+        self.client.force_authenticate(self.user)
+        self.vegan = Tag.objects.create(user=self.user, name='Vegan')
+        self.quick = Tag.objects.create(user=self.user, name='Quick')
+        self.salt = Ingredient.objects.create(user=self.user, name='Salt')
@@ -1,7 +1,8 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
 
-from recipe.views import TagViewSet, IngredientViewSet, RecipeViewSet
+from recipe.views import TagViewSet, IngredientViewSet, RecipeViewSet, \
+    RecipeStatsView
 
 router = DefaultRouter()
 
@@ -12,5 +13,6 @@ router.register('recipe', RecipeViewSet)
 app_name = 'recipe'
 
 urlpatterns = [
+    path('stats/', RecipeStatsView.as_view(), name='stats'),
     path('', include(router.urls))
 ]
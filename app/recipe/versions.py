@@ -0,0 +1,46 @@
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+def version_cache():
+    """
+    Return cache holding per-user data versions
+
+    The cache has to be shared between worker processes for the stamps to
+    be consistent, e.g. memcached or redis in production.
+    """
+    return caches[getattr(settings, 'RECIPE_VERSION_CACHE', 'default')]
+
+
+def version_key(user_id: int) -> str:
+    return f'recipe-data-version:{user_id}'
+
+
+def get_user_version(user_id: int) -> str:
+    """
+    Return current data version of user, starting a new one if missing
+    """
+    cache = version_cache()
+    key = version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, uuid4().hex, None)
+        version = cache.get(key)
+    return version
+
+
+def bump_user_version(user_id: int):
+    """
+    Mark data of user as changed
+
+    The stamp is changed right away and once more after commit, so that a
+    read which ran between the two does not keep the stamp of stale data.
+    """
+    def bump():
+        version_cache().set(version_key(user_id), uuid4().hex, None)
+
+    bump()
+    transaction.on_commit(bump)
@@ -1,24 +1,42 @@
-from rest_framework.authentication import TokenAuthentication
+from django.db.models import Prefetch
 from rest_framework.mixins import ListModelMixin, CreateModelMixin
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 from rest_framework.viewsets import GenericViewSet, ModelViewSet
 
+from core.authentication import CachedTokenAuthentication
 from core.models import Tag, Ingredient, Recipe
-from recipe.serializers import TagSerializer, IngredientSerializer, RecipeSerializer
+from recipe.filters import RecipeAttrOrderingFilter, RecipeRelationFilter, \
+    RecipeSearchFilter
+from recipe.mixins import BulkWriteMixin, StreamingListMixin, \
+    ConditionalGetMixin, CachedResponseMixin, ExpandMixin, SparseFieldsMixin, \
+    ValuesListMixin
+from recipe.pagination import KeysetPagination
+from recipe.serializers import TagSerializer, IngredientSerializer, \
+    RecipeSerializer, RecipeStatsSerializer
+from recipe.stats import get_summary, summary_data
 
 
-class BaseRecipeAttr(GenericViewSet, ListModelMixin, CreateModelMixin):
+class BaseRecipeAttr(ConditionalGetMixin, CachedResponseMixin,
+                     StreamingListMixin, ValuesListMixin, SparseFieldsMixin,
+                     BulkWriteMixin, GenericViewSet, ListModelMixin,
+                     CreateModelMixin):
     """
     Base clas for Tags and Ingredients
     """
-    authentication_classes = (TokenAuthentication,)
+    authentication_classes = (CachedTokenAuthentication,)
     permission_classes = (IsAuthenticated,)
+    pagination_class = KeysetPagination
+    filter_backends = (RecipeAttrOrderingFilter, )
 
     def get_queryset(self):
         """
         Return objects for current user only
         """
-        return self.queryset.filter(user=self.request.user).order_by('-name')
+        return self.queryset\
+            .filter(user=self.request.user)\
+            .order_by('-name', '-id')
 
     def perform_create(self, serializer):
         """
@@ -43,18 +61,62 @@ class IngredientViewSet(BaseRecipeAttr):
     serializer_class = IngredientSerializer
 
 
-class RecipeViewSet(ModelViewSet):
+class RecipeViewSet(ConditionalGetMixin, CachedResponseMixin,
+                    StreamingListMixin, ValuesListMixin, ExpandMixin,
+                    SparseFieldsMixin, BulkWriteMixin, ModelViewSet):
     """
     Manage Recipes in db
     """
     serializer_class = RecipeSerializer
     queryset = Recipe.objects.all()
-    authentication_classes = (TokenAuthentication, )
+    authentication_classes = (CachedTokenAuthentication, )
     permission_classes = (IsAuthenticated, )
+    pagination_class = KeysetPagination
+    filter_backends = (RecipeRelationFilter, RecipeSearchFilter)
 
     def get_queryset(self):
         """
         Retrieve Recipes for authenticated user
+
+        The search vector is only filtered on, never rendered.
+        """
+        return self.queryset\
+            .filter(user=self.request.user)\
+            .defer('search_vector')\
+            .prefetch_related(
+                Prefetch('ingredients', Ingredient.objects.order_by('id')),
+                Prefetch('tag', Tag.objects.order_by('id'))
+            )\
+            .order_by('-id')
+
+    def perform_create(self, serializer):
+        """
+        Create new Recipe for authenticated user
+        """
+        serializer.save(user=self.request.user)
+
+    def retrieve(self, request, *args, **kwargs):
         """
-        return self.queryset.filter(user=self.request.user)
+        Retrieve Recipe through response cache
+        """
+        return self.cached_response(
+            super().retrieve,
+            request,
+            *args,
+            **kwargs
+        )
+
+
+class RecipeStatsView(APIView):
+    """
+    Statistics of user's recipes
+    """
+    authentication_classes = (CachedTokenAuthentication, )
+    permission_classes = (IsAuthenticated, )
 
+    def get(self, request, *args, **kwargs):
+        """
+        Return statistics from the summary row of the user
+        """
+        summary = get_summary(request.user.pk)
+        return Response(RecipeStatsSerializer(summary_data(summary)).data)
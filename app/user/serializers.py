@@ -4,8 +4,11 @@ from rest_framework.exceptions import ValidationError
 from rest_framework.fields import CharField
 from rest_framework.serializers import ModelSerializer, Serializer
 
+from core.models import RefreshToken
+from monitoring.serializers import TimedSerializerMixin
 
-class UserSerializer(ModelSerializer):
+
+class UserSerializer(TimedSerializerMixin, ModelSerializer):
     """
     Serializer for user objects
     """
@@ -27,14 +30,18 @@ class UserSerializer(ModelSerializer):
 
     def update(self, instance, validated_data):
         """
-        Update user
+        Update user, saving the given fields only
         """
         password = validated_data.pop('password', None)
-        user = super().update(instance, validated_data)
+        for name, value in validated_data.items():
+            setattr(instance, name, value)
+        update_fields = list(validated_data)
         if password:
-            user.set_password(password)
-            user.save()
-        return user
+            instance.set_password(password)
+            update_fields.append('password')
+        if update_fields:
+            instance.save(update_fields=update_fields)
+        return instance
 
 
 class AuthTokenSerializer(Serializer):
@@ -63,3 +70,22 @@ class AuthTokenSerializer(Serializer):
             raise ValidationError(message, code='authentication')
         attrs['user'] = user
         return attrs
+
+
+class RefreshTokenSerializer(Serializer):
+    """
+    Serializer for refresh token exchange
+    """
+    refresh = CharField(trim_whitespace=False)
+
+    def validate(self, attrs):
+        """
+        Validate refresh token without checking password
+        """
+        refresh_token = RefreshToken.objects.get_active(attrs['refresh'])
+        if not refresh_token:
+            message = _('Invalid or expired refresh token')
+            raise ValidationError(message, code='authentication')
+        attrs['refresh_token'] = refresh_token
+        attrs['user'] = refresh_token.user
+        return attrs
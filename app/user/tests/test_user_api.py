@@ -1,12 +1,22 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.core.management import call_command
+from django.test import TestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework import status
 
 from rest_framework.test import APIClient
 
+from core.hashers import PBKDF2PasswordHasher
+from core.models import RefreshToken
+
 CREATE_USER_URL = reverse('user:create')
 TOKEN_URL = reverse('user:token')
+REFRESH_TOKEN_URL = reverse('user:token-refresh')
 ME_URL = reverse('user:me')
 
 
@@ -142,6 +152,125 @@ class PublicUserApiTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
 
 
+class RefreshTokenApiTests(TestCase):
+    """
+    Test exchanging refresh tokens for access tokens
+    """
+    def setUp(self):
+        self.client = APIClient()
+        self.payload = {
+            'email': 'mail@mail.com',
+            'password': 'password123',
+        }
+        self.user = create_user(**self.payload)
+
+    def test_login_returns_refresh_token(self):
+        """
+        Test password login returns refresh token
+        """
+        response = self.client.post(TOKEN_URL, self.payload)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('token', response.data)
+        self.assertIsNotNone(
+            RefreshToken.objects.get_active(response.data['refresh'])
+        )
+
+    def test_refresh_skips_password_check(self):
+        """
+        Test refresh token is exchanged without hashing password
+        """
+        login = self.client.post(TOKEN_URL, self.payload)
+
+        with patch.object(PBKDF2PasswordHasher, 'verify') as mocked:
+            response = self.client.post(
+                REFRESH_TOKEN_URL,
+                {'refresh': login.data['refresh']}
+            )
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['token'], login.data['token'])
+        self.assertNotEqual(response.data['refresh'], login.data['refresh'])
+        mocked.assert_not_called()
+
+    def test_refresh_token_is_single_use(self):
+        """
+        Test used refresh token is rejected
+        """
+        login = self.client.post(TOKEN_URL, self.payload)
+        payload = {'refresh': login.data['refresh']}
+        self.client.post(REFRESH_TOKEN_URL, payload)
+
+        response = self.client.post(REFRESH_TOKEN_URL, payload)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertNotIn('token', response.data)
+
+    def test_expired_refresh_token(self):
+        """
+        Test expired refresh token is rejected
+        """
+        refresh_token, key = RefreshToken.objects.issue(self.user)
+        refresh_token.expires = timezone.now() - timedelta(seconds=1)
+        refresh_token.save()
+
+        response = self.client.post(REFRESH_TOKEN_URL, {'refresh': key})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_issue_deletes_expired_refresh_tokens(self):
+        """
+        Test login and refresh keep only live refresh tokens of user
+        """
+        expired, _key = RefreshToken.objects.issue(self.user)
+        RefreshToken.objects.filter(pk=expired.pk)\
+            .update(expires=timezone.now() - timedelta(seconds=1))
+        login = self.client.post(TOKEN_URL, self.payload)
+
+        self.client.post(REFRESH_TOKEN_URL, {'refresh': login.data['refresh']})
+
+        self.assertEqual(self.user.refresh_tokens.count(), 1)
+
+    def test_prune_refresh_tokens(self):
+        """
+        Test prune command deletes expired tokens of all users only
+        """
+        other = create_user(email='other@mail.com', password='password123')
+        live, _key = RefreshToken.objects.issue(self.user)
+        for user in (self.user, other):
+            expired, _key = RefreshToken.objects.issue(user)
+            RefreshToken.objects.filter(pk=expired.pk)\
+                .update(expires=timezone.now() - timedelta(seconds=1))
+        out = StringIO()
+
+        call_command('prune_refresh_tokens', stdout=out)
+
+        self.assertIn('Deleted 2 expired', out.getvalue())
+        self.assertEqual(list(RefreshToken.objects.all()), [live])
+
+    def test_inactive_user_refresh_token(self):
+        """
+        Test refresh token of inactive user is rejected
+        """
+        refresh_token, key = RefreshToken.objects.issue(self.user)
+        self.user.is_active = False
+        self.user.save()
+
+        response = self.client.post(REFRESH_TOKEN_URL, {'refresh': key})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @override_settings(PASSWORD_HASHER_ITERATIONS=1000)
+    def test_configurable_hasher_iterations(self):
+        """
+        Test password is hashed with configured iteration count
+        """
+        user = create_user(email='other@mail.com', password='password123')
+
+        self.assertTrue(user.password.startswith('pbkdf2_sha256$1000$'))
+        self.assertTrue(user.check_password('password123'))
+
+
 class PrivateUserApiTests(TestCase):
     """
     Test user API endpoints that require auth
@@ -191,3 +320,20 @@ class PrivateUserApiTests(TestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(self.user.name, payload['name'])
         self.assertIs(self.user.check_password(payload['password']), True)
+
+    def test_update_with_stale_cached_user(self):
+        """
+        Test update by user cached before deactivation keeps it inactive
+        """
+        get_user_model().objects.filter(pk=self.user.pk).update(
+            is_active=False,
+            password='changed'
+        )
+
+        response = self.client.patch(ME_URL, {'name': 'new_name'})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        user = get_user_model().objects.get(pk=self.user.pk)
+        self.assertEqual(user.name, 'new_name')
+        self.assertFalse(user.is_active)
+        self.assertEqual(user.password, 'changed')
@@ -1,11 +1,13 @@
 from django.urls import path
 
-from .views import CreateUserView, CreateTokenView, ManageUserView
+from .views import CreateUserView, CreateTokenView, ManageUserView, \
+    RefreshTokenView
 
 app_name = 'user'
 
 urlpatterns = [
     path('create/', CreateUserView.as_view(), name='create'),
     path('token/', CreateTokenView.as_view(), name='token'),
+    path('token/refresh/', RefreshTokenView.as_view(), name='token-refresh'),
     path('me/', ManageUserView.as_view(), name='me'),
 ]
@@ -1,10 +1,27 @@
-from rest_framework.authentication import TokenAuthentication
+from django.contrib.auth import get_user_model
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authtoken.models import Token
 from rest_framework.authtoken.views import ObtainAuthToken
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import CreateAPIView, RetrieveUpdateAPIView
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, SAFE_METHODS
+from rest_framework.response import Response
 from rest_framework.settings import api_settings
 
-from .serializers import UserSerializer, AuthTokenSerializer
+from core.authentication import CachedTokenAuthentication
+from core.models import RefreshToken
+
+from .serializers import UserSerializer, AuthTokenSerializer, \
+    RefreshTokenSerializer
+
+
+def token_response(user) -> Response:
+    """
+    Return access token and new refresh token for user
+    """
+    token, created = Token.objects.get_or_create(user=user)
+    refresh_token, refresh_key = RefreshToken.objects.issue(user)
+    return Response({'token': token.key, 'refresh': refresh_key})
 
 
 class CreateUserView(CreateAPIView):
@@ -20,6 +37,40 @@ class CreateTokenView(ObtainAuthToken):
     """
     serializer_class = AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    parser_classes = api_settings.DEFAULT_PARSER_CLASSES
+
+    def post(self, request, *args, **kwargs):
+        """
+        Authenticate with password, return access and refresh tokens
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return token_response(serializer.validated_data['user'])
+
+
+class RefreshTokenView(ObtainAuthToken):
+    """
+    Exchange refresh token for access token
+    """
+    serializer_class = RefreshTokenSerializer
+    renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    parser_classes = api_settings.DEFAULT_PARSER_CLASSES
+
+    def post(self, request, *args, **kwargs):
+        """
+        Rotate refresh token, return access and new refresh tokens
+        """
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        refresh_token = serializer.validated_data['refresh_token']
+        deleted, _rows = RefreshToken.objects\
+            .filter(pk=refresh_token.pk).delete()
+        if not deleted:
+            raise ValidationError(
+                {'refresh': [_('Invalid or expired refresh token')]},
+                code='authentication'
+            )
+        return token_response(serializer.validated_data['user'])
 
 
 class ManageUserView(RetrieveUpdateAPIView):
@@ -27,11 +78,16 @@ class ManageUserView(RetrieveUpdateAPIView):
     Manage authenticated user
     """
     serializer_class = UserSerializer
-    authentication_classes = (TokenAuthentication, )
+    authentication_classes = (CachedTokenAuthentication, )
     permission_classes = (IsAuthenticated, )
 
     def get_object(self):
         """
         Retrieve and return authenticated user
+
+        The user of the token cache may be older than the stored one, so
+        it is only used for reads, updates start from the stored user.
         """
-        return self.request.user
+        if self.request.method in SAFE_METHODS:
+            return self.request.user
+        return get_user_model().objects.get(pk=self.request.user.pk)